@@ -0,0 +1,154 @@
+"""Контроль допуска для grpc.server: лимиты параллельности и сброс нагрузки.
+
+Методы делятся на классы (чтение и запись), у каждого класса свой лимит
+одновременно выполняющихся обработчиков и своя ограниченная очередь
+ожидающих. Если очередь класса полна, вызов сразу получает
+RESOURCE_EXHAUSTED; ожидание в очереди не дольше queue_timeout и дедлайна
+клиента. Вызовы с истёкшим дедлайном отбрасываются до начала работы.
+
+Ожидающий вызов занимает поток пула, поэтому пул должен вмещать все
+лимиты и очереди (threads_needed); сверх этого grpc отклоняет вызовы сам
+через maximum_concurrent_rpcs, не ставя их в очередь пула.
+"""
+import threading
+from typing import Dict, FrozenSet, List
+
+import grpc
+
+READ = "read"
+WRITE = "write"
+
+
+class ClassLimiter:
+    """Семафор класса методов и счётчик ожидающих"""
+
+    def __init__(self, name: str, limit: int, queue_size: int):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self._slots = threading.Semaphore(limit)
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def acquire(self, context, queue_timeout: float):
+        """Занимает слот или прерывает вызов через context.abort"""
+        remaining = context.time_remaining()
+        if remaining is not None and remaining <= 0:
+            self._expire(context)
+        if self._slots.acquire(blocking=False):
+            return
+
+        with self._lock:
+            if self.waiting >= self.queue_size:
+                self.rejected += 1
+                full = True
+            else:
+                self.waiting += 1
+                full = False
+        if full:
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                          f"Server is overloaded: {self.name} queue is full")
+
+        timeout = queue_timeout if remaining is None else min(queue_timeout, remaining)
+        try:
+            acquired = self._slots.acquire(timeout=timeout)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not acquired:
+            remaining = context.time_remaining()
+            if remaining is not None and remaining <= 0:
+                self._expire(context)
+            with self._lock:
+                self.rejected += 1
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                          f"Server is overloaded: no free {self.name} slot in {timeout:.2f} s")
+
+        remaining = context.time_remaining()
+        if remaining is not None and remaining <= 0:
+            # Дедлайн истёк, пока вызов ждал в очереди: работу не начинаем
+            self._slots.release()
+            self._expire(context)
+
+    def release(self):
+        self._slots.release()
+
+    def _expire(self, context):
+        with self._lock:
+            self.expired += 1
+        context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, "Deadline expired before the request was processed")
+
+
+class AdmissionInterceptor(grpc.ServerInterceptor):
+    def __init__(self, read_limit: int, write_limit: int, queue_size: int,
+                 queue_timeout: float, write_methods: FrozenSet[str],
+                 unlimited_methods: FrozenSet[str] = frozenset()):
+        self.queue_timeout = queue_timeout
+        self.write_methods = write_methods
+        # Долгие подписки не занимают слоты: иначе они вытеснили бы чтения
+        self.unlimited_methods = unlimited_methods
+        self.limiters: Dict[str, ClassLimiter] = {
+            READ: ClassLimiter(READ, read_limit, queue_size),
+            WRITE: ClassLimiter(WRITE, write_limit, queue_size),
+        }
+
+    @property
+    def threads_needed(self) -> int:
+        """Потоков пула хватает на все выполняющиеся и ожидающие вызовы"""
+        return sum(limiter.limit + limiter.queue_size for limiter in self.limiters.values())
+
+    def render_metrics(self) -> List[str]:
+        """Счётчики сброса нагрузки для эндпоинта /metrics"""
+        lines = ["# TYPE grpc_server_admission_rejected_total counter"]
+        lines += [f'grpc_server_admission_rejected_total{{class="{name}"}} {limiter.rejected}'
+                  for name, limiter in self.limiters.items()]
+        lines.append("# TYPE grpc_server_admission_expired_total counter")
+        lines += [f'grpc_server_admission_expired_total{{class="{name}"}} {limiter.expired}'
+                  for name, limiter in self.limiters.items()]
+        lines.append("# TYPE grpc_server_admission_waiting gauge")
+        lines += [f'grpc_server_admission_waiting{{class="{name}"}} {limiter.waiting}'
+                  for name, limiter in self.limiters.items()]
+        return lines
+
+    def limiter(self, method: str) -> ClassLimiter:
+        name = method.rsplit("/", 1)[-1]
+        return self.limiters[WRITE if name in self.write_methods else READ]
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or handler_call_details.method.rsplit("/", 1)[-1] in self.unlimited_methods:
+            return handler
+        limiter = self.limiter(handler_call_details.method)
+        queue_timeout = self.queue_timeout
+
+        if handler.request_streaming and handler.response_streaming:
+            factory, inner = grpc.stream_stream_rpc_method_handler, handler.stream_stream
+        elif handler.request_streaming:
+            factory, inner = grpc.stream_unary_rpc_method_handler, handler.stream_unary
+        elif handler.response_streaming:
+            factory, inner = grpc.unary_stream_rpc_method_handler, handler.unary_stream
+        else:
+            factory, inner = grpc.unary_unary_rpc_method_handler, handler.unary_unary
+
+        if handler.response_streaming:
+            def behavior(request, context):
+                limiter.acquire(context, queue_timeout)
+                try:
+                    yield from inner(request, context)
+                finally:
+                    limiter.release()
+        else:
+            def behavior(request, context):
+                limiter.acquire(context, queue_timeout)
+                try:
+                    return inner(request, context)
+                finally:
+                    limiter.release()
+
+        return factory(
+            behavior,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
@@ -0,0 +1,678 @@
+"""Микробенчмарки хранилища словаря.
+
+Запуск (сгенерированные dictionary_pb2*.py должны быть в PYTHONPATH):
+    python benchmark.py search --sizes 10000,100000,1000000
+    python benchmark.py responses --size 100000
+    python benchmark.py related --size 100000 --degree 10
+    python benchmark.py memory --size 1000000
+    python benchmark.py seed --size 1000000 --output terms.jsonl
+    python benchmark.py interceptor --repeat 100000
+    python benchmark.py suggest --size 100000
+    python benchmark.py fuzzy --size 100000
+    python benchmark.py writes --size 1000000 --shards 1,4,8
+    python benchmark.py conditional --size 100000
+    python benchmark.py projection --size 100000
+    python benchmark.py replication --size 200000 --rates 500,2000 --shards 8
+    python benchmark.py soak --size 100000 --rate 500 --seconds 240 --ttl 60
+"""
+import argparse
+import gc
+import socket
+import json
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent import futures
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, List, NamedTuple
+
+import grpc
+
+import dictionary_pb2
+import dictionary_pb2_grpc
+from indexes import fold
+from metrics import MetricsInterceptor, MetricsRegistry
+from replication import CHANNEL_OPTIONS, Follower
+from seed import detect_format, open_seed, write_delimited
+from server import DictionaryService, DictionaryServicer
+from storage import TermRecord, format_timestamp
+
+WORDS = [
+    "api", "protocol", "container", "schema", "service", "stream", "cache",
+    "index", "query", "network", "server", "client", "message", "queue",
+    "storage", "replica", "cluster", "token", "session", "gateway",
+    "протокол", "сервис", "данные", "сеть", "запрос", "хранилище",
+]
+CATEGORIES = ["RPC", "Serialization", "API", "Containerization", "Storage", "Network"]
+SEARCH_QUERIES = ["API", "container", "protocol", "Google", "web", "данные"]
+# Префиксы, как их набирают в поле поиска, по одному символу
+SUGGEST_PREFIXES = ["c", "co", "con", "cont", "П", "пр", "про", "ПРОТ"]
+# Имена с опечатками: пропуск, замена и лишняя буква
+FUZZY_QUERIES = ["Contaner-1234", "Протокл-5", "Kubernets", "Servce-77", "gatewy", "Queeue-42"]
+
+
+def generate_terms(count: int, seed: int = 42) -> Iterator[dict]:
+    """Синтетические термины с определениями из случайных слов"""
+    rnd = random.Random(seed)
+    started = datetime(2024, 1, 15, 10, 0, 0)
+    for i in range(count):
+        words = rnd.sample(WORDS, 8)
+        # Как у AddTerm: у каждого термина своя строка времени
+        timestamp = (started + timedelta(seconds=i)).isoformat() + "Z"
+        yield {
+            "term": f"{words[0].capitalize()}-{i}",
+            "definition": " ".join(words),
+            "category": rnd.choice(CATEGORIES),
+            "related_terms": [f"{w.capitalize()}-{rnd.randrange(count)}" for w in words[1:4]],
+            "source": "Benchmark",
+            "created_at": timestamp,
+            "updated_at": timestamp,
+        }
+
+
+def build_service(count: int) -> DictionaryService:
+    service = DictionaryService()
+    for term_data in generate_terms(count):
+        service.add_term(term_data)
+    return service
+
+
+def timeit(func: Callable[[], object], repeat: int) -> float:
+    """Среднее время вызова в миллисекундах"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def scan_search(service: DictionaryService, query: str) -> List[dict]:
+    """Исходный алгоритм SearchTerms: полный перебор с .lower() на каждом запросе"""
+    query = query.lower()
+    return [
+        record for record in service.terms.entries()
+        if (query in record.term.lower() or
+            query in record.definition.lower() or
+            query in record.category.lower())
+    ]
+
+
+def bench_search(sizes: List[int], repeat: int):
+    print(f"{'terms':>10} {'build, s':>10} {'query':>12} {'hits':>8} {'scan, ms':>10} {'index, ms':>10} "
+          f"{'top-50, ms':>11} {'all, KB':>8} {'top-50, KB':>11}")
+    for size in sizes:
+        start = time.perf_counter()
+        service = build_service(size)
+        build_time = time.perf_counter() - start
+        for query in SEARCH_QUERIES:
+            hits = len(service.search_terms(query))
+            assert hits == len(scan_search(service, query))
+            scan_ms = timeit(lambda: scan_search(service, query), repeat)
+            index_ms = timeit(lambda: service.search_terms(query), repeat)
+            # Ранжированная страница SearchTerms против прежнего ответа со всеми совпадениями
+            ranked_ms = timeit(lambda: service.rank_search(query, limit=50), repeat)
+            all_kb = dictionary_pb2.TermsList(
+                terms=[record.build_response() for record in service.search_terms(query)]).ByteSize() / 1024
+            page_kb = dictionary_pb2.TermsList(
+                terms=[record.build_response() for record in service.rank_search(query, limit=50)[0]]).ByteSize() / 1024
+            print(f"{size:>10} {build_time:>10.1f} {query:>12} {hits:>8} {scan_ms:>10.2f} {index_ms:>10.2f} "
+                  f"{ranked_ms:>11.2f} {all_kb:>8.0f} {page_kb:>11.1f}")
+
+
+def build_response(term_data: dict) -> dictionary_pb2.TermResponse:
+    """Исходный путь чтения: новое сообщение из словаря на каждый запрос"""
+    return dictionary_pb2.TermResponse(
+        term=term_data["term"],
+        definition=term_data["definition"],
+        category=term_data["category"],
+        related_terms=term_data["related_terms"],
+        source=term_data["source"],
+        created_at=term_data["created_at"],
+        updated_at=term_data["updated_at"]
+    )
+
+
+def allocations(func: Callable[[], object], repeat: int) -> float:
+    """Среднее число выделенных Python-блоков на вызов"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [func() for _ in range(repeat)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del results
+    stats = after.compare_to(before, "filename")
+    return sum(stat.count_diff for stat in stats if stat.count_diff > 0) / repeat
+
+
+def bench_responses(size: int, repeat: int):
+    service = build_service(size)
+    keys = list(service.terms)
+    page = keys[:100]
+
+    cases = [
+        ("GetTerm", lambda: build_response(service.terms[keys[0]]),
+         lambda: service.response(service.terms.entry(keys[0]))),
+        ("TermsList x100", lambda: dictionary_pb2.TermsList(terms=[build_response(service.terms[k]) for k in page]),
+         lambda: dictionary_pb2.TermsList(terms=[service.response(service.terms.entry(k)) for k in page])),
+    ]
+    print(f"{'rpc':>16} {'build, us':>10} {'cached, us':>11} {'build, allocs':>14} {'cached, allocs':>15}")
+    for name, build, cached in cases:
+        build_us = timeit(build, repeat) * 1000
+        cached_us = timeit(cached, repeat) * 1000
+        print(f"{name:>16} {build_us:>10.1f} {cached_us:>11.1f} "
+              f"{allocations(build, repeat):>14.1f} {allocations(cached, repeat):>15.1f}")
+
+
+def build_graph_service(size: int, degree: int, seed: int = 42) -> DictionaryService:
+    """Плотный граф: у каждого узла degree случайных связей"""
+    rnd = random.Random(seed)
+    service = DictionaryService()
+    terms = [
+        {
+            "term": f"Node-{i}",
+            "definition": "graph node",
+            "category": "Graph",
+            "related_terms": [f"Node-{rnd.randrange(size)}" for _ in range(degree)],
+            "source": "Benchmark",
+            "created_at": "2024-01-15T10:00:00Z",
+            "updated_at": "2024-01-15T10:00:00Z",
+        }
+        for i in range(size)
+    ]
+    for start in range(0, size, 1000):
+        service.add_terms(terms[start:start + 1000])
+    return service
+
+
+def bench_related(size: int, degree: int, repeat: int):
+    start = time.perf_counter()
+    service = build_graph_service(size, degree)
+    print(f"graph: {size} nodes, degree {degree}, built in {time.perf_counter() - start:.1f} s")
+
+    rnd = random.Random(7)
+    roots = [f"Node-{rnd.randrange(size)}" for _ in range(repeat)]
+    print(f"{'depth':>6} {'reached':>9} {'cold, ms':>10} {'cached, ms':>11}")
+    for depth in (1, 2, 3):
+        reached = 0
+        cold = 0.0
+        for root in roots:
+            # Изменение версии графа сбрасывает кеш, как это делает запись
+            service.related_graph.version += 1
+            start = time.perf_counter()
+            reached += len(service.get_related_terms(root, depth))
+            cold += time.perf_counter() - start
+        cached = timeit(lambda: [service.get_related_terms(root, depth) for root in roots], 3)
+        print(f"{depth:>6} {reached // repeat:>9} {cold * 1000 / repeat:>10.2f} {cached / repeat:>11.3f}")
+
+
+class DictEntry(NamedTuple):
+    """Прежняя запись хранилища: словарь и готовый TermResponse на каждый термин"""
+    seq: int
+    data: dict
+    response: dictionary_pb2.TermResponse
+
+
+LAYOUTS = {
+    "dict + TermResponse": lambda seq, term_data: DictEntry(seq, term_data, build_response(term_data)),
+    "dict": lambda seq, term_data: term_data,
+    "TermRecord": lambda seq, term_data: TermRecord.from_data(term_data),
+}
+
+
+def max_rss() -> int:
+    """Пиковый RSS процесса в байтах (ru_maxrss в Linux — в килобайтах)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure_layout(layout: str, size: int, results):
+    # Выполняется в отдельном процессе, чтобы замеры не влияли друг на друга
+    gc.collect()
+    before = max_rss()
+    make = LAYOUTS[layout]
+    records = [make(seq, term_data) for seq, term_data in enumerate(generate_terms(size))]
+    gc.collect()
+    results.put((max_rss() - before) / len(records))
+
+
+def bench_memory(size: int):
+    ctx = multiprocessing.get_context("fork")
+    print(f"{'layout':>20} {'bytes/term':>11}")
+    for layout in LAYOUTS:
+        results = ctx.Queue()
+        process = ctx.Process(target=measure_layout, args=(layout, size, results))
+        process.start()
+        per_term = results.get()
+        process.join()
+        print(f"{layout:>20} {per_term:>11.0f}")
+
+
+def write_seed(path: str, size: int):
+    """Файл начального словаря из синтетических терминов"""
+    if detect_format(path) == "jsonl":
+        with open(path, "w", encoding="utf-8") as seed_file:
+            for term_data in generate_terms(size):
+                seed_file.write(json.dumps(term_data, ensure_ascii=False) + "\n")
+    else:
+        write_delimited(path, (build_response(term_data) for term_data in generate_terms(size)))
+
+
+def measure_seed(path: str, results):
+    # Отдельный процесс: пиковый RSS считается только для загрузки
+    before = max_rss()
+    started = time.perf_counter()
+    service = DictionaryService(seed=open_seed(path))
+    results.put((len(service.terms), time.perf_counter() - started, max_rss() - before))
+
+
+def bench_seed(size: int, output: str):
+    paths = [output] if output else [
+        os.path.join(tempfile.mkdtemp(prefix="dictionary-seed-"), name)
+        for name in ("terms.jsonl", "terms.pb")
+    ]
+    ctx = multiprocessing.get_context("fork")
+    print(f"{'format':>10} {'file, MB':>9} {'terms':>9} {'startup, s':>11} {'s/million':>10} {'peak RSS, MB':>13}")
+    for path in paths:
+        write_seed(path, size)
+        results = ctx.Queue()
+        process = ctx.Process(target=measure_seed, args=(path, results))
+        process.start()
+        count, elapsed, rss = results.get()
+        process.join()
+        print(f"{detect_format(path):>10} {os.path.getsize(path) / 2**20:>9.1f} {count:>9} {elapsed:>11.1f} "
+              f"{elapsed * 1_000_000 / count:>10.1f} {rss / 2**20:>13.0f}")
+
+
+class CallDetails(NamedTuple):
+    method: str
+    invocation_metadata: tuple
+
+
+def bench_interceptor(repeat: int):
+    """Накладные расходы MetricsInterceptor на вызов без сети: перехват, обработчик, сериализация"""
+    response = dictionary_pb2.TermResponse(term="gRPC", definition="definition")
+    handler = grpc.unary_unary_rpc_method_handler(
+        lambda request, context: response,
+        response_serializer=dictionary_pb2.TermResponse.SerializeToString,
+    )
+    details = CallDetails("/dictionary.DictionaryService/GetTerm", ())
+    interceptor = MetricsInterceptor(MetricsRegistry())
+
+    def plain():
+        handler.response_serializer(handler.unary_unary(None, None))
+
+    def intercepted():
+        wrapped = interceptor.intercept_service(lambda _: handler, details)
+        wrapped.response_serializer(wrapped.unary_unary(None, None))
+
+    plain_us = timeit(plain, repeat) * 1000
+    intercepted_us = timeit(intercepted, repeat) * 1000
+    print(f"plain {plain_us:.2f} us, intercepted {intercepted_us:.2f} us, "
+          f"overhead {intercepted_us - plain_us:.2f} us per RPC")
+
+
+def bench_suggest(size: int, repeat: int):
+    """SuggestTerms по индексу префиксов против SearchTerms на каждое нажатие клавиши"""
+    service = DictionaryService()
+    service.load_seed(TermRecord.from_data(term_data) for term_data in generate_terms(size))
+    print(f"{'prefix':>8} {'hits':>6} {'suggest, us':>12} {'search, ms':>11}")
+    for prefix in SUGGEST_PREFIXES:
+        hits = service.suggest_terms(prefix)
+        suggest_us = timeit(lambda: service.suggest_terms(prefix), repeat) * 1000
+        search_ms = timeit(lambda: service.rank_search(prefix, limit=10), max(repeat // 1000, 1))
+        print(f"{prefix:>8} {len(hits):>6} {suggest_us:>12.1f} {search_ms:>11.1f}")
+
+
+def levenshtein(a: str, b: str) -> int:
+    row = list(range(len(b) + 1))
+    for i, char in enumerate(a, 1):
+        new_row = [i]
+        for j, other in enumerate(b, 1):
+            new_row.append(min(row[j] + 1, new_row[j - 1] + 1, row[j - 1] + (char != other)))
+        row = new_row
+    return row[-1]
+
+
+def bench_fuzzy(size: int, repeat: int):
+    """FuzzySearch по индексу префиксов против попарного расстояния до каждого имени"""
+    service = DictionaryService()
+    service.load_seed(TermRecord.from_data(term_data) for term_data in generate_terms(size))
+    names = [fold(term) for term in service.terms]
+    print(f"{'query':>14} {'distance':>9} {'hits':>5} {'index, ms':>10} {'scan, ms':>9}")
+    for query in FUZZY_QUERIES:
+        folded = fold(query)
+        for distance in (1, 2):
+            hits = service.fuzzy_search(query, distance)
+            index_ms = timeit(lambda: service.fuzzy_search(query, distance), repeat)
+            scan_ms = timeit(lambda: [name for name in names if levenshtein(folded, name) <= distance], 1)
+            print(f"{query:>14} {distance:>9} {len(hits):>5} {index_ms:>10.2f} {scan_ms:>9.0f}")
+
+
+def write_load(service: DictionaryService, thread: int, count: int, latencies: List[float]):
+    """Цикл записей одного потока: добавление, обновление и удаление своих терминов"""
+    for i in range(count):
+        term = f"Write-{thread}-{i}"
+        started = time.perf_counter()
+        with service.writer(term):
+            service.add_term({"term": term, "definition": "write load", "category": "Load",
+                              "related_terms": [], "source": "Benchmark", "created_at": "", "updated_at": ""})
+        with service.writer(term):
+            service.update_term(term, {"definition": "write load updated"})
+        with service.writer(term):
+            service.delete_term(term)
+        latencies.append((time.perf_counter() - started) / 3)
+
+
+def bench_writes(size: int, shard_counts: List[int], threads: int, count: int):
+    """Пропускная способность записи в зависимости от числа шардов"""
+    print(f"{'shards':>7} {'threads':>8} {'writes/s':>9} {'p50, ms':>8} {'p99, ms':>8}")
+    for shard_count in shard_counts:
+        service = DictionaryService(shard_count=shard_count)
+        service.load_seed(TermRecord.from_data(term_data) for term_data in generate_terms(size))
+        # Миллионы долгоживущих записей иначе обходит каждая сборка мусора
+        gc.collect()
+        gc.freeze()
+        latencies: List[float] = []
+        workers = [threading.Thread(target=write_load, args=(service, thread, count, latencies))
+                   for thread in range(threads)]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        print(f"{shard_count:>7} {threads:>8} {3 * len(latencies) / elapsed:>9.0f} "
+              f"{latencies[len(latencies) // 2] * 1000:>8.2f} {latencies[int(len(latencies) * 0.99)] * 1000:>8.2f}")
+        del service
+        gc.unfreeze()
+        gc.collect()
+
+
+def bench_conditional(size: int, repeat: int):
+    """Опрос без изменений: полный ответ против not_modified по if_version (обработчик и сериализация)"""
+    service = DictionaryService()
+    service.load_seed(TermRecord.from_data(term_data) for term_data in generate_terms(size))
+    servicer = DictionaryServicer(service)
+    cases = [
+        ("GetTerm", servicer.GetTerm, dictionary_pb2.GetTermRequest(term="gRPC")),
+        ("GetAllTerms x50", servicer.GetAllTerms, dictionary_pb2.GetAllRequest(page_size=50)),
+        ("SearchTerms x50", servicer.SearchTerms, dictionary_pb2.SearchRequest(query="container", limit=50)),
+    ]
+    print(f"{'method':>16} {'full, B':>8} {'full, us':>9} {'cond, B':>8} {'cond, us':>9}")
+    for name, method, request in cases:
+        request.if_version = method(request, None).version
+        assert method(request, None).not_modified
+        full_request = type(request)()
+        full_request.CopyFrom(request)
+        full_request.if_version = 0
+        full_bytes = len(method(full_request, None).SerializeToString())
+        cond_bytes = len(method(request, None).SerializeToString())
+        full_us = timeit(lambda: method(full_request, None).SerializeToString(), repeat) * 1000
+        cond_us = timeit(lambda: method(request, None).SerializeToString(), repeat) * 1000
+        print(f"{name:>16} {full_bytes:>8} {full_us:>9.1f} {cond_bytes:>8} {cond_us:>9.1f}")
+
+
+def bench_projection(size: int, repeat: int):
+    """Страница списка целиком против проекции term + category (обработчик и сериализация)"""
+    service = DictionaryService()
+    service.load_seed(TermRecord.from_data(term_data) for term_data in generate_terms(size))
+    servicer = DictionaryServicer(service)
+    mask = {"paths": ["term", "category"]}
+    cases = [
+        ("GetAllTerms x50", servicer.GetAllTerms, lambda fields: dictionary_pb2.GetAllRequest(
+            page_size=50, fields=fields)),
+        ("GetAllTerms x500", servicer.GetAllTerms, lambda fields: dictionary_pb2.GetAllRequest(
+            page_size=500, fields=fields)),
+        ("SearchTerms x50", servicer.SearchTerms, lambda fields: dictionary_pb2.SearchRequest(
+            query="gateway", category="Storage", limit=50, fields=fields)),
+        ("ByCategory", servicer.GetTermsByCategory, lambda fields: dictionary_pb2.CategoryRequest(
+            category="Storage", fields=fields)),
+    ]
+    print(f"{'method':>16} {'terms':>6} {'full, KB':>9} {'full, ms':>9} {'mask, KB':>9} {'mask, ms':>9}")
+    for name, method, make_request in cases:
+        full_request, mask_request = make_request(None), make_request(mask)
+        count = len(method(full_request, None).terms)
+        full_kb = len(method(full_request, None).SerializeToString()) / 1024
+        mask_kb = len(method(mask_request, None).SerializeToString()) / 1024
+        runs = max(repeat // count, 3) if count else repeat
+        full_ms = timeit(lambda: method(full_request, None).SerializeToString(), runs)
+        mask_ms = timeit(lambda: method(mask_request, None).SerializeToString(), runs)
+        print(f"{name:>16} {count:>6} {full_kb:>9.1f} {full_ms:>9.2f} {mask_kb:>9.1f} {mask_ms:>9.2f}")
+
+
+def replication_primary(size: int, port: int, commands, done):
+    """Ведущий в отдельном процессе: словарь, gRPC-сервер и записи с частотой из очереди команд"""
+    service = DictionaryService()
+    service.load_seed(TermRecord.from_data(term_data) for term_data in generate_terms(size))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    dictionary_pb2_grpc.add_DictionaryServiceServicer_to_server(DictionaryServicer(service), server)
+    server.add_insecure_port(f"127.0.0.1:{port}")
+    server.start()
+    done.put(None)
+    counter = 0
+    for rate, seconds in iter(commands.get, None):
+        deadline = time.perf_counter()
+        for _ in range(int(rate * seconds)):
+            counter += 1
+            term = f"Replicated-{counter}"
+            with service.writer(term):
+                service.add_term({"term": term, "definition": "replication load", "category": "Load",
+                                  "related_terms": [], "source": "Benchmark", "created_at": "", "updated_at": ""})
+            deadline += 1 / rate
+            pause = deadline - time.perf_counter()
+            if pause > 0:
+                time.sleep(pause)
+        done.put(None)
+    server.stop(0)
+
+
+def bench_replication(size: int, rates: List[int], seconds: float, shard_count: int):
+    """Загрузка реплики (StreamSnapshot против StreamAllTerms) и отставание при потоке записей.
+
+    Ведущий создаётся в дочернем процессе до первого объекта gRPC в этом, иначе fork небезопасен.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    context = multiprocessing.get_context("fork")
+    commands, done = context.Queue(), context.Queue()
+    primary = context.Process(target=replication_primary, args=(size, port, commands, done))
+    primary.start()
+    done.get()
+    address = f"127.0.0.1:{port}"
+
+    channel = grpc.insecure_channel(address, options=CHANNEL_OPTIONS)
+    stub = dictionary_pb2_grpc.DictionaryServiceStub(channel)
+    started = time.perf_counter()
+    streamed = sum(1 for _ in stub.StreamAllTerms(dictionary_pb2.StreamAllRequest()))
+    print(f"StreamAllTerms: {streamed} terms read in {time.perf_counter() - started:.1f} s")
+    channel.close()
+
+    service = DictionaryService(primary=address, shard_count=shard_count)
+    delays: List[float] = []
+    apply_event = service.apply_event
+
+    def timed_apply(event):
+        apply_event(event)
+        delays.append(time.time() - event.published_at_us / 1_000_000)
+
+    service.apply_event = timed_apply
+    follower = Follower(service, address)
+    started = time.perf_counter()
+    follower.start()
+    follower.wait_bootstrapped()
+    print(f"StreamSnapshot: {len(service.terms)} terms loaded in {time.perf_counter() - started:.1f} s")
+    # Отставание меряется после фоновой достройки индексов реплики
+    service.indexes_ready.wait()
+    print(f"Indexes built in {time.perf_counter() - started:.1f} s")
+
+    print(f"{'writes/s':>9} {'events':>7} {'p50, ms':>8} {'p99, ms':>8} {'max, ms':>8}")
+    for rate in rates:
+        delays.clear()
+        expected = service.feed.revision + int(rate * seconds)
+        commands.put((rate, seconds))
+        done.get()
+        while service.feed.revision < expected:
+            time.sleep(0.01)
+        delays.sort()
+        print(f"{rate:>9} {len(delays):>7} {delays[len(delays) // 2] * 1000:>8.2f} "
+              f"{delays[int(len(delays) * 0.99)] * 1000:>8.2f} {delays[-1] * 1000:>8.2f}")
+    commands.put(None)
+    primary.join()
+
+
+def current_rss() -> int:
+    """Текущий RSS процесса в байтах (Linux)"""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize()
+
+
+def soak_run(mode: str, size: int, rate: int, seconds: int, ttl: int, results):
+    """Долгий прогон add_unique_term из Locust в виртуальном времени; выполняется в отдельном процессе"""
+    cap = size + rate * ttl if mode == "max-terms" else 0
+    service = DictionaryService(max_terms=cap, eviction="oldest")
+    service.load_seed(TermRecord.from_data(term_data) for term_data in generate_terms(size))
+    servicer = DictionaryServicer(service)
+    # Запрос короче триграммы: SearchTerms перебирает весь словарь
+    search = dictionary_pb2.SearchRequest(query="zq", limit=50)
+    gc.collect()
+    gc.freeze()
+    # Виртуальные часы: секунда прогона — rate добавлений и проход сборщика сроков
+    clock = time.time_ns() // 1000
+    rows = []
+    added_time = 0.0
+    for second in range(1, seconds + 1):
+        clock += 1_000_000
+        expires_at = format_timestamp(clock + ttl * 1_000_000) if mode == "ttl" else ""
+        started = time.perf_counter()
+        for i in range(rate):
+            term = f"LoadTest_{second}_{i}"
+            with service.writer(term):
+                service.add_term({"term": term, "definition": "Definition for load testing",
+                                  "category": "LoadTest", "related_terms": ["test", "performance"],
+                                  "source": "Locust", "created_at": "", "updated_at": "",
+                                  "expires_at": expires_at})
+            service.evict()
+        service.expire(now=clock)
+        added_time += time.perf_counter() - started
+        if second % (seconds // 4) == 0:
+            search_ms = timeit(lambda: servicer.SearchTerms(search, None), 20)
+            rows.append((second, len(service.terms), current_rss() / 2 ** 20,
+                         added_time * 1_000_000 / (rate * (seconds // 4)), search_ms))
+            added_time = 0.0
+    results.put(rows)
+
+
+def bench_soak(size: int, rate: int, seconds: int, ttl: int):
+    """Рост словаря, памяти и задержек без ограничений, со сроком жизни и с --max-terms"""
+    ctx = multiprocessing.get_context("fork")
+    print(f"{'mode':>10} {'second':>7} {'terms':>8} {'RSS, MB':>8} {'add, us':>8} {'search, ms':>11}")
+    for mode in ("none", "ttl", "max-terms"):
+        results = ctx.Queue()
+        process = ctx.Process(target=soak_run, args=(mode, size, rate, seconds, ttl, results))
+        process.start()
+        for second, terms, rss, add_us, search_ms in results.get():
+            print(f"{mode:>10} {second:>7} {terms:>8} {rss:>8.0f} {add_us:>8.0f} {search_ms:>11.2f}")
+        process.join()
+
+
+def parse_sizes(value: str) -> List[int]:
+    return [int(size) for size in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки DictionaryService")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    search = subparsers.add_parser("search", help="SearchTerms: полный перебор против триграммного индекса")
+    search.add_argument("--sizes", type=parse_sizes, default=[10_000, 100_000, 1_000_000])
+    search.add_argument("--repeat", type=int, default=5)
+
+    responses = subparsers.add_parser("responses", help="TermResponse: сборка на каждый запрос против кэша")
+    responses.add_argument("--size", type=int, default=100_000)
+    responses.add_argument("--repeat", type=int, default=1000)
+
+    related = subparsers.add_parser("related", help="GetRelatedTerms: BFS по графу связей и кеш обходов")
+    related.add_argument("--size", type=int, default=100_000)
+    related.add_argument("--degree", type=int, default=10)
+    related.add_argument("--repeat", type=int, default=20)
+
+    memory = subparsers.add_parser("memory", help="Память на термин: словарь и TermResponse против TermRecord")
+    memory.add_argument("--size", type=int, default=1_000_000)
+
+    seed = subparsers.add_parser("seed", help="Время старта с --seed-file на JSON Lines и protobuf")
+    seed.add_argument("--size", type=int, default=1_000_000)
+    seed.add_argument("--output", help="сохранить файл словаря сюда (формат по расширению)")
+
+    interceptor = subparsers.add_parser("interceptor", help="Накладные расходы перехватчика метрик на RPC")
+    interceptor.add_argument("--repeat", type=int, default=100_000)
+
+    suggest = subparsers.add_parser("suggest", help="SuggestTerms: индекс префиксов против SearchTerms")
+    suggest.add_argument("--size", type=int, default=100_000)
+    suggest.add_argument("--repeat", type=int, default=10_000)
+
+    fuzzy = subparsers.add_parser("fuzzy", help="FuzzySearch: обход индекса префиксов против полного перебора")
+    fuzzy.add_argument("--size", type=int, default=100_000)
+    fuzzy.add_argument("--repeat", type=int, default=100)
+
+    writes = subparsers.add_parser("writes", help="Пропускная способность записи в зависимости от числа шардов")
+    writes.add_argument("--size", type=int, default=1_000_000)
+    writes.add_argument("--shards", type=parse_sizes, default=[1, 4, 8])
+    writes.add_argument("--threads", type=int, default=8)
+    writes.add_argument("--count", type=int, default=500, help="циклов добавление/обновление/удаление на поток")
+
+    conditional = subparsers.add_parser("conditional", help="Условные чтения: полный ответ против not_modified")
+    conditional.add_argument("--size", type=int, default=100_000)
+    conditional.add_argument("--repeat", type=int, default=200)
+
+    projection = subparsers.add_parser("projection", help="Списки: полный TermResponse против маски полей")
+    projection.add_argument("--size", type=int, default=100_000)
+    projection.add_argument("--repeat", type=int, default=5000)
+
+    replication = subparsers.add_parser("replication", help="Реплика: время загрузки и отставание от ведущего")
+    replication.add_argument("--size", type=int, default=200_000)
+    replication.add_argument("--rates", type=parse_sizes, default=[500, 2000], help="записей в секунду на ведущем")
+    replication.add_argument("--seconds", type=float, default=5.0, help="длительность каждой фазы записи")
+    replication.add_argument("--shards", type=int, default=1, help="шарды словаря реплики")
+
+    soak = subparsers.add_parser("soak", help="Долгая запись уникальных терминов: срок жизни и предел размера")
+    soak.add_argument("--size", type=int, default=100_000)
+    soak.add_argument("--rate", type=int, default=500, help="добавлений в виртуальную секунду")
+    soak.add_argument("--seconds", type=int, default=240, help="длительность прогона в виртуальных секундах")
+    soak.add_argument("--ttl", type=int, default=60, help="срок жизни терминов; предел — size + rate * ttl")
+
+    args = parser.parse_args()
+    if args.command == "search":
+        bench_search(args.sizes, args.repeat)
+    elif args.command == "responses":
+        bench_responses(args.size, args.repeat)
+    elif args.command == "related":
+        bench_related(args.size, args.degree, args.repeat)
+    elif args.command == "memory":
+        bench_memory(args.size)
+    elif args.command == "seed":
+        bench_seed(args.size, args.output)
+    elif args.command == "interceptor":
+        bench_interceptor(args.repeat)
+    elif args.command == "suggest":
+        bench_suggest(args.size, args.repeat)
+    elif args.command == "fuzzy":
+        bench_fuzzy(args.size, args.repeat)
+    elif args.command == "writes":
+        bench_writes(args.size, args.shards, args.threads, args.count)
+    elif args.command == "conditional":
+        bench_conditional(args.size, args.repeat)
+    elif args.command == "projection":
+        bench_projection(args.size, args.repeat)
+    elif args.command == "replication":
+        bench_replication(args.size, args.rates, args.seconds, args.shards)
+    elif args.command == "soak":
+        bench_soak(args.size, args.rate, args.seconds, args.ttl)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import itertools
+import threading
+import time
+from collections import deque
+from typing import List, NamedTuple, Optional
+
+from storage import TermRecord
+
+ADDED = 0
+UPDATED = 1
+DELETED = 2
+
+# Заголовки начальных метаданных WatchTerms: ревизия, с которой идёт поток,
+# и эпоха — случайная основа версий запуска сервера (меняется при перезапуске)
+WATCH_REVISION_HEADER = "dictionary-revision"
+WATCH_EPOCH_HEADER = "dictionary-epoch"
+
+
+class ChangeEvent(NamedTuple):
+    revision: int
+    type: int
+    term: str
+    # Новая запись термина; None для удаления
+    record: Optional[TermRecord]
+    # Время публикации, микросекунды от эпохи
+    published_at: int
+
+
+class RevisionUnavailable(ValueError):
+    """Запрошенной ревизии нет в буфере: клиенту нужна полная пересинхронизация"""
+
+
+class ChangeFeed:
+    """Кольцевой буфер последних изменений словаря с монотонными ревизиями.
+
+    Начальное состояние (загрузка, восстановление) — ревизия 1, каждое
+    следующее изменение увеличивает её на единицу. Буфер хранит не больше
+    capacity событий; подписчик, отставший сильнее, получает RevisionUnavailable.
+    """
+
+    def __init__(self, capacity: int):
+        self._events: "deque[ChangeEvent]" = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self.revision = 1
+
+    def publish(self, event_type: int, term: str, record: Optional[TermRecord] = None) -> int:
+        """Добавляет событие; вызывать под блокировкой писателя, чтобы порядок совпадал со снимками"""
+        with self._cond:
+            self.revision += 1
+            self._events.append(ChangeEvent(self.revision, event_type, term, record, time.time_ns() // 1000))
+            self._cond.notify_all()
+            return self.revision
+
+    def reset(self, revision: int):
+        """Начинает ленту с revision, забывая буфер (реплика после загрузки снимка ведущего).
+
+        Подписчики с более старой ревизией получат RevisionUnavailable и пересинхронизируются.
+        """
+        with self._cond:
+            self._events.clear()
+            self.revision = revision
+            self._cond.notify_all()
+
+    def since(self, revision: int) -> List[ChangeEvent]:
+        """События с ревизией больше revision"""
+        with self._cond:
+            if revision > self.revision:
+                raise RevisionUnavailable(
+                    f"Revision {revision} is ahead of the current revision {self.revision}")
+            oldest = self._events[0].revision if self._events else self.revision + 1
+            if revision < oldest - 1:
+                raise RevisionUnavailable(
+                    f"Revision {revision} is no longer available, oldest buffered revision is {oldest}")
+            # Ревизии в буфере идут подряд, так что позиция вычисляется
+            return list(itertools.islice(self._events, revision - oldest + 1, None))
+
+    def wait(self, revision: int, timeout: float) -> bool:
+        """Ждёт события новее revision не дольше timeout секунд"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.revision > revision, timeout)
@@ -7,9 +7,13 @@ class DictionaryClient:
         self.channel = grpc.insecure_channel(f'{host}:{port}')
         self.stub = dictionary_pb2_grpc.DictionaryServiceStub(self.channel)
     
-    def get_term(self, term):
+    def get_term(self, term, normalized=False, if_version=0):
         try:
-            response = self.stub.GetTerm(dictionary_pb2.GetTermRequest(term=term))
+            response = self.stub.GetTerm(dictionary_pb2.GetTermRequest(
+                term=term,
+                normalized=normalized,
+                if_version=if_version
+            ))
             return response
         except grpc.RpcError as e:
             print(f"Error getting term: {e.details()}")
@@ -32,27 +36,106 @@ class DictionaryClient:
             print(f"Error adding term: {e.details()}")
             return None
     
-    def get_all_terms(self, page=1, page_size=10):
+    def get_all_terms(self, page=1, page_size=10, page_token="", if_version=0, fields=None):
         try:
             response = self.stub.GetAllTerms(dictionary_pb2.GetAllRequest(
                 page=page,
-                page_size=page_size
+                page_size=page_size,
+                page_token=page_token,
+                if_version=if_version,
+                fields={"paths": fields or []}
             ))
             return response
         except grpc.RpcError as e:
             print(f"Error getting all terms: {e.details()}")
             return None
     
-    def search_terms(self, query, category=None):
+    def search_terms(self, query, category=None, limit=0, page_token="", if_version=0, fields=None):
         try:
             response = self.stub.SearchTerms(dictionary_pb2.SearchRequest(
                 query=query,
-                category=category or ""
+                category=category or "",
+                limit=limit,
+                page_token=page_token,
+                if_version=if_version,
+                fields={"paths": fields or []}
             ))
             return response
         except grpc.RpcError as e:
             print(f"Error searching terms: {e.details()}")
             return None
+    
+    def suggest_terms(self, prefix, limit=0):
+        try:
+            response = self.stub.SuggestTerms(dictionary_pb2.SuggestRequest(prefix=prefix, limit=limit))
+            return response
+        except grpc.RpcError as e:
+            print(f"Error suggesting terms: {e.details()}")
+            return None
+    
+    def fuzzy_search(self, query, max_distance=None, limit=0):
+        try:
+            response = self.stub.FuzzySearch(dictionary_pb2.FuzzySearchRequest(
+                query=query,
+                max_distance=max_distance,
+                limit=limit
+            ))
+            return response
+        except grpc.RpcError as e:
+            print(f"Error fuzzy searching terms: {e.details()}")
+            return None
+    
+    def stream_all_terms(self, category=""):
+        try:
+            for response in self.stub.StreamAllTerms(dictionary_pb2.StreamAllRequest(category=category)):
+                yield response
+        except grpc.RpcError as e:
+            print(f"Error streaming terms: {e.details()}")
+    
+    def get_related_terms(self, term, depth=1):
+        try:
+            response = self.stub.GetRelatedTerms(dictionary_pb2.RelatedTermsRequest(
+                term=term,
+                depth=depth
+            ))
+            return response
+        except grpc.RpcError as e:
+            print(f"Error getting related terms: {e.details()}")
+            return None
+    
+    def batch_get_terms(self, terms):
+        try:
+            response = self.stub.BatchGetTerms(dictionary_pb2.BatchGetRequest(terms=terms))
+            return response
+        except grpc.RpcError as e:
+            print(f"Error getting terms: {e.details()}")
+            return None
+    
+    def bulk_add_terms(self, terms):
+        """Импорт терминов одним клиентским потоком (terms — словари с полями AddTermRequest)"""
+        try:
+            requests = (dictionary_pb2.AddTermRequest(**term_data) for term_data in terms)
+            response = self.stub.BulkAddTerms(requests)
+            return response
+        except grpc.RpcError as e:
+            print(f"Error adding terms: {e.details()}")
+            return None
+    
+    def watch_terms(self, from_revision=0):
+        """События изменений словаря; поток не завершается, пока его не прервут"""
+        try:
+            for event in self.stub.WatchTerms(dictionary_pb2.WatchRequest(from_revision=from_revision)):
+                yield event
+        except grpc.RpcError as e:
+            print(f"Error watching terms: {e.details()}")
+    
+    def list_categories(self):
+        try:
+            response = self.stub.ListCategories(dictionary_pb2.ListCategoriesRequest())
+            return response
+        except grpc.RpcError as e:
+            print(f"Error listing categories: {e.details()}")
+            return None
 
 def main():
     client = DictionaryClient()
@@ -0,0 +1,51 @@
+"""Сроки жизни терминов и ограничение размера словаря.
+
+Сроки лежат в куче (срок, термин): фоновый поток снимает с вершины только
+наступившие сроки и словарь не обходит. При удалении или обновлении термина
+запись кучи не ищется — при снятии срок сверяется с текущей записью
+термина, и устаревшие записи просто отбрасываются.
+"""
+import heapq
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Политики вытеснения при достижении --max-terms:
+#   expiring — сначала термины со сроком жизни, ближайшие к истечению, затем самые старые;
+#   oldest   — самые давно добавленные термины;
+#   reject   — новые термины отклоняются с RESOURCE_EXHAUSTED
+EVICTION_POLICIES = ("expiring", "oldest", "reject")
+DEFAULT_EVICTION = "expiring"
+
+
+class ExpiryQueue:
+    """Куча сроков жизни: (срок в микросекундах, термин)"""
+
+    def __init__(self):
+        self._heap: List[Tuple[int, str]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, term: str, expires_at: int):
+        with self._lock:
+            heapq.heappush(self._heap, (expires_at, term))
+
+    def pop(self, limit: int, until: Optional[int] = None) -> List[Tuple[int, str]]:
+        """До limit ближайших сроков; с until — только сроки не позже него"""
+        due = []
+        with self._lock:
+            while self._heap and len(due) < limit and (until is None or self._heap[0][0] <= until):
+                due.append(heapq.heappop(self._heap))
+        return due
+
+
+def parse_retention(items: Iterable[str]) -> Dict[str, int]:
+    """Сроки хранения категорий из строк вида «LoadTest=600» (секунды)"""
+    retention = {}
+    for item in items:
+        category, separator, seconds = item.rpartition("=")
+        if not separator or not seconds.isdigit() or int(seconds) < 1:
+            raise ValueError(f"invalid retention '{item}', expected CATEGORY=SECONDS")
+        retention[category] = int(seconds)
+    return retention
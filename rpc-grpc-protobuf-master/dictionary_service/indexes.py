@@ -0,0 +1,559 @@
+import bisect
+import heapq
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict, defaultdict, deque
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+NGRAM_SIZE = 3
+# Ключей в блоке SortedKeys: запись копирует один блок и список блоков
+KEY_BLOCK_SIZE = 1000
+
+
+def fold(text: str) -> str:
+    """Ключ без учёта регистра и вариантов записи Unicode (NFKC + casefold)"""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def ngrams(text: str, n: int = NGRAM_SIZE) -> Set[str]:
+    """Множество n-грамм строки (строка должна быть уже в нижнем регистре)"""
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class TrigramIndex:
+    """Инвертированный индекс триграмм для поиска подстрок.
+
+    Для каждого термина индексируются триграммы полей в нижнем регистре.
+    Индекс возвращает только кандидатов: окончательная проверка вхождения
+    подстроки остаётся за вызывающим кодом, поэтому семантика поиска
+    совпадает с полным перебором.
+
+    Постинги — отсортированные массивы 32-битных id: на миллионе терминов
+    это в разы компактнее множеств Python. Новые id растут монотонно,
+    поэтому добавление термина — дописывание в конец массива.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, array] = {}
+        self._doc_ids: Dict[str, int] = {}
+        self._keys: Dict[int, str] = {}
+        self._next_id = 0
+
+    @staticmethod
+    def _grams(texts: Iterable[str]) -> Set[str]:
+        grams: Set[str] = set()
+        for text in texts:
+            grams |= ngrams(text.lower())
+        return grams
+
+    def add(self, key: str, texts: Iterable[str]):
+        doc_id = self._next_id
+        self._next_id += 1
+        self._doc_ids[key] = doc_id
+        self._keys[doc_id] = key
+        for gram in self._grams(texts):
+            self._posting(gram).append(doc_id)
+
+    def add_many(self, items: Iterable[Tuple[str, Iterable[str]]]):
+        """Групповое добавление: постинги пополняются пачками, а не по одному id"""
+        batch: Dict[str, List[int]] = defaultdict(list)
+        for key, texts in items:
+            doc_id = self._next_id
+            self._next_id += 1
+            self._doc_ids[key] = doc_id
+            self._keys[doc_id] = key
+            for gram in self._grams(texts):
+                batch[gram].append(doc_id)
+        for gram, doc_ids in batch.items():
+            self._posting(gram).extend(doc_ids)
+
+    def _posting(self, gram: str) -> array:
+        posting = self._postings.get(gram)
+        if posting is None:
+            posting = self._postings[gram] = array("I")
+        return posting
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._doc_ids
+
+    def update(self, key: str, old_texts: Iterable[str], new_texts: Iterable[str]):
+        # Идентификатор документа сохраняется, чтобы не менялся порядок выдачи
+        doc_id = self._doc_ids.get(key)
+        if doc_id is None:
+            # Термин ещё не проиндексирован (индекс строится в фоне)
+            self.add(key, new_texts)
+            return
+        old_grams = self._grams(old_texts)
+        new_grams = self._grams(new_texts)
+        for gram in old_grams - new_grams:
+            self._discard(gram, doc_id)
+        for gram in new_grams - old_grams:
+            posting = self._posting(gram)
+            posting.insert(bisect.bisect_left(posting, doc_id), doc_id)
+
+    def remove(self, key: str, texts: Iterable[str]):
+        doc_id = self._doc_ids.pop(key, None)
+        if doc_id is None:
+            return
+        del self._keys[doc_id]
+        for gram in self._grams(texts):
+            self._discard(gram, doc_id)
+
+    def _discard(self, gram: str, doc_id: int):
+        posting = self._postings.get(gram)
+        if posting is not None:
+            index = bisect.bisect_left(posting, doc_id)
+            if index < len(posting) and posting[index] == doc_id:
+                del posting[index]
+            if not posting:
+                del self._postings[gram]
+
+    def estimate(self, text: str) -> Optional[int]:
+        """Верхняя оценка числа терминов, содержащих text (None для коротких строк)"""
+        grams = ngrams(text)
+        if not grams:
+            return None
+        return min(len(self._postings.get(gram, ())) for gram in grams)
+
+    def candidates(self, query: str) -> Optional[List[str]]:
+        """Ключи терминов, которые могут содержать query, в порядке добавления.
+
+        Возвращает None, если запрос короче n-граммы и индекс не может
+        сузить выборку — тогда нужен полный перебор.
+        """
+        grams = ngrams(query)
+        if not grams:
+            return None
+
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if not posting:
+                return []
+            postings.append(posting)
+
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result.intersection_update(posting)
+            if not result:
+                return []
+
+        # Термин мог быть удалён параллельной записью — такие кандидаты пропускаются
+        keys = map(self._keys.get, sorted(result))
+        return [key for key in keys if key is not None]
+
+
+class CategoryIndex:
+    """Вторичный индекс категория -> термины (в порядке добавления)"""
+
+    def __init__(self):
+        self._terms: Dict[str, Dict[str, None]] = {}
+
+    def add(self, category: str, key: str):
+        self._terms.setdefault(category, {})[key] = None
+
+    def remove(self, category: str, key: str):
+        keys = self._terms.get(category)
+        if keys is None:
+            return
+        keys.pop(key, None)
+        if not keys:
+            del self._terms[category]
+
+    def terms(self, category: str) -> List[str]:
+        return list(self._terms.get(category, ()))
+
+    def counts(self) -> Dict[str, int]:
+        """Число терминов в каждой категории, отсортированное по названию"""
+        return {category: len(keys) for category, keys in sorted(self._terms.items())}
+
+
+class SortedKeys:
+    """Отсортированное множество строк с копированием при записи.
+
+    Ключи лежат блоками до 2 * KEY_BLOCK_SIZE. Запись копирует один блок и
+    списки блоков и их максимумов, после чего новое состояние подменяется
+    одним присваиванием — как корзины TermStore. Читатель берёт состояние
+    один раз и обходит его целиком, не видя сдвигов от параллельных записей.
+    """
+
+    def __init__(self):
+        # (блоки, последний ключ каждого блока, число ключей)
+        self._state: Tuple[List[List[str]], List[str], int] = ([], [], 0)
+
+    def __len__(self) -> int:
+        return self._state[2]
+
+    def __contains__(self, key: str) -> bool:
+        blocks, maxes, _ = self._state
+        i = bisect.bisect_left(maxes, key)
+        if i == len(blocks):
+            return False
+        block = blocks[i]
+        return block[bisect.bisect_left(block, key)] == key
+
+    def add(self, key: str) -> bool:
+        """Добавляет key; False, если он уже есть"""
+        blocks, maxes, size = self._state
+        if not blocks:
+            self._state = ([[key]], [key], 1)
+            return True
+        i = min(bisect.bisect_left(maxes, key), len(blocks) - 1)
+        block = blocks[i]
+        j = bisect.bisect_left(block, key)
+        if j < len(block) and block[j] == key:
+            return False
+        block = block[:j] + [key] + block[j:]
+        blocks, maxes = blocks[:], maxes[:]
+        if len(block) > 2 * KEY_BLOCK_SIZE:
+            half = len(block) // 2
+            blocks[i:i + 1] = [block[:half], block[half:]]
+            maxes[i:i + 1] = [block[half - 1], block[-1]]
+        else:
+            blocks[i] = block
+            maxes[i] = block[-1]
+        self._state = (blocks, maxes, size + 1)
+        return True
+
+    def remove(self, key: str) -> bool:
+        """Удаляет key; False, если его не было"""
+        blocks, maxes, size = self._state
+        i = bisect.bisect_left(maxes, key)
+        if i == len(blocks):
+            return False
+        block = blocks[i]
+        j = bisect.bisect_left(block, key)
+        if block[j] != key:
+            return False
+        blocks, maxes = blocks[:], maxes[:]
+        if len(block) == 1:
+            del blocks[i], maxes[i]
+        else:
+            block = block[:j] + block[j + 1:]
+            blocks[i] = block
+            maxes[i] = block[-1]
+        self._state = (blocks, maxes, size - 1)
+        return True
+
+    def update(self, keys: Iterable[str]):
+        """Добавляет много ключей разом: слияние и разбиение на блоки за O(N)"""
+        blocks, _, size = self._state
+        new_keys = set(keys)
+        if size:
+            new_keys = [key for key in new_keys if key not in self]
+        new_keys = sorted(new_keys)
+        if not new_keys:
+            return
+        # Два отсортированных прогона timsort сливает за линейное время
+        merged = list(chain.from_iterable(blocks)) + new_keys
+        merged.sort()
+        blocks = [merged[i:i + KEY_BLOCK_SIZE] for i in range(0, len(merged), KEY_BLOCK_SIZE)]
+        self._state = (blocks, [block[-1] for block in blocks], len(merged))
+
+    def layout(self) -> Tuple[List[List[str]], List[str]]:
+        """Блоки и их последние ключи из одного состояния; менять их нельзя"""
+        blocks, maxes, _ = self._state
+        return blocks, maxes
+
+    def iter_from(self, key: str, inclusive: bool = True) -> Iterator[str]:
+        """Ключи не меньше key (строго больше при inclusive=False) по порядку"""
+        blocks, maxes, _ = self._state
+        find = bisect.bisect_left if inclusive else bisect.bisect_right
+        i = find(maxes, key)
+        if i == len(blocks):
+            return iter(())
+        block = blocks[i]
+        return chain(islice(block, find(block, key), None), chain.from_iterable(blocks[i + 1:]))
+
+    def slice(self, start: int, count: int) -> List[str]:
+        """count ключей с позиции start; блоки до start пропускаются по длине"""
+        blocks = self._state[0]
+        for i, block in enumerate(blocks):
+            if start < len(block):
+                return list(islice(chain(islice(block, start, None), chain.from_iterable(blocks[i + 1:])), count))
+            start -= len(block)
+        return []
+
+
+class OrderedKeyIndex:
+    """Отсортированный список ключей для постраничного обхода.
+
+    Страница по курсору стоит O(log N + page_size) и не сдвигается при
+    удалении терминов, расположенных до курсора.
+    """
+
+    def __init__(self):
+        self._keys = SortedKeys()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, key: str):
+        self._keys.add(key)
+
+    def add_many(self, keys: Iterable[str]):
+        self._keys.update(keys)
+
+    def remove(self, key: str):
+        self._keys.remove(key)
+
+    def after(self, key: Optional[str], count: int) -> List[str]:
+        """До count ключей, строго больших key (с начала, если key не задан)"""
+        if key is None:
+            return self._keys.slice(0, count)
+        return list(islice(self._keys.iter_from(key, inclusive=False), count))
+
+    def slice(self, start: int, count: int) -> List[str]:
+        return self._keys.slice(start, count)
+
+
+class PrefixIndex:
+    """Нормализованные имена: поиск по ключу, автодополнение и опечатки.
+
+    Имена приводятся к fold(), так что «grpc», «gRPC» и «ＧＲＰＣ»
+    совпадают, а кириллица сравнивается без учёта регистра. Поиск по
+    нормализованному ключу — O(1) по словарю, префиксный запрос —
+    двоичный поиск по отсортированным ключам, O(log N + limit).
+    """
+
+    def __init__(self):
+        self._keys = SortedKeys()
+        # Нормализованный ключ -> исходные имена в порядке добавления
+        self._terms: Dict[str, Dict[str, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add(self, term: str):
+        key = fold(term)
+        terms = self._terms.get(key)
+        if terms is None:
+            self._terms[key] = {term: None}
+            self._keys.add(key)
+        else:
+            terms[term] = None
+
+    def add_many(self, terms: Iterable[str]):
+        new_keys = []
+        for term in terms:
+            key = fold(term)
+            existing = self._terms.get(key)
+            if existing is None:
+                self._terms[key] = {term: None}
+                new_keys.append(key)
+            else:
+                existing[term] = None
+        self._keys.update(new_keys)
+
+    def remove(self, term: str):
+        key = fold(term)
+        terms = self._terms.get(key)
+        if terms is None:
+            return
+        terms.pop(term, None)
+        if not terms:
+            del self._terms[key]
+            self._keys.remove(key)
+
+    def lookup(self, term: str) -> List[str]:
+        """Имена с тем же нормализованным ключом, что у term, в порядке добавления"""
+        return list(self._terms.get(fold(term), ()))
+
+    def complete(self, prefix: str, limit: int) -> List[str]:
+        """До limit имён, нормализованный ключ которых начинается с prefix.
+
+        Порядок — по нормализованному ключу, так что точное совпадение и
+        более короткие имена идут первыми.
+        """
+        prefix = fold(prefix)
+        results: List[str] = []
+        for key in self._keys.iter_from(prefix):
+            if len(results) >= limit or not key.startswith(prefix):
+                break
+            # Ключ мог быть удалён параллельной записью
+            results.extend(self._terms.get(key, ()))
+        return results[:limit]
+
+
+    def fuzzy(self, query: str, max_distance: int, limit: int) -> List[Tuple[str, int]]:
+        """До limit имён с расстоянием Левенштейна до query не больше max_distance.
+
+        Отсортированные ключи обходятся как неявное префиксное дерево:
+        строки таблицы расстояний общего префикса соседних ключей
+        переиспользуются, а если минимум строки уже больше порога, все
+        ключи с этим префиксом пропускаются двоичным поиском. Так
+        проверяется лишь малая часть словаря. Результат — пары
+        (имя, расстояние) по возрастанию расстояния, затем ключа.
+        """
+        query = fold(query)
+        blocks, maxes = self._keys.layout()
+        best: List[Tuple[int, int, int, str]] = []  # куча (-расстояние, -блок, -номер, ключ)
+        # rows[d] — расстояния от query[:j] до первых d символов текущего ключа
+        rows = [list(range(len(query) + 1))]
+        previous = ""
+        block, index = 0, 0
+        while block < len(blocks):
+            keys = blocks[block]
+            if index == len(keys):
+                block, index = block + 1, 0
+                continue
+            key = keys[index]
+            depth = _common_prefix(previous, key, len(rows) - 1)
+            del rows[depth + 1:]
+            while depth < len(key):
+                row = _next_row(rows[depth], query, key[depth], depth + 1)
+                rows.append(row)
+                depth += 1
+                if min(row) > max_distance:
+                    break
+            previous = key[:depth]
+            if min(rows[depth]) > max_distance:
+                # Ни одно продолжение префикса не уложится в порог
+                index = _prefix_end(keys, previous, index + 1)
+                if index == len(keys):
+                    # Ключи с этим префиксом могут занимать и следующие блоки
+                    block = _prefix_end(maxes, previous, block + 1)
+                    if block < len(blocks):
+                        index = _prefix_end(blocks[block], previous, 0)
+                continue
+            distance = rows[depth][-1]
+            if depth == len(key) and distance <= max_distance:
+                heapq.heappush(best, (-distance, -block, -index, key))
+                if len(best) > limit:
+                    heapq.heappop(best)
+                if len(best) == limit:
+                    # Дальше нужны только строго лучшие совпадения
+                    max_distance = -best[0][0] - 1
+            index += 1
+
+        results: List[Tuple[str, int]] = []
+        for negative_distance, _, _, key in sorted(best, reverse=True):
+            results.extend((term, -negative_distance) for term in self._terms.get(key, ()))
+        return results[:limit]
+
+
+def _common_prefix(a: str, b: str, limit: int) -> int:
+    length = min(len(a), len(b), limit)
+    for i in range(length):
+        if a[i] != b[i]:
+            return i
+    return length
+
+
+def _next_row(row: List[int], query: str, char: str, depth: int) -> List[int]:
+    """Следующая строка таблицы Левенштейна после символа char ключа"""
+    # Без вызова min(): строка считается на каждый посещённый префикс
+    new_row = [depth]
+    left = depth
+    for j, query_char in enumerate(query):
+        left += 1
+        above = row[j + 1] + 1
+        if above < left:
+            left = above
+        diagonal = row[j] + (query_char != char)
+        if diagonal < left:
+            left = diagonal
+        new_row.append(left)
+    return new_row
+
+
+def _prefix_end(keys: List[str], prefix: str, start: int) -> int:
+    """Позиция первого ключа после start, не начинающегося с prefix"""
+    return bisect.bisect_left(keys, prefix + "\U0010ffff", start)
+
+
+class RelatedGraph:
+    """Граф связей между терминами, построенный по related_terms.
+
+    Рёбра считаются неориентированными: термин связан и с теми, кого он
+    перечисляет, и с теми, кто перечисляет его. Узлы — существующие
+    термины (у каждого есть запись в _out, пусть и пустая); имена из
+    related_terms без такого термина обход не посещает, так что удалённый
+    термин не связывает тех, кто на него ссылается. Результаты обхода
+    кешируются по (термин, глубина); любое изменение графа, включая
+    появление и удаление термина, увеличивает версию, и устаревший кеш
+    сбрасывается.
+    """
+
+    def __init__(self, cache_size: int = 10_000):
+        self._out: Dict[str, Tuple[str, ...]] = {}
+        self._in: Dict[str, Set[str]] = defaultdict(set)
+        self.version = 0
+        self._cache: "OrderedDict[Tuple[str, int], Tuple[str, ...]]" = OrderedDict()
+        self._cache_version = 0
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        # Рёбра идут между шардами словаря, и писатели разных шардов
+        # меняют граф параллельно
+        self._write_lock = threading.RLock()
+
+    def set_edges(self, key: str, related: Iterable[str]):
+        related = tuple(dict.fromkeys(name for name in related if name != key))
+        with self._write_lock:
+            old = self._out.get(key)
+            if related == old:
+                return
+            for name in old or ():
+                sources = self._in.get(name)
+                if sources is not None:
+                    sources.discard(key)
+                    if not sources:
+                        del self._in[name]
+            for name in related:
+                self._in[name].add(key)
+            self._out[key] = related
+            self.version += 1
+
+    def remove(self, key: str):
+        with self._write_lock:
+            if key not in self._out:
+                return
+            self.set_edges(key, ())
+            # Рёбра тех, кто ссылается на key, остаются: термин может вернуться
+            del self._out[key]
+            self.version += 1
+
+    def neighbors(self, key: str) -> Tuple[str, ...]:
+        # tuple() копирует множество атомарно относительно параллельной записи
+        return self._out.get(key, ()) + tuple(self._in.get(key, ()))
+
+    def expand(self, key: str, depth: int) -> Tuple[str, ...]:
+        """Имена, достижимые из key не более чем за depth шагов, в порядке BFS"""
+        version = self.version
+        with self._cache_lock:
+            if self._cache_version != version:
+                self._cache.clear()
+                self._cache_version = version
+            cached = self._cache.get((key, depth))
+            if cached is not None:
+                self._cache.move_to_end((key, depth))
+                return cached
+
+        result = self._bfs(key, depth)
+
+        with self._cache_lock:
+            # Если граф изменился во время обхода, результат не кешируется
+            if self._cache_version == version == self.version:
+                self._cache[(key, depth)] = result
+                if len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return result
+
+    def _bfs(self, key: str, depth: int) -> Tuple[str, ...]:
+        visited = {key}
+        order: List[str] = []
+        frontier = deque([(key, 0)])
+        while frontier:
+            name, level = frontier.popleft()
+            if level == depth:
+                continue
+            for neighbor in self.neighbors(name):
+                # Имя без термина — не узел: через него обход не идёт
+                if neighbor not in visited and neighbor in self._out:
+                    visited.add(neighbor)
+                    order.append(neighbor)
+                    frontier.append((neighbor, level + 1))
+        return tuple(order)
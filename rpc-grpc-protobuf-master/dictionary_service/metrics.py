@@ -0,0 +1,266 @@
+"""Метрики gRPC-сервера в текстовом формате Prometheus.
+
+Перехватчик на каждый вызов записывает по методу:
+    grpc_server_queue_wait_seconds   — от приёма вызова до старта обработчика
+                                       (ожидание свободного потока пула);
+    grpc_server_handling_seconds     — время работы обработчика;
+    grpc_server_response_bytes       — размер каждого отправленного сообщения;
+    grpc_server_in_flight            — сколько обработчиков выполняется сейчас;
+    grpc_server_in_flight_at_start   — сколько обработчиков уже выполнялось,
+                                       когда стартовал очередной.
+"""
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Sequence
+
+import grpc
+
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+CONCURRENCY_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами; наблюдение — bisect и инкремент.
+
+    Своей блокировки нет: изменяется и читается под блокировкой реестра,
+    чтобы на вызов приходилось как можно меньше захватов.
+    """
+
+    __slots__ = ("bounds", "counts", "total")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def render(self, name: str, labels: str) -> List[str]:
+        counts = self.counts
+        total = self.total
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {total:.9g}')
+        lines.append(f'{name}_count{{{labels}}} {cumulative}')
+        return lines
+
+
+class MethodMetrics:
+    """Метрики одного RPC-метода"""
+
+    def __init__(self, method: str, lock: threading.Lock):
+        self._lock = lock
+        self.labels = f'grpc_method="{method}"'
+        self.queue_wait = Histogram(LATENCY_BUCKETS)
+        self.handling = Histogram(LATENCY_BUCKETS)
+        self.response_bytes = Histogram(BYTES_BUCKETS)
+        self.in_flight = 0
+        self._serialize = None
+        self._wrapped_serialize = None
+
+    def serializer(self, serialize: Callable) -> Callable:
+        """Сериализатор ответа, который заодно записывает размер сообщения"""
+        if serialize is not self._serialize:
+            observe = self.response_bytes.observe
+            lock = self._lock
+
+            def wrapped(message):
+                data = serialize(message)
+                with lock:
+                    observe(len(data))
+                return data
+
+            self._serialize = serialize
+            self._wrapped_serialize = wrapped
+        return self._wrapped_serialize
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._methods: Dict[str, MethodMetrics] = {}
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.in_flight_at_start = Histogram(CONCURRENCY_BUCKETS)
+        # Дополнительные источники строк для /metrics (например, контроль допуска)
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def add_collector(self, collector: Callable[[], List[str]]):
+        self._collectors.append(collector)
+
+    def method(self, name: str) -> MethodMetrics:
+        metrics = self._methods.get(name)
+        if metrics is None:
+            with self._lock:
+                metrics = self._methods.setdefault(name, MethodMetrics(name.rsplit("/", 1)[-1], self._lock))
+        return metrics
+
+    def enter(self, metrics: MethodMetrics, arrived: float) -> float:
+        started = time.perf_counter()
+        with self._lock:
+            metrics.queue_wait.observe(started - arrived)
+            self.in_flight_at_start.observe(self.in_flight)
+            self.in_flight += 1
+            metrics.in_flight += 1
+        return started
+
+    def exit(self, metrics: MethodMetrics, started: float):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            metrics.handling.observe(elapsed)
+            self.in_flight -= 1
+            metrics.in_flight -= 1
+
+    def render(self) -> str:
+        with self._lock:
+            return self._render()
+
+    def _render(self) -> str:
+        methods = sorted(self._methods.values(), key=lambda metrics: metrics.labels)
+        lines = []
+        for name, kind, attribute in (
+            ("grpc_server_queue_wait_seconds", "histogram", "queue_wait"),
+            ("grpc_server_handling_seconds", "histogram", "handling"),
+            ("grpc_server_response_bytes", "histogram", "response_bytes"),
+        ):
+            lines.append(f"# TYPE {name} {kind}")
+            for metrics in methods:
+                lines.extend(getattr(metrics, attribute).render(name, metrics.labels))
+        lines.append("# TYPE grpc_server_in_flight gauge")
+        for metrics in methods:
+            lines.append(f"grpc_server_in_flight{{{metrics.labels}}} {metrics.in_flight}")
+        lines.append("# TYPE grpc_server_in_flight_at_start histogram")
+        lines.extend(self.in_flight_at_start.render("grpc_server_in_flight_at_start", 'server="dictionary"'))
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """Перехватчик для grpc.server.
+
+    intercept_service вызывается в потоке приёма вызовов, ещё до постановки
+    обработчика в пул, поэтому разница с моментом его старта — ожидание потока.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+
+    def intercept_service(self, continuation, handler_call_details):
+        arrived = time.perf_counter()
+        handler = continuation(handler_call_details)
+        if handler is None:
+            return None
+        registry = self.registry
+        metrics = registry.method(handler_call_details.method)
+        field = _behavior_field(handler)
+        inner = getattr(handler, field)
+
+        if handler.response_streaming:
+            def behavior(request, context):
+                started = registry.enter(metrics, arrived)
+                try:
+                    yield from inner(request, context)
+                finally:
+                    registry.exit(metrics, started)
+        else:
+            def behavior(request, context):
+                started = registry.enter(metrics, arrived)
+                try:
+                    return inner(request, context)
+                finally:
+                    registry.exit(metrics, started)
+
+        return _rebuild(handler, field, behavior, metrics.serializer(handler.response_serializer))
+
+
+class AsyncMetricsInterceptor(grpc.aio.ServerInterceptor):
+    """То же для grpc.aio: ожидание здесь — задержка цикла событий"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+
+    async def intercept_service(self, continuation, handler_call_details):
+        arrived = time.perf_counter()
+        handler = await continuation(handler_call_details)
+        if handler is None:
+            return None
+        registry = self.registry
+        metrics = registry.method(handler_call_details.method)
+        field = _behavior_field(handler)
+        inner = getattr(handler, field)
+
+        if handler.response_streaming:
+            async def behavior(request, context):
+                started = registry.enter(metrics, arrived)
+                try:
+                    async for response in inner(request, context):
+                        yield response
+                finally:
+                    registry.exit(metrics, started)
+        else:
+            async def behavior(request, context):
+                started = registry.enter(metrics, arrived)
+                try:
+                    return await inner(request, context)
+                finally:
+                    registry.exit(metrics, started)
+
+        return _rebuild(handler, field, behavior, metrics.serializer(handler.response_serializer))
+
+
+HANDLER_FACTORIES = {
+    "unary_unary": grpc.unary_unary_rpc_method_handler,
+    "unary_stream": grpc.unary_stream_rpc_method_handler,
+    "stream_unary": grpc.stream_unary_rpc_method_handler,
+    "stream_stream": grpc.stream_stream_rpc_method_handler,
+}
+
+
+def _behavior_field(handler: grpc.RpcMethodHandler) -> str:
+    if handler.request_streaming:
+        return "stream_stream" if handler.response_streaming else "stream_unary"
+    return "unary_stream" if handler.response_streaming else "unary_unary"
+
+
+def _rebuild(handler: grpc.RpcMethodHandler, field: str, behavior: Callable,
+             serializer: Callable) -> grpc.RpcMethodHandler:
+    return HANDLER_FACTORIES[field](
+        behavior,
+        request_deserializer=handler.request_deserializer,
+        response_serializer=serializer,
+    )
+
+
+def start_metrics_server(registry: MetricsRegistry, port: int, host: str = "") -> ThreadingHTTPServer:
+    """HTTP-эндпоинт /metrics в фоновом потоке"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,266 @@
+import glob
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import dictionary_pb2
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"DSNP0001"
+SNAPSHOT_HEADER = struct.Struct("<8sQQ")  # magic, lsn, число записей
+RECORD_LENGTH = struct.Struct("<I")
+
+
+class WriteAheadLog:
+    """Журнал упреждающей записи с групповым fsync.
+
+    append() только ставит запись в очередь и возвращает её LSN. Фоновый
+    поток забирает всё накопившееся, пишет одним вызовом и делает один
+    fsync на группу; wait_durable() ждёт, пока LSN окажется на диске.
+    Журнал разбит на сегменты wal-<первый LSN>.log, чтобы после снимка
+    старые сегменты можно было удалить целиком.
+    """
+
+    def __init__(self, directory: str, last_lsn: int):
+        self.directory = directory
+        self._cond = threading.Condition()
+        self._pending: List[bytes] = []
+        self._last_lsn = last_lsn
+        self._durable_lsn = last_lsn
+        self._file = open(self._segment_path(last_lsn + 1), "ab")
+        # Позиция в очереди, с которой записи идут в новый сегмент
+        self._rotate_at: Optional[int] = None
+        self._rotate_lsn = 0
+        self._closed = False
+        self._flusher = threading.Thread(target=self._run, name="wal-flusher", daemon=True)
+        self._flusher.start()
+
+    def _segment_path(self, first_lsn: int) -> str:
+        return os.path.join(self.directory, f"wal-{first_lsn:020d}.log")
+
+    @property
+    def last_lsn(self) -> int:
+        return self._last_lsn
+
+    def append(self, change: dict) -> int:
+        with self._cond:
+            self._last_lsn += 1
+            line = json.dumps({"lsn": self._last_lsn, **change}, ensure_ascii=False)
+            self._pending.append(line.encode("utf-8") + b"\n")
+            self._cond.notify_all()
+            return self._last_lsn
+
+    def rotate(self) -> int:
+        """Следующие записи пойдут в новый сегмент; возвращает LSN границы.
+
+        Вызывать под блокировкой писателя, чтобы граница не сдвинулась.
+        """
+        with self._cond:
+            if self._rotate_at is None:
+                self._rotate_at = len(self._pending)
+                self._rotate_lsn = self._last_lsn + 1
+                self._cond.notify_all()
+            return self._last_lsn
+
+    def wait_durable(self, lsn: int):
+        with self._cond:
+            while self._durable_lsn < lsn and not self._closed:
+                self._cond.wait()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and self._rotate_at is None and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending and self._rotate_at is None:
+                    return
+                batch = self._pending
+                self._pending = []
+                batch_lsn = self._last_lsn
+                rotate_at, rotate_lsn = self._rotate_at, self._rotate_lsn
+                self._rotate_at = None
+
+            if rotate_at is None:
+                self._write(batch)
+            else:
+                # Записи до границы ротации дописываются в старый сегмент
+                self._write(batch[:rotate_at])
+                self._file.close()
+                self._file = open(self._segment_path(rotate_lsn), "ab")
+                self._write(batch[rotate_at:])
+
+            with self._cond:
+                self._durable_lsn = batch_lsn
+                self._cond.notify_all()
+
+    def _write(self, batch: List[bytes]):
+        if batch:
+            self._file.write(b"".join(batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def segments(self) -> List[Tuple[int, str]]:
+        return list_segments(self.directory)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._file.close()
+
+
+def list_segments(directory: str) -> List[Tuple[int, str]]:
+    segments = []
+    for path in glob.glob(os.path.join(directory, "wal-*.log")):
+        first_lsn = int(os.path.basename(path)[4:-4])
+        segments.append((first_lsn, path))
+    return sorted(segments)
+
+
+def read_wal(directory: str, after_lsn: int) -> Iterator[dict]:
+    """Записи журнала с LSN больше after_lsn; оборванная последняя строка пропускается"""
+    for _, path in list_segments(directory):
+        with open(path, "rb") as wal_file:
+            for line in wal_file:
+                if not line.endswith(b"\n"):
+                    logger.warning("Ignoring torn WAL record at the end of %s", path)
+                    break
+                change = json.loads(line)
+                if change["lsn"] > after_lsn:
+                    yield change
+
+
+def write_snapshot(path: str, lsn: int, count: int, responses: Iterable[dictionary_pb2.TermResponse]):
+    """Компактный снимок: заголовок и TermResponse с префиксом длины.
+
+    Файл пишется во временный и атомарно переименовывается.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as snapshot_file:
+        snapshot_file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, lsn, count))
+        for response in responses:
+            data = response.SerializeToString()
+            snapshot_file.write(RECORD_LENGTH.pack(len(data)))
+            snapshot_file.write(data)
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> Tuple[int, Iterator[dictionary_pb2.TermResponse]]:
+    """Читает снимок через mmap; возвращает его LSN и ленивый обход сообщений в порядке добавления"""
+    with open(path, "rb") as snapshot_file:
+        magic, lsn, count = SNAPSHOT_HEADER.unpack(snapshot_file.read(SNAPSHOT_HEADER.size))
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} is not a dictionary snapshot")
+    return lsn, _iter_snapshot(path, count)
+
+
+def _iter_snapshot(path: str, count: int) -> Iterator[dictionary_pb2.TermResponse]:
+    # Сообщения разбираются по одному, весь снимок в памяти не материализуется
+    with open(path, "rb") as snapshot_file:
+        with mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = SNAPSHOT_HEADER.size
+            parse = dictionary_pb2.TermResponse.FromString
+            for _ in range(count):
+                (length,) = RECORD_LENGTH.unpack_from(data, offset)
+                offset += RECORD_LENGTH.size
+                yield parse(data[offset:offset + length])
+                offset += length
+
+
+class Persistence:
+    """Долговременное хранение словаря: WAL, периодические снимки, восстановление.
+
+    Снимок строится из неизменяемого Snapshot хранилища в фоновом потоке,
+    поэтому не блокирует ни чтения, ни записи.
+    """
+
+    SNAPSHOT_FILE = "snapshot.bin"
+
+    def __init__(self, directory: str, snapshot_every: int = 100_000, check_interval: float = 1.0):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.check_interval = check_interval
+        os.makedirs(directory, exist_ok=True)
+        self.snapshot_path = os.path.join(directory, self.SNAPSHOT_FILE)
+        self.wal: Optional[WriteAheadLog] = None
+        self._snapshot_lsn = 0
+        self._stopped = threading.Event()
+        self._checkpointer: Optional[threading.Thread] = None
+
+    def has_state(self) -> bool:
+        return os.path.exists(self.snapshot_path) or bool(list_segments(self.directory))
+
+    def recover(self, load: Callable[[Iterable[dictionary_pb2.TermResponse]], int],
+                apply: Callable[[dict], None]):
+        """Загружает последний снимок, проигрывает хвост журнала и открывает WAL"""
+        started = time.perf_counter()
+        last_lsn = 0
+        if os.path.exists(self.snapshot_path):
+            last_lsn, responses = read_snapshot(self.snapshot_path)
+            loaded = load(responses)
+            logger.info("Loaded snapshot with %d terms (lsn %d)", loaded, last_lsn)
+        self._snapshot_lsn = last_lsn
+
+        replayed = 0
+        for change in read_wal(self.directory, last_lsn):
+            apply(change)
+            last_lsn = change["lsn"]
+            replayed += 1
+        logger.info("Replayed %d WAL records, recovered in %.2f s",
+                    replayed, time.perf_counter() - started)
+        self.open(last_lsn)
+
+    def open(self, last_lsn: int = 0):
+        self.wal = WriteAheadLog(self.directory, last_lsn)
+
+    def log(self, change: dict) -> int:
+        return self.wal.append(change)
+
+    def wait_durable(self, lsn: int):
+        self.wal.wait_durable(lsn)
+
+    def start_checkpointer(self, capture: Callable[[], Tuple[int, int, Iterable[dictionary_pb2.TermResponse]]]):
+        """Фоновый поток: снимок после каждых snapshot_every записей журнала.
+
+        capture() должна под блокировкой писателя вызвать rotate_wal() и вернуть
+        LSN, число терминов и ленивый обход неизменяемого снимка хранилища.
+        """
+        def run():
+            while not self._stopped.wait(self.check_interval):
+                if self.wal.last_lsn - self._snapshot_lsn >= self.snapshot_every:
+                    self.checkpoint(capture)
+
+        self._checkpointer = threading.Thread(target=run, name="checkpointer", daemon=True)
+        self._checkpointer.start()
+
+    def rotate_wal(self) -> int:
+        return self.wal.rotate()
+
+    def checkpoint(self, capture: Callable[[], Tuple[int, int, Iterable[dictionary_pb2.TermResponse]]]):
+        started = time.perf_counter()
+        lsn, count, responses = capture()
+        write_snapshot(self.snapshot_path, lsn, count, responses)
+        self._snapshot_lsn = lsn
+        # Сегменты, целиком покрытые снимком, больше не нужны
+        segments = self.wal.segments()
+        for (first_lsn, path), following in zip(segments, segments[1:]):
+            if following[0] <= lsn + 1:
+                os.remove(path)
+        logger.info("Snapshot of %d terms at lsn %d written in %.2f s",
+                    count, lsn, time.perf_counter() - started)
+
+    def close(self):
+        self._stopped.set()
+        if self._checkpointer is not None:
+            self._checkpointer.join()
+        if self.wal is not None:
+            self.wal.close()
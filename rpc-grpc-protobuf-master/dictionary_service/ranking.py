@@ -0,0 +1,65 @@
+import math
+import re
+from typing import Callable, Dict, Optional, Tuple
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Ключ сортировки выдачи: (-уровень совпадения в имени, -BM25, порядок добавления)
+SortKey = Tuple[int, float, int]
+
+
+def tokenize(text: str):
+    return TOKEN_PATTERN.findall(text)
+
+
+def definition_length(definition: str) -> int:
+    """Длина определения в словах для нормировки BM25"""
+    return len(definition.split())
+
+
+def term_tier(term: str, query: str) -> int:
+    """Совпадение в имени важнее любого совпадения в определении"""
+    if term == query:
+        return 3
+    if term.startswith(query):
+        return 2
+    if query in term:
+        return 1
+    return 0
+
+
+class QueryScorer:
+    """Релевантность термина запросу.
+
+    Сначала сравнивается, как запрос входит в имя термина (точно, префиксом,
+    подстрокой), затем BM25 слов запроса по определению. Частота слова —
+    число вхождений подстроки, как и в самом поиске; документная частота
+    оценивается по триграммному индексу.
+    """
+
+    def __init__(self, query: str, document_count: int, average_length: float,
+                 estimate: Callable[[str], Optional[int]]):
+        self.query = query
+        self.average_length = average_length or 1.0
+        self.idf: Dict[str, float] = {}
+        for token in set(tokenize(query)):
+            frequency = estimate(token)
+            if frequency is None:
+                frequency = document_count
+            frequency = min(frequency, document_count)
+            self.idf[token] = math.log(1 + (document_count - frequency + 0.5) / (frequency + 0.5))
+
+    def bm25(self, definition: str) -> float:
+        score = 0.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * definition_length(definition) / self.average_length)
+        for token, idf in self.idf.items():
+            frequency = definition.count(token)
+            if frequency:
+                score += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        return score
+
+    def sort_key(self, term: str, definition: str, seq: int) -> SortKey:
+        """term и definition — уже в нижнем регистре"""
+        return -term_tier(term, self.query), -self.bm25(definition), seq
@@ -0,0 +1,224 @@
+"""Реплика словаря только для чтения.
+
+Ведомый сервер подписывается на WatchTerms ведущего, загружает его словарь
+через StreamSnapshot и применяет события подписки по порядку ревизий.
+Подписка оформляется до загрузки, и события копятся в очереди, пока идёт
+снимок; снимок приходит со своей точной ревизией, вошедшие в него события
+пропускаются. Ревизии реплики совпадают с ведущим.
+
+После обрыва реплика продолжает подписку со своей ревизии. Если ревизии
+уже нет в буфере ведущего, ведущий перезапущен (сменилась эпоха) или
+в ревизиях пропуск, словарь загружается заново.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import grpc
+
+import dictionary_pb2
+import dictionary_pb2_grpc
+from changes import WATCH_EPOCH_HEADER, WATCH_REVISION_HEADER
+from storage import TermRecord
+
+# Пауза перед повторным подключением к ведущему, с
+RECONNECT_INTERVAL = 1.0
+# Как часто отставание пишется в лог, с
+LAG_LOG_INTERVAL = 10.0
+# Снимок большого словаря идёт одним потоком: сообщения ограничены только сервером
+CHANNEL_OPTIONS = [("grpc.max_receive_message_length", -1)]
+
+# Конец потока событий в очереди читателя
+_STREAM_END = object()
+
+
+class ReplicationError(Exception):
+    """Поток ведущего нельзя продолжить: нужна повторная загрузка снимка"""
+
+
+class Follower:
+    """Поток репликации: загрузка снимка ведущего и применение его изменений.
+
+    Подписка читается отдельным потоком в неограниченную очередь, чтобы
+    ведущий не упирался в медленное применение и не вытеснял ревизии реплики
+    из своего буфера.
+    """
+
+    def __init__(self, service, primary: str):
+        self.service = service
+        self.primary = primary
+        self.channel = grpc.insecure_channel(primary, options=CHANNEL_OPTIONS)
+        self.stub = dictionary_pb2_grpc.DictionaryServiceStub(self.channel)
+        # Словарь загружен хотя бы раз: реплика может отвечать на чтения
+        self.bootstrapped = threading.Event()
+        self.bootstraps = 0
+        self.connected = False
+        # Эпоха ведущего, с которой совпадают ревизии реплики
+        self.epoch = 0
+        # Последняя ревизия, полученная от ведущего (применённая или в очереди)
+        self.received_revision = 0
+        # Время публикации на ведущем последнего применённого изменения, мкс
+        self.applied_published_at = 0
+        # Задержка последнего применённого изменения и момент обрыва подписки
+        self._delay = 0.0
+        self._disconnected_at = time.time()
+        self._resync = True
+        # Текущая подписка: переподключение её отменяет, чтобы читатель не копил события впустую
+        self._stream = None
+        self._thread = threading.Thread(target=self._run, name="replication", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def wait_bootstrapped(self, timeout: Optional[float] = None) -> bool:
+        return self.bootstrapped.wait(timeout)
+
+    @property
+    def applied_revision(self) -> int:
+        return self.service.feed.revision
+
+    @property
+    def lag_revisions(self) -> int:
+        """Полученные, но ещё не применённые ревизии"""
+        return max(self.received_revision - self.applied_revision, 0)
+
+    @property
+    def lag_seconds(self) -> float:
+        """Оценка сверху того, насколько данные реплики старше данных ведущего, с.
+
+        Пока подписка жива и очередь пуста — задержка последнего применённого
+        изменения; при очереди — возраст последнего применённого изменения;
+        после обрыва к задержке прибавляется время без связи.
+        """
+        if not self.bootstrapped.is_set():
+            return float("inf")
+        if not self.connected:
+            return self._delay + time.time() - self._disconnected_at
+        if self.lag_revisions and self.applied_published_at:
+            return max(time.time() - self.applied_published_at / 1_000_000, self._delay)
+        return self._delay
+
+    def render_metrics(self) -> List[str]:
+        labels = f'primary="{self.primary}"'
+        return [
+            "# TYPE dictionary_replication_lag_seconds gauge",
+            f"dictionary_replication_lag_seconds{{{labels}}} {self.lag_seconds:.6g}",
+            "# TYPE dictionary_replication_lag_revisions gauge",
+            f"dictionary_replication_lag_revisions{{{labels}}} {self.lag_revisions}",
+            "# TYPE dictionary_replication_revision gauge",
+            f"dictionary_replication_revision{{{labels}}} {self.applied_revision}",
+            "# TYPE dictionary_replication_connected gauge",
+            f"dictionary_replication_connected{{{labels}}} {int(self.connected)}",
+            "# TYPE dictionary_replication_bootstraps_total counter",
+            f"dictionary_replication_bootstraps_total{{{labels}}} {self.bootstraps}",
+        ]
+
+    def _run(self):
+        while True:
+            try:
+                self._apply(self._subscribe())
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.OUT_OF_RANGE:
+                    self._resync = True
+                logging.warning("Replication from %s interrupted: %s %s", self.primary, e.code(), e.details())
+            except ReplicationError as e:
+                self._resync = True
+                logging.warning("Replication from %s needs a new snapshot: %s", self.primary, e)
+            if self._stream is not None:
+                self._stream.cancel()
+                self._stream = None
+            if self.connected:
+                self.connected = False
+                self._disconnected_at = time.time()
+            time.sleep(RECONNECT_INTERVAL)
+
+    def _watch(self, from_revision: int):
+        """Подписка на ведущего; ждёт начальных метаданных, то есть действующей подписки"""
+        stream = self._stream = self.stub.WatchTerms(dictionary_pb2.WatchRequest(from_revision=from_revision))
+        return (stream,) + self._revision(stream)
+
+    def _revision(self, call) -> Tuple[int, int]:
+        """Ревизия и эпоха из начальных метаданных потока ведущего"""
+        metadata = dict(call.initial_metadata())
+        if WATCH_REVISION_HEADER not in metadata:
+            # Без метаданных вызов уже завершился: ошибка подключения всплывёт при чтении
+            for _ in call:
+                pass
+        if WATCH_EPOCH_HEADER not in metadata:
+            raise ReplicationError(f"{self.primary} does not report its epoch")
+        return int(metadata[WATCH_REVISION_HEADER]), int(metadata[WATCH_EPOCH_HEADER])
+
+    def _subscribe(self) -> "queue.Queue":
+        """Очередь событий ведущего; при необходимости сначала загружает его словарь"""
+        if not self._resync:
+            stream, revision, epoch = self._watch(self.applied_revision)
+            if epoch == self.epoch:
+                self.connected = True
+                return self._read(stream, revision)
+            stream.cancel()
+            logging.warning("Primary %s restarted, reloading the dictionary", self.primary)
+
+        stream, revision, epoch = self._watch(0)
+        events = self._read(stream, revision)
+        started = time.perf_counter()
+        pages = self.stub.StreamSnapshot(dictionary_pb2.SnapshotRequest())
+        snapshot_revision, snapshot_epoch = self._revision(pages)
+        if snapshot_epoch != epoch or snapshot_revision < revision:
+            pages.cancel()
+            raise ReplicationError(f"snapshot at revision {snapshot_revision} does not continue "
+                                   f"the subscription at revision {revision}")
+        revision = snapshot_revision
+        records = (TermRecord.from_response(response) for page in pages for response in page.terms)
+        loaded = self.service.load_replica(records, revision, epoch)
+        self.epoch = epoch
+        self._resync = False
+        self.bootstraps += 1
+        self.applied_published_at = 0
+        self._delay = 0.0
+        self.bootstrapped.set()
+        self.connected = True
+        logging.info("Loaded %d terms from primary %s at revision %d in %.1f s",
+                     loaded, self.primary, revision, time.perf_counter() - started)
+        return events
+
+    def _read(self, stream, revision: int) -> "queue.Queue":
+        """Читает поток в очередь в отдельном потоке; конец потока — _STREAM_END или ошибка"""
+        events: "queue.Queue" = queue.Queue()
+        self.received_revision = revision
+
+        def read():
+            try:
+                for event in stream:
+                    if stream is self._stream:
+                        self.received_revision = event.revision
+                    events.put(event)
+                events.put(_STREAM_END)
+            except grpc.RpcError as e:
+                events.put(e)
+
+        threading.Thread(target=read, name="replication-reader", daemon=True).start()
+        return events
+
+    def _apply(self, events: "queue.Queue"):
+        next_log = time.monotonic() + LAG_LOG_INTERVAL
+        while True:
+            try:
+                event = events.get(timeout=LAG_LOG_INTERVAL)
+            except queue.Empty:
+                event = None
+            if event is _STREAM_END:
+                raise ReplicationError("primary closed the stream")
+            if isinstance(event, grpc.RpcError):
+                raise event
+            if event is not None and event.revision > self.applied_revision:
+                if event.revision != self.applied_revision + 1:
+                    raise ReplicationError(f"expected revision {self.applied_revision + 1}, got {event.revision}")
+                self.service.apply_event(event)
+                self.applied_published_at = event.published_at_us
+                self._delay = max(time.time() - event.published_at_us / 1_000_000, 0.0)
+            if time.monotonic() >= next_log:
+                next_log = time.monotonic() + LAG_LOG_INTERVAL
+                logging.info("Replication lag: %.3f s, %d revisions (revision %d)",
+                             self.lag_seconds, self.lag_revisions, self.applied_revision)
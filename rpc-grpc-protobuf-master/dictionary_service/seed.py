@@ -0,0 +1,110 @@
+"""Потоковое чтение начального словаря из файла.
+
+Поддерживаются два формата:
+    jsonl    — по одному JSON-объекту термина на строку (поля как у TermResponse);
+    protobuf — TermResponse с префиксом длины varint (как writeDelimitedTo в Java).
+Файл читается по одной записи, так что в памяти не держится целиком.
+"""
+import json
+import os
+from datetime import datetime
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+import dictionary_pb2
+from storage import TermRecord
+
+SEED_FORMATS = ("auto", "jsonl", "protobuf")
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+
+def detect_format(path: str) -> str:
+    return "jsonl" if path.endswith(JSONL_SUFFIXES) else "protobuf"
+
+
+def open_seed(path: str, seed_format: str = "auto") -> Iterator[TermRecord]:
+    if seed_format == "auto":
+        seed_format = detect_format(path)
+    if seed_format == "jsonl":
+        return read_jsonl(path)
+    if seed_format == "protobuf":
+        return read_delimited(path)
+    raise ValueError(f"Unknown seed format '{seed_format}'")
+
+
+def read_jsonl(path: str) -> Iterator[TermRecord]:
+    """Термины из JSON Lines; обязательно только поле term"""
+    loaded_at = datetime.utcnow().isoformat() + "Z"
+    with open(path, "r", encoding="utf-8") as seed_file:
+        for line_number, line in enumerate(seed_file, 1):
+            if not line.strip():
+                continue
+            try:
+                term_data = json.loads(line)
+                yield TermRecord.from_data({
+                    "term": term_data["term"],
+                    "definition": term_data.get("definition", ""),
+                    "category": term_data.get("category", ""),
+                    "related_terms": term_data.get("related_terms", ()),
+                    "source": term_data.get("source", ""),
+                    "created_at": term_data.get("created_at") or loaded_at,
+                    "updated_at": term_data.get("updated_at") or loaded_at,
+                    "expires_at": term_data.get("expires_at", ""),
+                })
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"{path}:{line_number}: invalid term record: {e}") from e
+
+
+def read_delimited(path: str) -> Iterator[TermRecord]:
+    """Термины из TermResponse с префиксом длины varint"""
+    parse = dictionary_pb2.TermResponse.FromString
+    with open(path, "rb") as seed_file:
+        while True:
+            offset = seed_file.tell()
+            length = _read_varint(seed_file)
+            if length is None:
+                return
+            data = seed_file.read(length)
+            if len(data) != length:
+                raise ValueError(f"{path}: truncated record at offset {offset}")
+            yield TermRecord.from_response(parse(data))
+
+
+def _read_varint(stream: BinaryIO) -> Optional[int]:
+    """Беззнаковый varint; None в конце файла"""
+    result = 0
+    shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            if shift:
+                raise ValueError("truncated varint length prefix")
+            return None
+        result |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return result
+        shift += 7
+        if shift > 63:
+            raise ValueError("varint length prefix is too long")
+
+
+def _encode_varint(value: int) -> bytes:
+    encoded = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            encoded.append(byte | 0x80)
+        else:
+            encoded.append(byte)
+            return bytes(encoded)
+
+
+def write_delimited(path: str, responses: Iterable[dictionary_pb2.TermResponse]):
+    """Пишет файл для read_delimited (например, для нагрузочных тестов)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as seed_file:
+        for response in responses:
+            data = response.SerializeToString()
+            seed_file.write(_encode_varint(len(data)))
+            seed_file.write(data)
+    os.replace(tmp_path, path)
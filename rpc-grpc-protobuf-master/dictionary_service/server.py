@@ -1,19 +1,182 @@
 import grpc
 from concurrent import futures
+import argparse
+import asyncio
+import base64
+import binascii
+import heapq
+import itertools
 import logging
+import multiprocessing
+import random
+import shutil
+import tempfile
+import threading
 import time
-from datetime import datetime
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 import json
 import os
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 import dictionary_pb2
 import dictionary_pb2_grpc
+from admission import AdmissionInterceptor
+from changes import (ADDED, DELETED, UPDATED, WATCH_EPOCH_HEADER, WATCH_REVISION_HEADER, ChangeEvent,
+                     ChangeFeed, RevisionUnavailable)
+from expiry import DEFAULT_EVICTION, EVICTION_POLICIES, ExpiryQueue, parse_retention
+from indexes import RelatedGraph, fold
+from metrics import AsyncMetricsInterceptor, MetricsInterceptor, MetricsRegistry, start_metrics_server
+from persistence import Persistence
+from replication import Follower
+from ranking import QueryScorer, SortKey, definition_length
+from seed import SEED_FORMATS, open_seed
+from shared_log import SharedLog
+from shards import Shard, ShardSet
+from storage import PROJECTION_FIELDS, ResponseCache, ShardedSnapshot, Snapshot, TermRecord
+
+SEARCH_FIELDS = ("term", "definition", "category")
+# Ограничение глубины обхода GetRelatedTerms
+MAX_RELATED_DEPTH = 5
+# Размер порции фоновой достройки индексов после восстановления
+DEFERRED_INDEX_CHUNK = 1000
+# Сколько записей BulkAddTerms применяет под одной блокировкой писателя
+BULK_ADD_GROUP_SIZE = 1000
+# Сколько готовых TermResponse держать для часто читаемых терминов
+RESPONSE_CACHE_SIZE = 10_000
+# Размер страницы GetAllTerms по умолчанию и её предел
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 1000
+# Размер страницы SearchTerms по умолчанию и её предел
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 1000
+# Число подсказок SuggestTerms по умолчанию и его предел
+DEFAULT_SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 100
+# Порог расстояния FuzzySearch по умолчанию и его предел: цена поиска растёт с порогом
+DEFAULT_FUZZY_DISTANCE = 2
+MAX_FUZZY_DISTANCE = 3
+# Методы класса «запись» для контроля допуска; остальные — чтение
+WRITE_METHODS = frozenset({"AddTerm", "UpdateTerm", "DeleteTerm", "BulkAddTerms"})
+# Размер порции начальной загрузки и шаг отчёта о прогрессе
+SEED_CHUNK_SIZE = 50_000
+SEED_PROGRESS_EVERY = 100_000
+# Сколько последних изменений хранится для возобновления WatchTerms
+DEFAULT_WATCH_BUFFER = 10_000
+# Как часто WatchTerms проверяет обрыв клиента и изменения других воркеров, с
+WATCH_POLL_INTERVAL = 0.5
+# Методы, не проходящие контроль допуска: подписка держит поток, пока жив клиент
+UNLIMITED_METHODS = frozenset({"WatchTerms"})
+# Сколько подписок WatchTerms обслуживается одновременно; в режиме пула под них
+# добавляются отдельные потоки сверх --max-workers
+DEFAULT_MAX_WATCHERS = 16
+# Терминов в сообщении StreamSnapshot по умолчанию и предел
+DEFAULT_SNAPSHOT_PAGE = 1000
+MAX_SNAPSHOT_PAGE = 10_000
+# Поля терминов в StreamSnapshot: версию реплика вычисляет сама
+SNAPSHOT_FIELDS = tuple(field for field in PROJECTION_FIELDS if field != "version")
+# Размер пула потоков: обработчики в режиме thread, записи в режиме aio
+DEFAULT_MAX_WORKERS = 10
+# Число шардов словаря по умолчанию: один шард — одна блокировка писателя
+DEFAULT_SHARDS = 1
+# Случайная основа версий словаря: у разных запусков сервера версии не совпадают,
+# а воркеры наследуют её при fork и отвечают одинаково
+VERSION_BASE = random.SystemRandom().getrandbits(62)
+# Как часто фоновый поток удаляет термины с истёкшим сроком жизни, с
+EXPIRY_INTERVAL = 1.0
+# Сколько истёкших терминов удаляется за один проход
+EXPIRY_BATCH = 1000
+# Через сколько вытесненных записей слияние снимка для политики oldest строится заново
+EVICTION_MERGE_SPAN = 10_000
+# Как часто воркер догоняет общий журнал без запросов, с: простаивающий воркер
+# иначе не отметит прочитанное, и журнал не получится сжать
+SHARED_LOG_SYNC_INTERVAL = 1.0
 
 class DictionaryService:
-    def __init__(self):
-        self.terms: Dict[str, dict] = {}
-        self.load_initial_data()
+    def __init__(self, shared_log: Optional[SharedLog] = None,
+                 persistence: Optional[Persistence] = None,
+                 seed: Optional[Iterable[TermRecord]] = None,
+                 watch_buffer: int = DEFAULT_WATCH_BUFFER, shard_count: int = DEFAULT_SHARDS,
+                 primary: Optional[str] = None, max_terms: int = 0, eviction: str = DEFAULT_EVICTION,
+                 retention: Optional[Dict[str, int]] = None):
+        # Компактные записи терминов живут в неизменяемых снимках шардов.
+        # Индексы шардов лишь предлагают кандидатов, источник истины — снимок.
+        self.shards = ShardSet(shard_count)
+        self.responses = ResponseCache(RESPONSE_CACHE_SIZE)
+        self.related_graph = RelatedGraph()
+        # Триграммный индекс и граф связей после загрузки снимка достраиваются
+        # в фоне; пока событие не установлено, поиск идёт полным перебором
+        self.indexes_ready = threading.Event()
+        self.indexes_ready.set()
+        self.shared_log = shared_log
+        self.persistence = persistence
+        # Лента изменений для WatchTerms. Загрузка и восстановление в неё не
+        # попадают: всё это — начальное состояние с ревизией 1
+        self.feed = ChangeFeed(watch_buffer)
+        self._publishing = False
+        # Основа версий списков; реплика берёт её у ведущего, чтобы версии совпадали
+        self.version_base = VERSION_BASE
+        # Адрес ведущего: словарь — реплика только для чтения, данные приходят
+        # от ведущего (см. replication.Follower), свои не загружаются
+        self.primary = primary
+        # Сроки жизни терминов. Реплика их не отслеживает: истёкшие термины
+        # удаляет ведущий, и удаления приходят с его подпиской
+        self.expiry = ExpiryQueue() if primary is None else None
+        # Сроки хранения по категориям для терминов без собственного TTL, с
+        self.retention = retention or {}
+        # Предел числа терминов (0 — без предела) и политика вытеснения
+        self.max_terms = max_terms
+        self.eviction = eviction
+        self._evict_lock = threading.Lock()
+        # Места, занятые записями reject, которые ещё не применены
+        self._capacity_lock = threading.Lock()
+        self._reserved = 0
+        # Термины, загруженные при запуске (глоссарий, --seed-file, --data-dir),
+        # не вытесняются как самые старые: граница — их seq
+        self._initial_seq = 0
+        # Слияние корзин снимка в порядке добавления: продолжается между вызовами evict
+        self._oldest: Iterator[TermRecord] = iter(())
+        self._oldest_taken = 0
+        self.expired = 0
+        self.evicted = 0
+        # LSN последней записи текущего потока: writer() ждёт его fsync
+        self._local = threading.local()
+        if primary is not None:
+            # Словарь реплики загружает Follower из снимка ведущего
+            pass
+        elif persistence is not None and persistence.has_state():
+            if seed is not None:
+                logging.warning("Data directory already has a dictionary, seed file is ignored")
+            persistence.recover(self._load_responses, self.apply_change)
+            if not self.indexes_ready.is_set():
+                threading.Thread(target=self._build_deferred_indexes, args=(self.terms,),
+                                 name="index-builder", daemon=True).start()
+        else:
+            self.load_initial_data()
+            if seed is not None:
+                self.load_seed(seed)
+            if persistence is not None:
+                persistence.open()
+                if seed is None:
+                    for record in self.terms.entries():
+                        self._record({"op": "add", "term_data": record.data})
+                else:
+                    # Загруженный словарь сразу сохраняется снимком, а не записями WAL
+                    persistence.checkpoint(self._capture_snapshot)
+        if persistence is not None:
+            persistence.start_checkpointer(self._capture_snapshot)
+        self._initial_seq = self.shards.next_seq()
+        if max_terms and eviction != "reject" and len(self.terms) >= max_terms:
+            logging.warning("%d terms loaded at startup reach --max-terms %d; only terms added later "
+                            "or terms with a TTL can be evicted", len(self.terms), max_terms)
+        # Изменения из общего журнала воркеров публикуются: все воркеры
+        # применяют его в одном порядке, и ревизии у них совпадают
+        self._publishing = True
+        self.sync()
+        if self.expiry is not None:
+            threading.Thread(target=self._expire_loop, name="expiry", daemon=True).start()
+        if shared_log is not None:
+            threading.Thread(target=self._follow_shared_log, name="shared-log", daemon=True).start()
     
     def load_initial_data(self):
         """Загрузка начальных данных глоссария"""
@@ -66,26 +229,704 @@ class DictionaryService:
         ]
         
         for term_data in initial_terms:
-            self.terms[term_data["term"]] = term_data
+            self._add_term(term_data)
+
+    def load_seed(self, records: Iterable[TermRecord], chunk_size: int = SEED_CHUNK_SIZE) -> int:
+        """Потоковая загрузка начального словаря порциями.
+
+        Каждая порция за один проход попадает во все индексы и публикуется
+        одним снимком; в памяти сверх самого словаря держится только порция.
+        Повторы уже загруженных терминов пропускаются. Возвращает число добавленных.
+        """
+        started = time.perf_counter()
+        records = iter(records)
+        loaded = skipped = 0
+        next_report = SEED_PROGRESS_EVERY
+        while True:
+            chunk = list(itertools.islice(records, chunk_size))
+            if not chunk:
+                break
+            with self.shards.write_lock:
+                snapshot = self.terms
+                fresh = {}
+                for record in chunk:
+                    if record.term in snapshot or record.term in fresh:
+                        skipped += 1
+                    else:
+                        fresh[record.term] = record
+                self._add_records(list(fresh.values()))
+            loaded += len(fresh)
+            if loaded >= next_report:
+                elapsed = time.perf_counter() - started
+                logging.info("Seeded %d terms (%.0f terms/s)", loaded, loaded / elapsed)
+                next_report = (loaded // SEED_PROGRESS_EVERY + 1) * SEED_PROGRESS_EVERY
+
+        elapsed = time.perf_counter() - started
+        logging.info("Seeded %d terms in %.1f s (%.1f s per million), %d duplicates skipped",
+                     loaded, elapsed, elapsed * 1_000_000 / max(loaded, 1), skipped)
+        return loaded
+
+    @staticmethod
+    def _search_texts(record: TermRecord) -> List[str]:
+        return [getattr(record, field) for field in SEARCH_FIELDS]
+
+    @property
+    def terms(self) -> Union[Snapshot, ShardedSnapshot]:
+        """Текущий снимок словаря (термин -> данные)"""
+        return self.shards.snapshot()
+
+    @property
+    def version(self) -> int:
+        """Версия словаря для условных запросов списков (TermsList.version).
+
+        Берётся до снимка: запись, успевшая в снимок раньше ленты изменений,
+        только сделает версию ответа старше его данных, но не наоборот.
+        """
+        return self.version_base + self.feed.revision
+
+    @property
+    def definition_words(self) -> int:
+        """Суммарная длина определений в словах: средняя длина для BM25"""
+        return self.shards.definition_words
+
+    def response(self, record: TermRecord) -> dictionary_pb2.TermResponse:
+        """TermResponse для записи; горячие термины отдаются из кеша"""
+        return self.responses.get(record)
+
+    def apply_change(self, change: dict):
+        """Применяет изменение из журнала к данным в памяти"""
+        op = change["op"]
+        if op == "add":
+            self._add_term(change["term_data"])
+        elif op == "update":
+            self._update_term(change["term"], change["changes"])
+        elif op == "delete":
+            self._delete_term(change["term"])
+        else:
+            raise ValueError(f"Unknown change operation '{op}'")
+
+    def apply_event(self, event: dictionary_pb2.TermEvent):
+        """Применяет событие WatchTerms ведущего к словарю реплики.
+
+        Повтор уже применённого изменения безвреден: термин получает те же
+        данные. В ленту реплики попадает каждое событие, даже ничего не
+        изменившее, чтобы ревизии совпадали с ведущим.
+        """
+        term = event.term
+        shard = self.shards.shard(term)
+        with shard.lock:
+            current = shard.store.snapshot().entry(term)
+            if event.type == DELETED:
+                if current is not None:
+                    self._delete_term(term)
+                else:
+                    self.feed.publish(DELETED, term)
+                return
+            record = TermRecord.from_response(event.data)
+            if current is None:
+                self._add_record(record)
+            elif current.version != record.version:
+                self._replace_term(current, record)
+            else:
+                self.feed.publish(UPDATED, term, current)
+
+    def sync(self):
+        """Догоняет изменения, сделанные другими воркерами"""
+        if self.shared_log is not None and self.shared_log.has_updates():
+            with self.shards.write_lock:
+                self.shared_log.catch_up(self.apply_change)
+
+    def _follow_shared_log(self):
+        while True:
+            time.sleep(SHARED_LOG_SYNC_INTERVAL)
+            try:
+                self.sync()
+            except Exception:
+                logging.exception("Failed to catch up with the shared log")
+
+    @contextmanager
+    def writer(self, term: Optional[str] = None):
+        """Сериализует проверку и применение записи.
+
+        Запись одного термина (term) блокирует только его шард, без term
+        блокируются все шарды. Воркеры с общим журналом догоняют чужие
+        изменения во всех шардах, поэтому у них блокируется всё.
+        Читатели эту блокировку не берут: они работают со снимками.
+        При включённом WAL выход ждёт fsync уже после снятия блокировки,
+        так что параллельные записи попадают в один групповой fsync.
+        """
+        self._local.lsn = 0
+        if term is None or self.shared_log is not None:
+            lock = self.shards.write_lock
+        else:
+            lock = self.shards.shard(term).lock
+        with lock:
+            if self.shared_log is None:
+                yield
+            else:
+                with self.shared_log.exclusive():
+                    self.shared_log.catch_up(self.apply_change)
+                    yield
+        if self.persistence is not None and self._local.lsn:
+            self.persistence.wait_durable(self._local.lsn)
+
+    def _record(self, change: dict):
+        if self.shared_log is not None:
+            self.shared_log.append(change)
+        if self.persistence is not None:
+            self._local.lsn = self.persistence.log(change)
+
+    def _capture_snapshot(self):
+        """Граница снимка для Persistence: LSN и неизменяемый снимок берутся атомарно"""
+        with self.shards.write_lock:
+            lsn = self.persistence.rotate_wal()
+            snapshot = self.terms
+        return lsn, len(snapshot), (record.build_response(versioned=False) for record in snapshot.entries())
+
+    def _load_responses(self, responses: Iterable[dictionary_pb2.TermResponse]) -> int:
+        """Загрузка снимка с диска; возвращает число загруженных терминов"""
+        records = [TermRecord.from_response(response) for response in responses]
+        with self.shards.write_lock:
+            self._add_records(records, deferred=True)
+        self.indexes_ready.clear()
+        return len(records)
+
+    def load_replica(self, records: Iterable[TermRecord], revision: int, version_base: int) -> int:
+        """Заменяет словарь реплики снимком ведущего; возвращает число терминов снимка.
+
+        Снимок читается порциями, как начальный словарь, изменившиеся термины
+        заменяются, а отсутствующие в снимке удаляются. В ленту изменений
+        загрузка не попадает: лента начинается заново с ревизии ведущего.
+        Первая загрузка идёт в пустой словарь, и тяжёлые индексы, как после
+        восстановления с диска, достраиваются в фоне.
+        """
+        records = iter(records)
+        initial = not len(self.terms)
+        # Имена снимка нужны только для удаления лишнего при повторной загрузке
+        seen = None if initial else set()
+        loaded = 0
+        if initial:
+            self.indexes_ready.clear()
+        self._publishing = False
+        try:
+            while True:
+                chunk = list(itertools.islice(records, SEED_CHUNK_SIZE))
+                if not chunk:
+                    break
+                with self.shards.write_lock:
+                    snapshot = self.terms
+                    fresh = []
+                    for record in chunk:
+                        current = snapshot.entry(record.term)
+                        if current is None:
+                            fresh.append(record)
+                        elif current.version != record.version:
+                            self._replace_term(current, record)
+                    self._add_records(fresh, deferred=initial)
+                if seen is not None:
+                    seen.update(record.term for record in chunk)
+                loaded += len(chunk)
+            with self.shards.write_lock:
+                if seen is not None:
+                    for term in [term for term in self.terms if term not in seen]:
+                        self._delete_term(term)
+                self.version_base = version_base
+                self.feed.reset(revision)
+        finally:
+            self._publishing = True
+            if initial:
+                threading.Thread(target=self._build_deferred_indexes, args=(self.terms,),
+                                 name="index-builder", daemon=True).start()
+        return loaded
+
+    def _build_deferred_indexes(self, snapshot: Snapshot):
+        """Достраивает тяжёлые индексы порциями, не задерживая запись надолго.
+
+        Записи, пришедшие во время достройки, индексируют свои термины сами;
+        здесь берутся только ещё не проиндексированные термины в актуальной версии.
+        """
+        started = time.perf_counter()
+        entries = snapshot.entries()
+        while True:
+            chunk = list(itertools.islice(entries, DEFERRED_INDEX_CHUNK))
+            if not chunk:
+                break
+            with self.shards.write_lock:
+                current = self.terms
+                pending = []
+                for entry in chunk:
+                    if entry.term in self.shards.shard(entry.term).search_index:
+                        continue
+                    record = current.entry(entry.term)
+                    if record is not None:
+                        pending.append(record)
+                for shard, records in self.shards.group(pending):
+                    shard.search_index.add_many(
+                        (record.term, self._search_texts(record)) for record in records
+                    )
+                for record in pending:
+                    self.related_graph.set_edges(record.term, record.related_terms)
+            # Блокировка не честная: без уступки GIL поток сразу захватил бы её снова,
+            # и запись (или применение событий ведущего на реплике) ждала бы всю достройку
+            time.sleep(0)
+        self.indexes_ready.set()
+        logging.info("Search and related-terms indexes built in %.1f s", time.perf_counter() - started)
+
+    def add_term(self, term_data: dict):
+        with self.shards.shard(term_data["term"]).lock:
+            self._add_term(term_data)
+            self._record({"op": "add", "term_data": term_data})
+
+    def add_terms(self, terms: List[dict]):
+        """Групповое добавление: один снимок шарда на его часть группы"""
+        with self.shards.write_lock:
+            self._add_terms(terms)
+            for term_data in terms:
+                self._record({"op": "add", "term_data": term_data})
+
+    def _add_terms(self, terms: List[dict]):
+        self._add_records([TermRecord.from_data(term_data) for term_data in terms])
+
+    def _add_records(self, records: List[TermRecord], deferred: bool = False):
+        # Группа разбивается по шардам, в ленте изменений она идёт по шардам
+        groups = self.shards.group(records)
+        for shard, group in groups:
+            if not deferred:
+                shard.search_index.add_many(
+                    (record.term, self._search_texts(record)) for record in group
+                )
+            for record in group:
+                shard.category_index.add(record.category, record.term)
+                shard.definition_words += definition_length(record.definition)
+            shard.order_index.add_many(record.term for record in group)
+            shard.prefix_index.add_many(record.term for record in group)
+            shard.store.put_many(group)
+        for shard, group in groups:
+            for record in group:
+                self._schedule(record)
+                if not deferred:
+                    self.related_graph.set_edges(record.term, record.related_terms)
+                if self._publishing:
+                    self.feed.publish(ADDED, record.term, record)
+
+    def update_term(self, term: str, changes: dict):
+        with self.shards.shard(term).lock:
+            self._update_term(term, changes)
+            self._record({"op": "update", "term": term, "changes": changes})
+
+    def delete_term(self, term: str):
+        with self.shards.shard(term).lock:
+            self._delete_term(term)
+            self._record({"op": "delete", "term": term})
+
+    def _add_term(self, term_data: dict):
+        self._add_record(TermRecord.from_data(term_data))
+
+    def _add_record(self, record: TermRecord):
+        self._index_term(record)
+        self.shards.shard(record.term).store.put(record)
+        self._schedule(record)
+        if self._publishing:
+            self.feed.publish(ADDED, record.term, record)
+
+    def _index_term(self, record: TermRecord):
+        shard = self.shards.shard(record.term)
+        shard.search_index.add(record.term, self._search_texts(record))
+        shard.category_index.add(record.category, record.term)
+        shard.definition_words += definition_length(record.definition)
+        shard.order_index.add(record.term)
+        shard.prefix_index.add(record.term)
+        self.related_graph.set_edges(record.term, record.related_terms)
+
+    def _update_term(self, term: str, changes: dict):
+        # Опубликованные записи не изменяются: обновление создаёт новую
+        old = self.shards.shard(term).store.snapshot().entry(term)
+        self._replace_term(old, TermRecord.from_data({**old.data, **changes}))
+
+    def _replace_term(self, old: TermRecord, record: TermRecord):
+        term = record.term
+        shard = self.shards.shard(term)
+        shard.search_index.update(term, self._search_texts(old), self._search_texts(record))
+        if record.category != old.category:
+            shard.category_index.remove(old.category, term)
+            shard.category_index.add(record.category, term)
+        shard.definition_words += definition_length(record.definition) - definition_length(old.definition)
+        self.related_graph.set_edges(term, record.related_terms)
+        shard.store.put(record)
+        if record.expires_at != old.expires_at:
+            self._schedule(record)
+        if self._publishing:
+            self.feed.publish(UPDATED, term, record)
+
+    def _delete_term(self, term: str):
+        shard = self.shards.shard(term)
+        record = shard.store.snapshot().entry(term)
+        shard.store.delete(term)
+        shard.search_index.remove(term, self._search_texts(record))
+        shard.category_index.remove(record.category, term)
+        shard.definition_words -= definition_length(record.definition)
+        shard.order_index.remove(term)
+        shard.prefix_index.remove(term)
+        self.related_graph.remove(term)
+        if self._publishing:
+            self.feed.publish(DELETED, term)
+
+    def _schedule(self, record: TermRecord):
+        if record.expires_at and self.expiry is not None:
+            self.expiry.push(record.term, record.expires_at)
+
+    def expires_at(self, category: str, ttl_seconds: int, now: datetime) -> str:
+        """Срок жизни нового термина: свой TTL или срок хранения категории; пусто — бессрочно"""
+        seconds = ttl_seconds or self.retention.get(category, 0)
+        if not seconds:
+            return ""
+        return (now + timedelta(seconds=seconds)).isoformat() + "Z"
+
+    def _expire_loop(self):
+        while True:
+            time.sleep(EXPIRY_INTERVAL)
+            try:
+                self.expire()
+            except Exception:
+                logging.exception("Failed to remove expired terms")
+
+    def expire(self, now: Optional[int] = None) -> int:
+        """Удаляет термины с наступившим сроком жизни; возвращает число удалённых.
+
+        С кучи снимаются только наступившие сроки, порциями по EXPIRY_BATCH.
+        """
+        if now is None:
+            now = time.time_ns() // 1000
+        removed = 0
+        while True:
+            due = self.expiry.pop(EXPIRY_BATCH, until=now)
+            if not due:
+                break
+            count = self._remove([(term, expires_at) for expires_at, term in due], "expires_at")
+            self.expired += count
+            removed += count
+        return removed
+
+    @contextmanager
+    def reserve(self, count: int = 1) -> Iterator[Optional[int]]:
+        """Резервирует место под count новых терминов на время записи.
+
+        Отдаёт, сколько терминов можно добавить; None — добавление не
+        ограничено. Отказывает только политика reject, остальные вытесняют
+        лишнее после записи (см. evict). Записи одного шарда не видят записей
+        другого, поэтому место считается по общему счётчику резервов: предел
+        reject не превышается. Пока резерв не снят, добавленный термин
+        учитывается дважды, и параллельная запись может получить отказ
+        чуть раньше предела.
+        """
+        if not self.max_terms or self.eviction != "reject":
+            yield None
+            return
+        with self._capacity_lock:
+            granted = max(min(count, self.max_terms - len(self.terms) - self._reserved), 0)
+            self._reserved += granted
+        try:
+            yield granted
+        finally:
+            with self._capacity_lock:
+                self._reserved -= granted
+
+    def evict(self) -> int:
+        """Сокращает словарь до max_terms по политике вытеснения; возвращает число вытесненных.
+
+        Вызывается после записи, уже без блокировки писателя: вытеснение берёт
+        блокировки шардов жертв, а держать одну и ждать другую нельзя.
+        Поэтому предел мягкий: параллельные записи могут ненадолго его превысить.
+        Термины, загруженные при запуске, вытесняются, только если у них есть
+        срок жизни; если вытеснить больше нечего, словарь остаётся выше предела.
+        """
+        if not self.max_terms or self.eviction == "reject" or len(self.terms) <= self.max_terms:
+            return 0
+        evicted = 0
+        with self._evict_lock:
+            while len(self.terms) > self.max_terms:
+                excess = len(self.terms) - self.max_terms
+                due = self.expiry.pop(excess) if self.eviction == "expiring" else None
+                if due:
+                    evicted += self._remove([(term, expires_at) for expires_at, term in due], "expires_at")
+                    continue
+                oldest = self._oldest_records(excess)
+                if not oldest:
+                    break
+                evicted += self._remove([(record.term, record.seq) for record in oldest], "seq")
+        self.evicted += evicted
+        return evicted
+
+    def _oldest_records(self, count: int) -> List[TermRecord]:
+        """Самые давно добавленные записи; вызывать под _evict_lock.
+
+        Слияние корзин снимка дорого начинать (куча по всем корзинам), поэтому
+        оно продолжается между вызовами: добавленные позже записи всё равно
+        новее. Удалённые с тех пор записи отсеет _remove. Каждые
+        EVICTION_MERGE_SPAN записей слияние начинается заново с текущего
+        снимка, чтобы не держать в памяти корзины старого.
+        """
+        records = list(itertools.islice(self._oldest, count))
+        self._oldest_taken += len(records)
+        if len(records) < count or self._oldest_taken >= EVICTION_MERGE_SPAN:
+            # Слияние идёт по seq, так что начальные термины — его начало
+            self._oldest = itertools.dropwhile(lambda record: record.seq < self._initial_seq,
+                                               self.terms.entries())
+            self._oldest_taken = 0
+            if len(records) < count:
+                records += itertools.islice(self._oldest, count - len(records))
+                self._oldest_taken = len(records)
+        return records
+
+    def _remove(self, victims: List[Tuple[str, int]], field: str) -> int:
+        """Удаляет термины, у которых поле field всё ещё равно ожидаемому значению.
+
+        Жертвы выбираются без блокировки, поэтому термин могли успеть удалить
+        или заменить; такие пропускаются. Удаления одного шарда идут под одной
+        блокировкой писателя и попадают в WAL и общий журнал, как DeleteTerm.
+        """
+        groups: Dict[Shard, List[Tuple[str, int]]] = {}
+        for term, value in victims:
+            groups.setdefault(self.shards.shard(term), []).append((term, value))
+        removed = 0
+        for shard, group in groups.items():
+            with self.writer(group[0][0]):
+                for term, value in group:
+                    record = shard.store.snapshot().entry(term)
+                    if record is not None and getattr(record, field) == value:
+                        self.delete_term(term)
+                        removed += 1
+        return removed
+
+    def render_metrics(self) -> List[str]:
+        lines = [
+            "# TYPE dictionary_terms gauge",
+            f"dictionary_terms {len(self.terms)}",
+            "# TYPE dictionary_expiry_queue_size gauge",
+            f"dictionary_expiry_queue_size {len(self.expiry)}",
+            "# TYPE dictionary_expired_terms_total counter",
+            f"dictionary_expired_terms_total {self.expired}",
+            "# TYPE dictionary_evicted_terms_total counter",
+            f"dictionary_evicted_terms_total {self.evicted}",
+        ]
+        if self.shared_log is not None:
+            lines += [
+                "# TYPE dictionary_shared_log_bytes gauge",
+                f"dictionary_shared_log_bytes {self.shared_log.size}",
+                "# TYPE dictionary_shared_log_compactions_total counter",
+                f"dictionary_shared_log_compactions_total {self.shared_log.compactions}",
+            ]
+        return lines
+
+    def list_terms(self, page_size: int, after: Optional[str] = None,
+                   offset: int = 0) -> Tuple[List[TermRecord], Optional[str]]:
+        """Страница терминов в порядке ключей: после ключа after или со смещения offset.
+
+        Возвращает записи и ключ-курсор для следующей страницы (None, если её нет).
+        """
+        snapshot = self.terms
+        if after is None:
+            keys = self.shards.keys_slice(offset, page_size)
+        else:
+            keys = self.shards.keys_after(after, page_size)
+
+        entries = []
+        cursor = after
+        while keys:
+            for key in keys:
+                entry = snapshot.entry(key)
+                if entry is not None:
+                    entries.append(entry)
+            cursor = keys[-1]
+            if len(entries) >= page_size:
+                break
+            # Ключи, которых нет в снимке (параллельная запись), добираем следующими
+            keys = self.shards.keys_after(cursor, page_size - len(entries))
+
+        if cursor is None or not self.shards.keys_after(cursor, 1):
+            return entries, None
+        return entries, cursor
+
+    def get_related_terms(self, term: str, depth: int) -> List[TermRecord]:
+        """Существующие термины, связанные с term не более чем через depth шагов"""
+        snapshot = self.terms
+        results = []
+        for key in self.related_graph.expand(term, depth):
+            entry = snapshot.entry(key)
+            if entry is not None:
+                results.append(entry)
+        return results
+
+    def get_terms_by_category(self, category: str) -> List[TermRecord]:
+        snapshot = self.terms
+        per_shard = []
+        for keys in self.shards.category_terms(category):
+            entries = (snapshot.entry(key) for key in keys)
+            per_shard.append([entry for entry in entries if entry is not None and entry.category == category])
+        # Смена категории ставит термин в конец списка шарда, так что и при
+        # одном шарде порядок по seq восстанавливается сортировкой; списки
+        # почти упорядочены, и timsort справляется за время, близкое к линейному
+        return sorted(itertools.chain.from_iterable(per_shard), key=lambda entry: entry.seq)
+
+    def list_categories(self) -> Dict[str, int]:
+        return self.shards.category_counts()
+
+    def iter_terms(self, category: str = "") -> Iterator[TermRecord]:
+        """Лениво обходит один снимок словаря, не копируя его"""
+        if category:
+            return iter(self.get_terms_by_category(category))
+        return self.terms.entries()
+
+    def revision_snapshot(self) -> Tuple[int, Union[Snapshot, ShardedSnapshot]]:
+        """Снимок словаря и ревизия, которой он в точности соответствует.
+
+        Запись публикует событие под блокировкой своего шарда, поэтому под
+        блокировкой всех шардов снимок и ревизия согласованы.
+        """
+        with self.shards.write_lock:
+            return self.feed.revision, self.terms
+
+    def normalized_entry(self, term: str) -> Optional[TermRecord]:
+        """Запись по нормализованному имени; точное совпадение имени важнее"""
+        snapshot = self.terms
+        entry = snapshot.entry(term)
+        if entry is not None:
+            return entry
+        for name in self.shards.lookup(term):
+            entry = snapshot.entry(name)
+            if entry is not None:
+                return entry
+        return None
+
+    def colliding_term(self, term: str) -> Optional[str]:
+        """Другой существующий термин с тем же нормализованным ключом"""
+        for name in self.shards.lookup(term):
+            if name != term and name in self.terms:
+                return name
+        return None
+
+    def suggest_terms(self, prefix: str, limit: int = DEFAULT_SUGGEST_LIMIT) -> List[str]:
+        """Имена терминов, начинающиеся с prefix без учёта регистра"""
+        return self.shards.complete(prefix, limit)
+
+    def fuzzy_search(self, query: str, max_distance: int = DEFAULT_FUZZY_DISTANCE,
+                     limit: int = DEFAULT_SUGGEST_LIMIT) -> List[Tuple[TermRecord, int]]:
+        """Термины, чьё имя отличается от query не больше чем на max_distance правок"""
+        snapshot = self.terms
+        results = []
+        for term, distance in self.shards.fuzzy(query, max_distance, limit):
+            entry = snapshot.entry(term)
+            if entry is not None:
+                results.append((entry, distance))
+        return results
+
+    def search_terms(self, query: str, category: str = "") -> List[TermRecord]:
+        return list(self.iter_search(query, category))
+
+    def iter_search(self, query: str, category: str = "") -> Iterator[TermRecord]:
+        """Поиск подстроки (без учёта регистра) в термине, определении и категории"""
+        for record, _, _ in self._matches(self.terms, query.lower(), category):
+            yield record
+
+    def rank_search(self, query: str, category: str = "", limit: int = DEFAULT_SEARCH_LIMIT,
+                    after: Optional[SortKey] = None) -> Tuple[List[TermRecord], int, Optional[SortKey]]:
+        """Страница поиска по убыванию релевантности.
+
+        Проверяются все совпадения (для total_count), но в куче держится
+        не больше limit + 1 лучших после курсора after, и ответы строятся
+        только для них. Возвращает страницу, число совпадений и курсор.
+        """
+        snapshot = self.terms
+        query = query.lower()
+        average_length = self.definition_words / len(snapshot) if len(snapshot) else 1.0
+        scorer = QueryScorer(query, len(snapshot), average_length, self.shards.estimate)
+        total = 0
+
+        def ranked() -> Iterator[Tuple[SortKey, TermRecord]]:
+            nonlocal total
+            for record, term, definition in self._matches(snapshot, query, category):
+                total += 1
+                key = scorer.sort_key(term, definition, record.seq)
+                if after is None or key > after:
+                    yield key, record
+
+        page = heapq.nsmallest(limit + 1, ranked(), key=lambda item: item[0])
+        cursor = page[limit - 1][0] if len(page) > limit else None
+        return [record for _, record in page[:limit]], total, cursor
+
+    def _matches(self, snapshot: Union[Snapshot, ShardedSnapshot], query: str,
+                 category: str) -> Iterator[Tuple[TermRecord, str, str]]:
+        """Совпадения вместе с именем и определением в нижнем регистре"""
+        per_shard = self.shards.candidates(query) if self.indexes_ready.is_set() else None
+        if per_shard is None:
+            records = snapshot.entries()
+        elif len(per_shard) == 1:
+            records = (snapshot.entry(key) for key in per_shard[0])
+        else:
+            # Кандидаты шардов идут в порядке добавления, общий порядок — слиянием
+            entries = ([entry for entry in map(snapshot.entry, keys) if entry is not None] for keys in per_shard)
+            records = heapq.merge(*entries, key=lambda entry: entry.seq)
+
+        for record in records:
+            if record is None:
+                continue
+            if category and record.category != category:
+                continue
+            term = record.term.lower()
+            definition = record.definition.lower()
+            if query in term or query in definition or query in record.category.lower():
+                yield record, term, definition
+
+def encode_page_token(key: str) -> str:
+    return base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii")
+
+def decode_page_token(token: str) -> str:
+    try:
+        return base64.b64decode(token.encode("ascii"), altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError(f"Invalid page token '{token}'")
+
+def encode_search_token(key: SortKey) -> str:
+    tier, score, seq = key
+    return encode_page_token(f"{tier}:{score!r}:{seq}")
+
+def parse_field_mask(mask) -> Optional[Tuple[str, ...]]:
+    """Поля проекции из FieldMask; None — нужен полный TermResponse"""
+    if not mask.paths:
+        return None
+    for path in mask.paths:
+        if path not in PROJECTION_FIELDS:
+            raise ValueError(f"Unknown field '{path}' in field mask")
+    # Имя термина нужно всегда: по нему клиент узнаёт запись
+    return tuple(dict.fromkeys(("term", *mask.paths)))
+
+def decode_search_token(token: str) -> SortKey:
+    try:
+        tier, score, seq = decode_page_token(token).split(":")
+        return int(tier), float(score), int(seq)
+    except ValueError:
+        raise ValueError(f"Invalid page token '{token}'")
 
 class DictionaryServicer(dictionary_pb2_grpc.DictionaryServiceServicer):
-    def __init__(self):
-        self.service = DictionaryService()
+    def __init__(self, service: Optional[DictionaryService] = None, max_watchers: int = DEFAULT_MAX_WATCHERS):
+        self.service = service if service is not None else DictionaryService()
+        self.max_watchers = max_watchers
+        self.watchers = 0
+        self.watchers_rejected = 0
+        self._watchers_lock = threading.Lock()
     
     def GetTerm(self, request, context):
         try:
+            self.service.sync()
             term = request.term
-            if term in self.service.terms:
-                term_data = self.service.terms[term]
-                return dictionary_pb2.TermResponse(
-                    term=term_data["term"],
-                    definition=term_data["definition"],
-                    category=term_data["category"],
-                    related_terms=term_data["related_terms"],
-                    source=term_data["source"],
-                    created_at=term_data["created_at"],
-                    updated_at=term_data["updated_at"]
-                )
+            if request.normalized:
+                entry = self.service.normalized_entry(term)
+            else:
+                entry = self.service.terms.entry(term)
+            if entry is not None:
+                if request.if_version and request.if_version == entry.version:
+                    return dictionary_pb2.TermResponse(term=entry.term, version=entry.version, not_modified=True)
+                return self.service.response(entry)
             else:
                 context.set_code(grpc.StatusCode.NOT_FOUND)
                 context.set_details(f"Term '{term}' not found")
@@ -97,25 +938,47 @@ class DictionaryServicer(dictionary_pb2_grpc.DictionaryServiceServicer):
     
     def AddTerm(self, request, context):
         try:
-            term = request.term
-            if term in self.service.terms:
-                context.set_code(grpc.StatusCode.ALREADY_EXISTS)
-                context.set_details(f"Term '{term}' already exists")
-                return dictionary_pb2.OperationResponse(
-                    success=False,
-                    message=f"Term '{term}' already exists"
-                )
-            
-            current_time = datetime.utcnow().isoformat() + "Z"
-            self.service.terms[term] = {
-                "term": term,
-                "definition": request.definition,
-                "category": request.category,
-                "related_terms": list(request.related_terms),
-                "source": request.source,
-                "created_at": current_time,
-                "updated_at": current_time
-            }
+            message = self._replica_error(context)
+            if message is not None:
+                return dictionary_pb2.OperationResponse(success=False, message=message)
+            with self.service.writer(request.term):
+                term = request.term
+                if term in self.service.terms:
+                    context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+                    context.set_details(f"Term '{term}' already exists")
+                    return dictionary_pb2.OperationResponse(
+                        success=False,
+                        message=f"Term '{term}' already exists"
+                    )
+                # Термины, различающиеся лишь регистром или записью Unicode,
+                # сделали бы нормализованный поиск неоднозначным
+                existing = self.service.colliding_term(term)
+                if existing is not None:
+                    message = f"Term '{term}' collides with existing term '{existing}'"
+                    context.set_code(grpc.StatusCode.ALREADY_EXISTS)
+                    context.set_details(message)
+                    return dictionary_pb2.OperationResponse(success=False, message=message)
+                with self.service.reserve() as room:
+                    if room == 0:
+                        message = f"Dictionary is full ({self.service.max_terms} terms)"
+                        context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+                        context.set_details(message)
+                        return dictionary_pb2.OperationResponse(success=False, message=message)
+
+                    now = datetime.utcnow()
+                    current_time = now.isoformat() + "Z"
+                    self.service.add_term({
+                        "term": term,
+                        "definition": request.definition,
+                        "category": request.category,
+                        "related_terms": list(request.related_terms),
+                        "source": request.source,
+                        "created_at": current_time,
+                        "updated_at": current_time,
+                        "expires_at": self.service.expires_at(request.category, request.ttl_seconds, now)
+                    })
+            # Вытеснение блокирует шарды жертв, поэтому идёт после записи
+            self.service.evict()
             
             return dictionary_pb2.OperationResponse(
                 success=True,
@@ -132,29 +995,33 @@ class DictionaryServicer(dictionary_pb2_grpc.DictionaryServiceServicer):
     
     def UpdateTerm(self, request, context):
         try:
-            term = request.term
-            if term not in self.service.terms:
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                context.set_details(f"Term '{term}' not found")
-                return dictionary_pb2.OperationResponse(
-                    success=False,
-                    message=f"Term '{term}' not found"
-                )
+            message = self._replica_error(context)
+            if message is not None:
+                return dictionary_pb2.OperationResponse(success=False, message=message)
+            with self.service.writer(request.term):
+                term = request.term
+                if term not in self.service.terms:
+                    context.set_code(grpc.StatusCode.NOT_FOUND)
+                    context.set_details(f"Term '{term}' not found")
+                    return dictionary_pb2.OperationResponse(
+                        success=False,
+                        message=f"Term '{term}' not found"
+                    )
             
-            current_time = datetime.utcnow().isoformat() + "Z"
-            self.service.terms[term].update({
-                "definition": request.definition,
-                "category": request.category,
-                "related_terms": list(request.related_terms),
-                "source": request.source,
-                "updated_at": current_time
-            })
+                current_time = datetime.utcnow().isoformat() + "Z"
+                self.service.update_term(term, {
+                    "definition": request.definition,
+                    "category": request.category,
+                    "related_terms": list(request.related_terms),
+                    "source": request.source,
+                    "updated_at": current_time
+                })
             
-            return dictionary_pb2.OperationResponse(
-                success=True,
-                message=f"Term '{term}' updated successfully",
-                term=term
-            )
+                return dictionary_pb2.OperationResponse(
+                    success=True,
+                    message=f"Term '{term}' updated successfully",
+                    term=term
+                )
         except Exception as e:
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
@@ -165,21 +1032,25 @@ class DictionaryServicer(dictionary_pb2_grpc.DictionaryServiceServicer):
     
     def DeleteTerm(self, request, context):
         try:
-            term = request.term
-            if term not in self.service.terms:
-                context.set_code(grpc.StatusCode.NOT_FOUND)
-                context.set_details(f"Term '{term}' not found")
+            message = self._replica_error(context)
+            if message is not None:
+                return dictionary_pb2.OperationResponse(success=False, message=message)
+            with self.service.writer(request.term):
+                term = request.term
+                if term not in self.service.terms:
+                    context.set_code(grpc.StatusCode.NOT_FOUND)
+                    context.set_details(f"Term '{term}' not found")
+                    return dictionary_pb2.OperationResponse(
+                        success=False,
+                        message=f"Term '{term}' not found"
+                    )
+            
+                self.service.delete_term(term)
                 return dictionary_pb2.OperationResponse(
-                    success=False,
-                    message=f"Term '{term}' not found"
+                    success=True,
+                    message=f"Term '{term}' deleted successfully",
+                    term=term
                 )
-            
-            del self.service.terms[term]
-            return dictionary_pb2.OperationResponse(
-                success=True,
-                message=f"Term '{term}' deleted successfully",
-                term=term
-            )
         except Exception as e:
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
@@ -190,29 +1061,35 @@ class DictionaryServicer(dictionary_pb2_grpc.DictionaryServiceServicer):
     
     def GetAllTerms(self, request, context):
         try:
-            page = request.page or 1
-            page_size = request.page_size or 10
-            start_idx = (page - 1) * page_size
-            end_idx = start_idx + page_size
-            
-            all_terms = list(self.service.terms.values())
-            paginated_terms = all_terms[start_idx:end_idx]
-            
-            terms_list = []
-            for term_data in paginated_terms:
-                terms_list.append(dictionary_pb2.TermResponse(
-                    term=term_data["term"],
-                    definition=term_data["definition"],
-                    category=term_data["category"],
-                    related_terms=term_data["related_terms"],
-                    source=term_data["source"],
-                    created_at=term_data["created_at"],
-                    updated_at=term_data["updated_at"]
-                ))
+            self.service.sync()
+            if request.page < 0 or request.page_size < 0:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details("page and page_size must not be negative")
+                return dictionary_pb2.TermsList()
+            page_size = min(request.page_size or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+            after = None
+            try:
+                fields = parse_field_mask(request.fields)
+                if request.page_token:
+                    after = decode_page_token(request.page_token)
+            except ValueError as e:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details(str(e))
+                return dictionary_pb2.TermsList()
+            version = self.service.version
+            if request.if_version == version:
+                return dictionary_pb2.TermsList(version=version, not_modified=True)
+            if after is not None:
+                entries, cursor = self.service.list_terms(page_size, after=after)
+            else:
+                page = request.page or 1
+                entries, cursor = self.service.list_terms(page_size, offset=(page - 1) * page_size)
             
-            return dictionary_pb2.TermsList(
-                terms=terms_list,
-                total_count=len(all_terms)
+            return self._terms_list(
+                entries, fields,
+                total_count=len(self.service.terms),
+                next_page_token=encode_page_token(cursor) if cursor is not None else "",
+                version=version
             )
         except Exception as e:
             context.set_code(grpc.StatusCode.INTERNAL)
@@ -221,70 +1098,557 @@ class DictionaryServicer(dictionary_pb2_grpc.DictionaryServiceServicer):
     
     def SearchTerms(self, request, context):
         try:
-            query = request.query.lower()
-            category = request.category
-            
-            results = []
-            for term_data in self.service.terms.values():
-                if (query in term_data["term"].lower() or 
-                    query in term_data["definition"].lower() or
-                    query in term_data["category"].lower()):
-                    
-                    if category and term_data["category"] != category:
-                        continue
-                    
-                    results.append(dictionary_pb2.TermResponse(
-                        term=term_data["term"],
-                        definition=term_data["definition"],
-                        category=term_data["category"],
-                        related_terms=term_data["related_terms"],
-                        source=term_data["source"],
-                        created_at=term_data["created_at"],
-                        updated_at=term_data["updated_at"]
-                    ))
+            self.service.sync()
+            if request.limit < 0:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details("limit must not be negative")
+                return dictionary_pb2.TermsList()
+            limit = min(request.limit or DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT)
+            after = None
+            try:
+                fields = parse_field_mask(request.fields)
+                if request.page_token:
+                    after = decode_search_token(request.page_token)
+            except ValueError as e:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details(str(e))
+                return dictionary_pb2.TermsList()
+            version = self.service.version
+            if request.if_version == version:
+                return dictionary_pb2.TermsList(version=version, not_modified=True)
             
-            return dictionary_pb2.TermsList(
-                terms=results,
-                total_count=len(results)
+            records, total, cursor = self.service.rank_search(request.query, request.category, limit, after)
+            return self._terms_list(
+                records, fields,
+                total_count=total,
+                next_page_token=encode_search_token(cursor) if cursor is not None else "",
+                version=version
             )
         except Exception as e:
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
             return dictionary_pb2.TermsList()
     
+    def SuggestTerms(self, request, context):
+        # Только имена из индекса префиксов: ни обхода словаря, ни сборки TermResponse
+        try:
+            self.service.sync()
+            if request.limit < 0:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details("limit must not be negative")
+                return dictionary_pb2.SuggestResponse()
+            limit = min(request.limit or DEFAULT_SUGGEST_LIMIT, MAX_SUGGEST_LIMIT)
+            return dictionary_pb2.SuggestResponse(terms=self.service.suggest_terms(request.prefix, limit))
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return dictionary_pb2.SuggestResponse()
+
+    def FuzzySearch(self, request, context):
+        try:
+            self.service.sync()
+            if request.limit < 0 or request.max_distance < 0:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details("limit and max_distance must not be negative")
+                return dictionary_pb2.FuzzySearchResponse()
+            limit = min(request.limit or DEFAULT_SUGGEST_LIMIT, MAX_SUGGEST_LIMIT)
+            # Явный 0 — только точные совпадения, поэтому умолчание берётся лишь для незаданного поля
+            max_distance = min(request.max_distance if request.HasField("max_distance") else DEFAULT_FUZZY_DISTANCE,
+                               MAX_FUZZY_DISTANCE)
+            matches = [
+                dictionary_pb2.FuzzyMatch(term=self.service.response(entry), distance=distance)
+                for entry, distance in self.service.fuzzy_search(request.query, max_distance, limit)
+            ]
+            return dictionary_pb2.FuzzySearchResponse(matches=matches)
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return dictionary_pb2.FuzzySearchResponse()
+
     def GetTermsByCategory(self, request, context):
         try:
-            category = request.category
-            results = []
+            self.service.sync()
+            try:
+                fields = parse_field_mask(request.fields)
+            except ValueError as e:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details(str(e))
+                return dictionary_pb2.TermsList()
+            version = self.service.version
+            if request.if_version == version:
+                return dictionary_pb2.TermsList(version=version, not_modified=True)
+            results = self.service.get_terms_by_category(request.category)
+            return self._terms_list(results, fields, total_count=len(results), version=version)
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return dictionary_pb2.TermsList()
+    
+    def GetRelatedTerms(self, request, context):
+        try:
+            self.service.sync()
+            term = request.term
+            if term not in self.service.terms:
+                context.set_code(grpc.StatusCode.NOT_FOUND)
+                context.set_details(f"Term '{term}' not found")
+                return dictionary_pb2.TermsList()
             
-            for term_data in self.service.terms.values():
-                if term_data["category"] == category:
-                    results.append(dictionary_pb2.TermResponse(
-                        term=term_data["term"],
-                        definition=term_data["definition"],
-                        category=term_data["category"],
-                        related_terms=term_data["related_terms"],
-                        source=term_data["source"],
-                        created_at=term_data["created_at"],
-                        updated_at=term_data["updated_at"]
-                    ))
+            if not self.service.indexes_ready.is_set():
+                context.set_code(grpc.StatusCode.UNAVAILABLE)
+                context.set_details("Related-terms index is still being built, retry later")
+                return dictionary_pb2.TermsList()
+            
+            version = self.service.version
+            if request.if_version == version:
+                return dictionary_pb2.TermsList(version=version, not_modified=True)
+            depth = min(max(request.depth, 1), MAX_RELATED_DEPTH)
+            results = [
+                self.service.response(entry)
+                for entry in self.service.get_related_terms(term, depth)
+            ]
             
             return dictionary_pb2.TermsList(
                 terms=results,
-                total_count=len(results)
+                total_count=len(results),
+                version=version
             )
         except Exception as e:
             context.set_code(grpc.StatusCode.INTERNAL)
             context.set_details(str(e))
             return dictionary_pb2.TermsList()
+    
+    def ListCategories(self, request, context):
+        try:
+            self.service.sync()
+            categories = [
+                dictionary_pb2.CategoryInfo(name=name, term_count=count)
+                for name, count in self.service.list_categories().items()
+            ]
+            return dictionary_pb2.CategoriesList(categories=categories)
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return dictionary_pb2.CategoriesList()
+    
+    def StreamAllTerms(self, request, context):
+        # Генератор отдаёт термины по одному: gRPC забирает следующий только
+        # после отправки предыдущего, так что память не растёт с размером словаря.
+        # Ответы собираются мимо кеша, чтобы полный обход не вытеснял горячие термины
+        try:
+            self.service.sync()
+            for entry in self.service.iter_terms(request.category):
+                yield entry.build_response()
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+
+    def StreamSnapshot(self, request, context):
+        # Снимок в точности соответствует ревизии из начальных метаданных:
+        # реплика загружает его и продолжает подписку WatchTerms с этой ревизии
+        try:
+            self.service.sync()
+            if request.page_size < 0:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details("page_size must not be negative")
+                return
+            revision, snapshot = self.service.revision_snapshot()
+            context.send_initial_metadata(self._watch_metadata(revision))
+            yield from self._snapshot_pages(snapshot, request.page_size)
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+
+    @staticmethod
+    def _snapshot_pages(snapshot: Union[Snapshot, ShardedSnapshot], page_size: int) -> Iterator[dictionary_pb2.TermsList]:
+        """Снимок порциями: сообщение на термин стоит в потоке gRPC дороже самого термина"""
+        page_size = min(page_size or DEFAULT_SNAPSHOT_PAGE, MAX_SNAPSHOT_PAGE)
+        entries = snapshot.entries()
+        while True:
+            page = list(itertools.islice(entries, page_size))
+            if not page:
+                return
+            response = dictionary_pb2.TermsList(total_count=len(snapshot))
+            add = response.terms.add
+            for entry in page:
+                entry.project(add(), SNAPSHOT_FIELDS)
+            yield response
+    
+    def StreamSearch(self, request, context):
+        try:
+            self.service.sync()
+            try:
+                fields = parse_field_mask(request.fields)
+            except ValueError as e:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details(str(e))
+                return
+            for entry in self.service.iter_search(request.query, request.category):
+                yield entry.build_response() if fields is None else entry.project(dictionary_pb2.TermResponse(), fields)
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+
+    def _replica_error(self, context) -> Optional[str]:
+        """Реплика отклоняет запись с FAILED_PRECONDITION: изменения принимает только ведущий"""
+        if self.service.primary is None:
+            return None
+        message = f"Read-only replica, send writes to the primary at {self.service.primary}"
+        context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+        context.set_details(message)
+        return message
 
-def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    dictionary_pb2_grpc.add_DictionaryServiceServicer_to_server(
-        DictionaryServicer(), server)
-    server.add_insecure_port('[::]:50051')
+    def _terms_list(self, records: List[TermRecord], fields: Optional[Tuple[str, ...]],
+                    **kwargs) -> dictionary_pb2.TermsList:
+        """TermsList из записей: полные ответы из кеша или проекции, собранные на месте"""
+        if fields is None:
+            return dictionary_pb2.TermsList(terms=[self.service.response(record) for record in records], **kwargs)
+        response = dictionary_pb2.TermsList(**kwargs)
+        add = response.terms.add
+        for record in records:
+            record.project(add(), fields)
+        return response
+
+    def BatchGetTerms(self, request, context):
+        try:
+            self.service.sync()
+            snapshot = self.service.terms
+            found = {}
+            not_found = []
+            for term in request.terms:
+                entry = snapshot.entry(term)
+                if entry is not None:
+                    found[term] = self.service.response(entry)
+                else:
+                    not_found.append(term)
+            return dictionary_pb2.BatchGetResponse(terms=found, not_found=not_found)
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return dictionary_pb2.BatchGetResponse()
+    
+    def BulkAddTerms(self, request_iterator, context):
+        try:
+            if self._replica_error(context) is not None:
+                return dictionary_pb2.BulkAddResponse()
+            results = []
+            group = []
+            for request in request_iterator:
+                group.append(request)
+                if len(group) >= BULK_ADD_GROUP_SIZE:
+                    results.extend(self._add_group(group))
+                    group = []
+            if group:
+                results.extend(self._add_group(group))
+            return self._bulk_add_response(results)
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return dictionary_pb2.BulkAddResponse()
+    
+    def _add_group(self, group) -> List[dictionary_pb2.BulkAddItemStatus]:
+        """Проверяет и применяет группу AddTermRequest под одной блокировкой писателя"""
+        results = []
+        with self.service.writer(), self.service.reserve(len(group)) as room:
+            now = datetime.utcnow()
+            current_time = now.isoformat() + "Z"
+            snapshot = self.service.terms
+            pending = {}
+            # Нормализованный ключ -> имя среди ещё не применённых терминов группы
+            pending_keys = {}
+            for request in group:
+                term = request.term
+                if term in snapshot or term in pending:
+                    results.append(dictionary_pb2.BulkAddItemStatus(
+                        term=term,
+                        success=False,
+                        message=f"Term '{term}' already exists"
+                    ))
+                    continue
+                key = fold(term)
+                existing = self.service.colliding_term(term) or pending_keys.get(key)
+                if existing is not None:
+                    results.append(dictionary_pb2.BulkAddItemStatus(
+                        term=term,
+                        success=False,
+                        message=f"Term '{term}' collides with existing term '{existing}'"
+                    ))
+                    continue
+                if room is not None and len(pending) >= room:
+                    results.append(dictionary_pb2.BulkAddItemStatus(
+                        term=term,
+                        success=False,
+                        message=f"Dictionary is full ({self.service.max_terms} terms)"
+                    ))
+                    continue
+                pending_keys[key] = term
+                pending[term] = {
+                    "term": term,
+                    "definition": request.definition,
+                    "category": request.category,
+                    "related_terms": list(request.related_terms),
+                    "source": request.source,
+                    "created_at": current_time,
+                    "updated_at": current_time,
+                    "expires_at": self.service.expires_at(request.category, request.ttl_seconds, now)
+                }
+                # Сообщение только для ошибок: ответ на импорт в 100k терминов
+                # должен укладываться в лимит размера сообщения gRPC
+                results.append(dictionary_pb2.BulkAddItemStatus(term=term, success=True))
+            self.service.add_terms(list(pending.values()))
+        self.service.evict()
+        return results
+    
+    def WatchTerms(self, request, context):
+        # Подписка держит поток пула, пока клиент не отключится
+        if not self._join_watchers(context):
+            return
+        try:
+            self.service.sync()
+            revision = request.from_revision or self.service.feed.revision
+            # Заголовок уходит сразу: клиент узнаёт, что подписка действует
+            context.send_initial_metadata(self._watch_metadata(revision))
+            while context.is_active():
+                events = self._watch_events(revision, context)
+                if events is None:
+                    return
+                for event in events:
+                    yield self._term_event(event)
+                    revision = event.revision
+                if not events:
+                    self.service.feed.wait(revision, WATCH_POLL_INTERVAL)
+                    self.service.sync()
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+        finally:
+            self._leave_watchers()
+
+    def _join_watchers(self, context) -> bool:
+        """Занимает место подписчика; сверх --max-watchers — RESOURCE_EXHAUSTED"""
+        with self._watchers_lock:
+            if self.watchers < self.max_watchers:
+                self.watchers += 1
+                return True
+            self.watchers_rejected += 1
+        context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+        context.set_details(f"Too many WatchTerms subscribers (limit {self.max_watchers})")
+        return False
+
+    def _leave_watchers(self):
+        with self._watchers_lock:
+            self.watchers -= 1
+
+    def render_metrics(self) -> List[str]:
+        """Подписчики WatchTerms для эндпоинта /metrics"""
+        return [
+            "# TYPE grpc_server_watchers gauge",
+            f"grpc_server_watchers {self.watchers}",
+            "# TYPE grpc_server_watchers_rejected_total counter",
+            f"grpc_server_watchers_rejected_total {self.watchers_rejected}",
+        ]
+
+    def _watch_metadata(self, revision: int) -> Tuple[Tuple[str, str], ...]:
+        return ((WATCH_REVISION_HEADER, str(revision)), (WATCH_EPOCH_HEADER, str(self.service.version_base)))
+
+    def _watch_events(self, revision: int, context) -> Optional[List[ChangeEvent]]:
+        """События после revision; None, если их уже нет в буфере"""
+        try:
+            return self.service.feed.since(revision)
+        except RevisionUnavailable as e:
+            context.set_code(grpc.StatusCode.OUT_OF_RANGE)
+            context.set_details(str(e))
+            return None
+
+    @staticmethod
+    def _term_event(event: ChangeEvent) -> dictionary_pb2.TermEvent:
+        data = event.record.build_response() if event.record is not None else None
+        return dictionary_pb2.TermEvent(revision=event.revision, type=event.type,
+                                        term=event.term, data=data, published_at_us=event.published_at)
+
+    @staticmethod
+    def _bulk_add_response(results) -> dictionary_pb2.BulkAddResponse:
+        added_count = sum(1 for result in results if result.success)
+        return dictionary_pb2.BulkAddResponse(
+            results=results,
+            added_count=added_count,
+            failed_count=len(results) - added_count
+        )
+
+class AsyncDictionaryServicer(DictionaryServicer):
+    """Сервисер для grpc.aio: чтения выполняются прямо в цикле событий.
+
+    Чтения работают только со снимками в памяти и переиспользуют синхронную
+    реализацию. Записи блокируются — на блокировке шарда, на fsync WAL
+    (--data-dir) и на flock общего журнала воркеров, — поэтому уходят в пул
+    исполнителя: цикл событий продолжает обслуживать чтения, а параллельные
+    записи попадают в один групповой fsync. Воркеры с общим журналом перед
+    чтением догоняют чужие записи тоже в пуле. Пул свой: ожидания WatchTerms
+    занимают пул цикла по умолчанию и не должны задерживать записи.
+    """
+
+    def __init__(self, service: Optional[DictionaryService] = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_watchers: int = DEFAULT_MAX_WATCHERS):
+        super().__init__(service, max_watchers)
+        self._executor = futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dictionary-write")
+
+    async def _offload(self, handler, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, handler, *args)
+
+    async def _catch_up(self):
+        # Остаток — запись другого воркера между этой проверкой и sync() в обработчике
+        shared_log = self.service.shared_log
+        if shared_log is not None and shared_log.has_updates():
+            await self._offload(self.service.sync)
+
+    async def GetTerm(self, request, context):
+        await self._catch_up()
+        return super().GetTerm(request, context)
+
+    async def AddTerm(self, request, context):
+        return await self._offload(super().AddTerm, request, context)
+
+    async def UpdateTerm(self, request, context):
+        return await self._offload(super().UpdateTerm, request, context)
+
+    async def DeleteTerm(self, request, context):
+        return await self._offload(super().DeleteTerm, request, context)
+
+    async def GetAllTerms(self, request, context):
+        await self._catch_up()
+        return super().GetAllTerms(request, context)
+
+    async def SearchTerms(self, request, context):
+        await self._catch_up()
+        return super().SearchTerms(request, context)
+
+    async def SuggestTerms(self, request, context):
+        await self._catch_up()
+        return super().SuggestTerms(request, context)
+
+    async def FuzzySearch(self, request, context):
+        await self._catch_up()
+        return super().FuzzySearch(request, context)
+
+    async def GetTermsByCategory(self, request, context):
+        await self._catch_up()
+        return super().GetTermsByCategory(request, context)
+
+    async def GetRelatedTerms(self, request, context):
+        await self._catch_up()
+        return super().GetRelatedTerms(request, context)
+
+    async def ListCategories(self, request, context):
+        await self._catch_up()
+        return super().ListCategories(request, context)
+
+    async def StreamAllTerms(self, request, context):
+        await self._catch_up()
+        for response in super().StreamAllTerms(request, context):
+            yield response
+
+    async def StreamSnapshot(self, request, context):
+        # Метаданные отправляются через await, поэтому синхронный генератор не переиспользуется
+        try:
+            await self._catch_up()
+            if request.page_size < 0:
+                context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+                context.set_details("page_size must not be negative")
+                return
+            revision, snapshot = self.service.revision_snapshot()
+            await context.send_initial_metadata(self._watch_metadata(revision))
+            for response in self._snapshot_pages(snapshot, request.page_size):
+                yield response
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+
+    async def StreamSearch(self, request, context):
+        await self._catch_up()
+        for response in super().StreamSearch(request, context):
+            yield response
+
+    async def BatchGetTerms(self, request, context):
+        await self._catch_up()
+        return super().BatchGetTerms(request, context)
+
+    async def BulkAddTerms(self, request_iterator, context):
+        try:
+            if self._replica_error(context) is not None:
+                return dictionary_pb2.BulkAddResponse()
+            results = []
+            group = []
+            async for request in request_iterator:
+                group.append(request)
+                if len(group) >= BULK_ADD_GROUP_SIZE:
+                    results.extend(await self._offload(self._add_group, group))
+                    group = []
+            if group:
+                results.extend(await self._offload(self._add_group, group))
+            return self._bulk_add_response(results)
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+            return dictionary_pb2.BulkAddResponse()
+
+    async def WatchTerms(self, request, context):
+        # Ожидание новых изменений уходит в пул исполнителя, не блокируя цикл событий
+        if not self._join_watchers(context):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+            feed = self.service.feed
+            await self._catch_up()
+            revision = request.from_revision or feed.revision
+            await context.send_initial_metadata(self._watch_metadata(revision))
+            while not context.done():
+                events = self._watch_events(revision, context)
+                if events is None:
+                    return
+                for event in events:
+                    yield self._term_event(event)
+                    revision = event.revision
+                if not events:
+                    await loop.run_in_executor(None, feed.wait, revision, WATCH_POLL_INTERVAL)
+                    await self._catch_up()
+        except Exception as e:
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(str(e))
+        finally:
+            self._leave_watchers()
+
+SERVER_MODES = ("thread", "aio")
+DEFAULT_ADDRESS = '[::]:50051'
+REUSEPORT_OPTIONS = [("grpc.so_reuseport", 1)]
+
+def serve(address: str = DEFAULT_ADDRESS, max_workers: int = DEFAULT_MAX_WORKERS,
+          service: Optional[DictionaryService] = None, options=None,
+          metrics: Optional[MetricsRegistry] = None, admission: Optional[AdmissionInterceptor] = None,
+          max_watchers: int = DEFAULT_MAX_WATCHERS):
+    interceptors = []
+    maximum_concurrent_rpcs = None
+    if admission is not None:
+        # Пул вмещает все допущенные вызовы, лишние grpc отклоняет сам
+        max_workers = max(max_workers, admission.threads_needed)
+        interceptors.append(admission)
+        if metrics is not None:
+            metrics.add_collector(admission.render_metrics)
+    # Подписки держат поток до отключения клиента, поэтому потоки под них
+    # добавляются сверх пула вызовов, а не отнимаются у него
+    threads = max_workers + max_watchers
+    if admission is not None:
+        maximum_concurrent_rpcs = threads
+    servicer = DictionaryServicer(service, max_watchers)
+    if metrics is not None:
+        interceptors.append(MetricsInterceptor(metrics))
+        metrics.add_collector(servicer.render_metrics)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=threads),
+                         interceptors=interceptors, options=options,
+                         maximum_concurrent_rpcs=maximum_concurrent_rpcs)
+    dictionary_pb2_grpc.add_DictionaryServiceServicer_to_server(servicer, server)
+    server.add_insecure_port(address)
     server.start()
-    print("gRPC Dictionary Server started on port 50051")
+    print(f"gRPC Dictionary Server started on {address} "
+          f"(thread pool, {max_workers} workers + {max_watchers} watchers, pid {os.getpid()})")
     
     try:
         while True:
@@ -292,6 +1656,194 @@ def serve():
     except KeyboardInterrupt:
         server.stop(0)
 
+async def serve_aio(address: str = DEFAULT_ADDRESS, service: Optional[DictionaryService] = None,
+                    options=None, metrics: Optional[MetricsRegistry] = None,
+                    max_workers: int = DEFAULT_MAX_WORKERS, max_watchers: int = DEFAULT_MAX_WATCHERS):
+    interceptors = [AsyncMetricsInterceptor(metrics)] if metrics is not None else None
+    servicer = AsyncDictionaryServicer(service, max_workers, max_watchers)
+    if metrics is not None:
+        metrics.add_collector(servicer.render_metrics)
+    server = grpc.aio.server(interceptors=interceptors, options=options)
+    dictionary_pb2_grpc.add_DictionaryServiceServicer_to_server(servicer, server)
+    server.add_insecure_port(address)
+    await server.start()
+    print(f"gRPC Dictionary Server started on {address} (asyncio, pid {os.getpid()})")
+    
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(0)
+
+def open_args_seed(args) -> Optional[Iterator[TermRecord]]:
+    return open_seed(args.seed_file, args.seed_format) if args.seed_file else None
+
+def run_server(args, service: Optional[DictionaryService] = None, options=None, metrics_port: int = 0):
+    follower = None
+    if service is None and args.follow:
+        service = DictionaryService(watch_buffer=args.watch_buffer, shard_count=args.shards, primary=args.follow)
+        follower = Follower(service, args.follow)
+        follower.start()
+    elif service is None:
+        persistence = Persistence(args.data_dir, args.snapshot_every) if args.data_dir else None
+        service = DictionaryService(persistence=persistence, seed=open_args_seed(args),
+                                    watch_buffer=args.watch_buffer, shard_count=args.shards,
+                                    max_terms=args.max_terms, eviction=args.eviction, retention=args.retention)
+    metrics = None
+    metrics_port = metrics_port or args.metrics_port
+    if metrics_port:
+        metrics = MetricsRegistry()
+        if follower is not None:
+            metrics.add_collector(follower.render_metrics)
+        else:
+            metrics.add_collector(service.render_metrics)
+        start_metrics_server(metrics, metrics_port)
+        print(f"Metrics available on http://0.0.0.0:{metrics_port}/metrics")
+    if follower is not None:
+        # Порт открывается, когда словарь ведущего загружен: до этого реплике нечего отдавать
+        print(f"Replicating from primary {args.follow}")
+        follower.wait_bootstrapped()
+    if args.mode == "aio":
+        try:
+            asyncio.run(serve_aio(args.address, service, options, metrics, args.max_workers, args.max_watchers))
+        except KeyboardInterrupt:
+            pass
+    else:
+        admission = None
+        if args.read_limit:
+            admission = AdmissionInterceptor(args.read_limit, args.write_limit, args.queue_size,
+                                             args.queue_timeout, WRITE_METHODS, UNLIMITED_METHODS)
+        serve(args.address, args.max_workers, service, options, metrics, admission, args.max_watchers)
+
+def run_worker(args, log_path: str, index: int):
+    """Воркер: своя копия словаря, синхронизация с остальными через общий журнал"""
+    service = DictionaryService(shared_log=SharedLog(log_path, index, args.workers), seed=open_args_seed(args),
+                                watch_buffer=args.watch_buffer, shard_count=args.shards,
+                                max_terms=args.max_terms, eviction=args.eviction, retention=args.retention)
+    # У каждого воркера свой эндпоинт метрик: порт + номер воркера
+    metrics_port = args.metrics_port + index if args.metrics_port else 0
+    run_server(args, service, REUSEPORT_OPTIONS, metrics_port)
+
+def serve_workers(args):
+    """Запускает N процессов, слушающих один порт через SO_REUSEPORT.
+
+    Процессы создаются до того, как в родителе появится хоть один объект gRPC,
+    иначе fork небезопасен.
+    """
+    # Каталог для журнала по умолчанию удаляется при остановке; --shared-log остаётся
+    log_dir = None if args.shared_log else tempfile.mkdtemp(prefix="dictionary-")
+    log_path = args.shared_log or os.path.join(log_dir, "changes.log")
+    SharedLog.create(log_path, args.workers)
+
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=run_worker, args=(args, log_path, index)) for index in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    print(f"Started {args.workers} worker processes, shared log {log_path}")
+
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+    finally:
+        if log_dir is not None:
+            shutil.rmtree(log_dir, ignore_errors=True)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="gRPC Dictionary Server")
+    parser.add_argument("--mode", choices=SERVER_MODES,
+                        default=os.environ.get("GRPC_SERVER_MODE", "thread"),
+                        help="thread — пул потоков, aio — grpc.aio (env GRPC_SERVER_MODE)")
+    parser.add_argument("--address", default=os.environ.get("GRPC_ADDRESS", DEFAULT_ADDRESS))
+    parser.add_argument("--max-workers", type=int,
+                        default=int(os.environ.get("GRPC_MAX_WORKERS", DEFAULT_MAX_WORKERS)),
+                        help="размер пула потоков: все вызовы в режиме thread, записи в режиме aio (env GRPC_MAX_WORKERS)")
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("GRPC_WORKERS", 1)),
+                        help="число процессов-воркеров на одном порту (env GRPC_WORKERS)")
+    parser.add_argument("--shared-log", default=os.environ.get("GRPC_SHARED_LOG"),
+                        help="файл общего журнала изменений воркеров (по умолчанию временный)")
+    parser.add_argument("--data-dir", default=os.environ.get("DICTIONARY_DATA_DIR"),
+                        help="каталог WAL и снимков; без него данные живут только в памяти")
+    parser.add_argument("--snapshot-every", type=int,
+                        default=int(os.environ.get("DICTIONARY_SNAPSHOT_EVERY", 100_000)),
+                        help="снимок после стольких записей журнала")
+    parser.add_argument("--seed-file", default=os.environ.get("DICTIONARY_SEED_FILE"),
+                        help="начальный словарь: JSON Lines или TermResponse с префиксом длины varint")
+    parser.add_argument("--seed-format", choices=SEED_FORMATS,
+                        default=os.environ.get("DICTIONARY_SEED_FORMAT", "auto"),
+                        help="формат --seed-file; auto — по расширению (.jsonl/.ndjson — JSON Lines)")
+    parser.add_argument("--metrics-port", type=int,
+                        default=int(os.environ.get("GRPC_METRICS_PORT", 0)),
+                        help="порт HTTP-эндпоинта /metrics в формате Prometheus; 0 — метрики выключены")
+    parser.add_argument("--read-limit", type=int,
+                        default=int(os.environ.get("GRPC_READ_LIMIT", 0)),
+                        help="одновременно выполняемые чтения; 0 — контроль допуска выключен")
+    parser.add_argument("--write-limit", type=int,
+                        default=int(os.environ.get("GRPC_WRITE_LIMIT", 2)),
+                        help="одновременно выполняемые записи (при включённом --read-limit)")
+    parser.add_argument("--queue-size", type=int,
+                        default=int(os.environ.get("GRPC_QUEUE_SIZE", 20)),
+                        help="сколько вызовов каждого класса может ждать слота, остальным RESOURCE_EXHAUSTED")
+    parser.add_argument("--queue-timeout", type=float,
+                        default=float(os.environ.get("GRPC_QUEUE_TIMEOUT", 1.0)),
+                        help="сколько секунд вызов ждёт слота, прежде чем получить RESOURCE_EXHAUSTED")
+    parser.add_argument("--watch-buffer", type=int,
+                        default=int(os.environ.get("GRPC_WATCH_BUFFER", DEFAULT_WATCH_BUFFER)),
+                        help="сколько последних изменений хранится для возобновления WatchTerms")
+    parser.add_argument("--max-watchers", type=int,
+                        default=int(os.environ.get("GRPC_MAX_WATCHERS", DEFAULT_MAX_WATCHERS)),
+                        help="одновременные подписки WatchTerms, сверх — RESOURCE_EXHAUSTED; "
+                             "в режиме thread столько потоков добавляется к --max-workers (env GRPC_MAX_WATCHERS)")
+    parser.add_argument("--shards", type=int,
+                        default=int(os.environ.get("DICTIONARY_SHARDS", DEFAULT_SHARDS)),
+                        help="число шардов словаря со своими блокировками писателя и индексами")
+    parser.add_argument("--follow", metavar="HOST:PORT", default=os.environ.get("DICTIONARY_PRIMARY"),
+                        help="адрес ведущего: сервер становится репликой только для чтения (env DICTIONARY_PRIMARY)")
+    parser.add_argument("--max-terms", type=int,
+                        default=int(os.environ.get("DICTIONARY_MAX_TERMS", 0)),
+                        help="предел числа терминов; 0 — без предела (env DICTIONARY_MAX_TERMS)")
+    parser.add_argument("--eviction", choices=EVICTION_POLICIES,
+                        default=os.environ.get("DICTIONARY_EVICTION", DEFAULT_EVICTION),
+                        help="что делать при достижении --max-terms: expiring — вытеснять термины со сроком "
+                             "жизни, затем самые старые; oldest — самые старые; reject — отклонять новые")
+    parser.add_argument("--retention", metavar="CATEGORY=SECONDS", action="append",
+                        help="срок хранения терминов категории без своего TTL; можно повторять "
+                             "(env DICTIONARY_RETENTION=LoadTest=600,Temp=60)")
+    args = parser.parse_args()
+    if args.watch_buffer < 1:
+        parser.error("--watch-buffer must be at least 1")
+    if args.max_watchers < 0:
+        parser.error("--max-watchers must not be negative")
+    if args.shards < 1:
+        parser.error("--shards must be at least 1")
+    if args.read_limit and args.mode == "aio":
+        parser.error("--read-limit is supported only in thread mode")
+    if args.read_limit and args.write_limit < 1:
+        parser.error("--write-limit must be at least 1")
+    if args.data_dir and args.workers > 1:
+        parser.error("--data-dir is supported only with a single worker")
+    if args.follow and (args.workers > 1 or args.data_dir or args.seed_file):
+        parser.error("--follow cannot be combined with --workers, --data-dir or --seed-file")
+    if args.max_terms < 0:
+        parser.error("--max-terms must not be negative")
+    if args.follow and (args.max_terms or args.retention):
+        parser.error("--max-terms and --retention are set on the primary, replicas follow its deletions")
+    if args.retention is None:
+        args.retention = [item for item in os.environ.get("DICTIONARY_RETENTION", "").split(",") if item]
+    try:
+        args.retention = parse_retention(args.retention)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
-    serve()
\ No newline at end of file
+    args = parse_args()
+    if args.workers > 1:
+        serve_workers(args)
+    else:
+        run_server(args)
@@ -0,0 +1,150 @@
+"""Разбиение словаря на шарды по хешу термина.
+
+У каждого шарда своя блокировка писателя, свои снимки и свои индексы,
+привязанные к ключу: триграммы, категории, порядок ключей и
+нормализованные имена. Запись одного термина блокирует только его шард,
+а вставка в отсортированные массивы и копирование корзины снимка
+стоят O(N / S) вместо O(N). Чтения по всему словарю сливают ответы шардов.
+
+Граф связей, лента изменений и WAL общие: у них свои короткие блокировки.
+"""
+import heapq
+import itertools
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from indexes import CategoryIndex, OrderedKeyIndex, PrefixIndex, TrigramIndex, fold
+from storage import ShardedSnapshot, Snapshot, TermRecord, TermStore, shard_index
+
+
+class Shard:
+    def __init__(self, seq: Iterable[int]):
+        self.store = TermStore(seq=seq)
+        self.lock = self.store.write_lock
+        self.search_index = TrigramIndex()
+        self.category_index = CategoryIndex()
+        self.order_index = OrderedKeyIndex()
+        self.prefix_index = PrefixIndex()
+        # Суммарная длина определений шарда в словах
+        self.definition_words = 0
+
+
+class AllShardsLock:
+    """Блокировка всех шардов для групповых операций.
+
+    Шарды блокируются всегда в одном порядке. Поток, держащий
+    блокировку одного шарда, не должен брать эту: иначе взаимоблокировка.
+    """
+
+    def __init__(self, shards: Tuple[Shard, ...]):
+        self._locks = [shard.lock for shard in shards]
+
+    def __enter__(self):
+        for lock in self._locks:
+            lock.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        for lock in reversed(self._locks):
+            lock.release()
+
+
+class ShardSet:
+    def __init__(self, count: int):
+        # Общий счётчик сохраняет сквозной порядок добавления между шардами
+        self._seq = itertools.count()
+        self.shards = tuple(Shard(self._seq) for _ in range(count))
+        self.write_lock = AllShardsLock(self.shards)
+
+    def next_seq(self) -> int:
+        """Номер, больший seq всех уже добавленных записей"""
+        return next(self._seq)
+
+    def __len__(self) -> int:
+        return len(self.shards)
+
+    def __iter__(self):
+        return iter(self.shards)
+
+    def shard(self, key: str) -> Shard:
+        return self.shards[shard_index(key, len(self.shards))]
+
+    def snapshot(self) -> Union[Snapshot, ShardedSnapshot]:
+        if len(self.shards) == 1:
+            return self.shards[0].store.snapshot()
+        return ShardedSnapshot(tuple(shard.store.snapshot() for shard in self.shards))
+
+    def group(self, records: Iterable[TermRecord]) -> List[Tuple[Shard, List[TermRecord]]]:
+        """Записи по шардам; порядок внутри шарда сохраняется"""
+        if len(self.shards) == 1:
+            return [(self.shards[0], list(records))]
+        groups: Dict[int, List[TermRecord]] = {}
+        for record in records:
+            groups.setdefault(shard_index(record.term, len(self.shards)), []).append(record)
+        return [(self.shards[index], group) for index, group in sorted(groups.items())]
+
+    @property
+    def definition_words(self) -> int:
+        return sum(shard.definition_words for shard in self.shards)
+
+    def keys_after(self, key: Optional[str], count: int) -> List[str]:
+        """До count ключей всего словаря, строго больших key"""
+        if len(self.shards) == 1:
+            return self.shards[0].order_index.after(key, count)
+        merged = heapq.merge(*(shard.order_index.after(key, count) for shard in self.shards))
+        return list(itertools.islice(merged, count))
+
+    def keys_slice(self, start: int, count: int) -> List[str]:
+        """Ключи с позиции start; при нескольких шардах стоит O(S * (start + count))"""
+        if len(self.shards) == 1:
+            return self.shards[0].order_index.slice(start, count)
+        merged = heapq.merge(*(shard.order_index.slice(0, start + count) for shard in self.shards))
+        return list(itertools.islice(merged, start, start + count))
+
+    def category_terms(self, category: str) -> List[List[str]]:
+        """Термины категории по шардам, в каждом — в порядке добавления"""
+        return [shard.category_index.terms(category) for shard in self.shards]
+
+    def category_counts(self) -> Dict[str, int]:
+        if len(self.shards) == 1:
+            return self.shards[0].category_index.counts()
+        counts: Counter = Counter()
+        for shard in self.shards:
+            counts.update(shard.category_index.counts())
+        return dict(sorted(counts.items()))
+
+    def candidates(self, query: str) -> Optional[List[List[str]]]:
+        """Кандидаты триграммного индекса по шардам; None — нужен полный перебор"""
+        results = []
+        for shard in self.shards:
+            keys = shard.search_index.candidates(query)
+            if keys is None:
+                return None
+            results.append(keys)
+        return results
+
+    def estimate(self, text: str) -> Optional[int]:
+        total = 0
+        for shard in self.shards:
+            count = shard.search_index.estimate(text)
+            if count is None:
+                return None
+            total += count
+        return total
+
+    def lookup(self, term: str) -> List[str]:
+        """Имена с тем же нормализованным ключом; все они в одном шарде"""
+        return self.shard(term).prefix_index.lookup(term)
+
+    def complete(self, prefix: str, limit: int) -> List[str]:
+        if len(self.shards) == 1:
+            return self.shards[0].prefix_index.complete(prefix, limit)
+        merged = heapq.merge(*(shard.prefix_index.complete(prefix, limit) for shard in self.shards), key=fold)
+        return list(itertools.islice(merged, limit))
+
+    def fuzzy(self, query: str, max_distance: int, limit: int) -> List[Tuple[str, int]]:
+        if len(self.shards) == 1:
+            return self.shards[0].prefix_index.fuzzy(query, max_distance, limit)
+        merged = heapq.merge(*(shard.prefix_index.fuzzy(query, max_distance, limit) for shard in self.shards),
+                             key=lambda match: (match[1], fold(match[0])))
+        return list(itertools.islice(merged, limit))
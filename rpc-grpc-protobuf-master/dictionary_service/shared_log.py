@@ -0,0 +1,135 @@
+import fcntl
+import json
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+
+# Заголовок журнала: поколение и сдвиг последнего сжатия, затем по слоту
+# на воркер — поколение и позиция, докуда он применил записи
+HEADER = struct.Struct("<QQ")
+SLOT = struct.Struct("<QQ")
+# С какого размера записей журнал сжимается: прочитанное всеми отбрасывается
+DEFAULT_COMPACT_BYTES = 64 * 1024 * 1024
+
+
+class SharedLog:
+    """Общий журнал изменений для процессов-воркеров одного хоста.
+
+    Каждый воркер хранит свою копию словаря. Запись выполняется под
+    эксклюзивной блокировкой файла: воркер сначала догоняет журнал, затем
+    применяет изменение у себя и дописывает его в конец. Перед чтением
+    воркер сверяет размер файла со своей позицией и применяет новые записи
+    под разделяемой блокировкой, поэтому подтверждённая запись видна в любом
+    воркере.
+
+    Журнал не растёт бесконечно: каждый воркер отмечает в своём слоте
+    заголовка, докуда применил записи. Когда записи превышают compact_bytes,
+    а хотя бы половину их прочитали все воркеры, пишущий воркер переносит
+    непрочитанный хвост в начало, обрезает файл и увеличивает поколение,
+    записав сдвиг. Воркер, увидевший новое поколение, вычитает сдвиг из своей
+    позиции. Сжатие ждёт, пока все воркеры увидят текущее поколение, так что
+    сдвиг всегда один.
+    """
+
+    def __init__(self, path: str, worker: int = 0, workers: int = 1,
+                 compact_bytes: int = DEFAULT_COMPACT_BYTES):
+        self.path = path
+        self.compact_bytes = compact_bytes
+        self.compactions = 0
+        self._fd = os.open(path, os.O_RDWR)
+        self._workers = workers
+        self._slot = HEADER.size + SLOT.size * worker
+        self._start = HEADER.size + SLOT.size * workers
+        self._generation, _ = self._read_header()
+        self._offset = self._start
+        self._exclusive = False
+        # flock не различает потоки одного процесса, поэтому нужен ещё и RLock
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def create(path: str, workers: int):
+        """Создаёт пустой журнал на workers воркеров (существующий перезаписывается)"""
+        start = HEADER.size + SLOT.size * workers
+        with open(path, "wb") as log_file:
+            log_file.write(HEADER.pack(0, 0) + SLOT.pack(0, start) * workers)
+
+    @property
+    def size(self) -> int:
+        return os.fstat(self._fd).st_size
+
+    def _read_header(self) -> Tuple[int, int]:
+        return HEADER.unpack(os.pread(self._fd, HEADER.size, 0))
+
+    def _read_slots(self) -> List[Tuple[int, int]]:
+        return list(SLOT.iter_unpack(os.pread(self._fd, SLOT.size * self._workers, HEADER.size)))
+
+    def has_updates(self) -> bool:
+        return self.size != self._offset or self._read_header()[0] != self._generation
+
+    def catch_up(self, apply: Callable[[dict], None]):
+        """Применяет записи, добавленные другими воркерами после нашей позиции"""
+        with self._lock:
+            # Под эксклюзивной блокировкой разделяемую брать нельзя: flock её понизит
+            shared = not self._exclusive
+            if shared:
+                fcntl.flock(self._fd, fcntl.LOCK_SH)
+            try:
+                generation, shift = self._read_header()
+                if generation != self._generation:
+                    # Журнал сжат: всё до нашей позиции отброшено, хвост сдвинут к началу
+                    self._generation = generation
+                    self._offset -= shift
+                data = os.pread(self._fd, self.size - self._offset, self._offset)
+                end = data.rfind(b"\n") + 1
+                for line in data[:end].splitlines():
+                    apply(json.loads(line))
+                self._offset += end
+                os.pwrite(self._fd, SLOT.pack(self._generation, self._offset), self._slot)
+            finally:
+                if shared:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def exclusive(self):
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            self._exclusive = True
+            try:
+                yield
+            finally:
+                self._exclusive = False
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def append(self, change: dict):
+        """Дописывает изменение; вызывать внутри exclusive() после catch_up()"""
+        if self._offset - self._start >= self.compact_bytes:
+            self._compact()
+        line = json.dumps(change, ensure_ascii=False).encode("utf-8") + b"\n"
+        os.pwrite(self._fd, line, self._offset)
+        self._offset += len(line)
+        os.pwrite(self._fd, SLOT.pack(self._generation, self._offset), self._slot)
+
+    def _compact(self):
+        """Отбрасывает записи, прочитанные всеми воркерами; вызывать под exclusive()"""
+        slots = self._read_slots()
+        if any(generation != self._generation for generation, _ in slots):
+            return
+        shift = min(offset for _, offset in slots) - self._start
+        if shift * 2 < self._offset - self._start:
+            # Отстающий воркер не прочитал и половины: переносить почти весь журнал незачем
+            return
+        tail = os.pread(self._fd, self._offset - self._start - shift, self._start + shift)
+        os.pwrite(self._fd, tail, self._start)
+        os.ftruncate(self._fd, self._start + len(tail))
+        self._generation += 1
+        self._offset -= shift
+        # Слоты сдвигаются вместе с записями, но поколение у них старое:
+        # до следующего сжатия каждый воркер должен увидеть этот сдвиг
+        os.pwrite(self._fd, HEADER.pack(self._generation, shift) + b"".join(
+            SLOT.pack(generation, offset - shift) for generation, offset in slots), 0)
+        self.compactions += 1
+
+    def close(self):
+        os.close(self._fd)
@@ -0,0 +1,344 @@
+import hashlib
+import heapq
+import itertools
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import dictionary_pb2
+from indexes import fold
+
+DEFAULT_BUCKET_COUNT = 256
+EPOCH = datetime(1970, 1, 1)
+
+
+def parse_timestamp(value: str) -> int:
+    """ISO 8601 -> микросекунды от эпохи (UTC); пустая строка даёт 0"""
+    if not value:
+        return 0
+    moment = datetime.fromisoformat(value[:-1] if value.endswith("Z") else value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def format_timestamp(value: int) -> str:
+    """Обратно в формат, который пишет сервер: 2024-01-15T10:00:00Z"""
+    if not value:
+        return ""
+    return (EPOCH + timedelta(microseconds=value)).isoformat() + "Z"
+
+
+class TermRecord:
+    """Компактная запись хранилища.
+
+    Вместо словаря с ключами — слоты, related_terms хранится кортежем,
+    категория и источник интернируются (их мало, а терминов миллионы),
+    время — целым числом микросекунд. TermResponse собирается по запросу.
+    После публикации в снимке запись не изменяется.
+    """
+
+    __slots__ = ("seq", "term", "definition", "category", "related_terms",
+                 "source", "created_at", "updated_at", "expires_at", "_version")
+
+    def __init__(self, term: str, definition: str, category: str, related_terms: Tuple[str, ...],
+                 source: str, created_at: int, updated_at: int, seq: int = 0, expires_at: int = 0):
+        self.seq = seq
+        self.term = term
+        self.definition = definition
+        self.category = sys.intern(category)
+        self.related_terms = related_terms
+        self.source = sys.intern(source)
+        self.created_at = created_at
+        self.updated_at = updated_at
+        # Срок жизни, микросекунды от эпохи; 0 — бессрочно
+        self.expires_at = expires_at
+        self._version = 0
+
+    @classmethod
+    def from_data(cls, data: dict) -> "TermRecord":
+        return cls(
+            data["term"],
+            data["definition"],
+            data["category"],
+            tuple(data["related_terms"]),
+            data["source"],
+            parse_timestamp(data["created_at"]),
+            parse_timestamp(data["updated_at"]),
+            expires_at=parse_timestamp(data.get("expires_at", "")),
+        )
+
+    @classmethod
+    def from_response(cls, response: dictionary_pb2.TermResponse) -> "TermRecord":
+        return cls(
+            response.term,
+            response.definition,
+            response.category,
+            tuple(response.related_terms),
+            response.source,
+            parse_timestamp(response.created_at),
+            parse_timestamp(response.updated_at),
+            expires_at=parse_timestamp(response.expires_at),
+        )
+
+    @property
+    def version(self) -> int:
+        """Версия содержимого: 64-битный дайджест всех полей.
+
+        Не зависит от процесса и порядка записей, поэтому совпадает на всех
+        воркерах и после перезапуска. Вычисляется при первом обращении.
+        """
+        if not self._version:
+            content = "\x00".join((self.term, self.definition, self.category, "\x01".join(self.related_terms),
+                                   self.source, str(self.created_at), str(self.updated_at)))
+            if self.expires_at:
+                # Бессрочные термины сохраняют прежние версии
+                content += f"\x00{self.expires_at}"
+            digest = hashlib.blake2b(content.encode("utf-8"), digest_size=8).digest()
+            # 0 в запросах означает «без условия»
+            self._version = int.from_bytes(digest, "little") or 1
+        return self._version
+
+    @property
+    def data(self) -> dict:
+        """Данные термина в виде словаря (для журналов изменений)"""
+        return {
+            "term": self.term,
+            "definition": self.definition,
+            "category": self.category,
+            "related_terms": list(self.related_terms),
+            "source": self.source,
+            "created_at": format_timestamp(self.created_at),
+            "updated_at": format_timestamp(self.updated_at),
+            "expires_at": format_timestamp(self.expires_at),
+        }
+
+    def build_response(self, versioned: bool = True) -> dictionary_pb2.TermResponse:
+        """TermResponse записи; снимку на диске версия не нужна — она вычисляется заново"""
+        return dictionary_pb2.TermResponse(
+            term=self.term,
+            definition=self.definition,
+            category=self.category,
+            related_terms=self.related_terms,
+            source=self.source,
+            created_at=format_timestamp(self.created_at),
+            updated_at=format_timestamp(self.updated_at),
+            version=self.version if versioned else 0,
+            expires_at=format_timestamp(self.expires_at)
+        )
+
+    def project(self, response: dictionary_pb2.TermResponse,
+                fields: Tuple[str, ...]) -> dictionary_pb2.TermResponse:
+        """Заполняет в response только поля fields (имена из PROJECTION_FIELDS).
+
+        response — обычно элемент TermsList.terms.add(): сообщение строится
+        сразу на месте, без копирования в список.
+        """
+        for field in fields:
+            PROJECTION_FIELDS[field](self, response)
+        return response
+
+
+# Поля TermResponse, доступные в проекциях: запись -> поле ответа
+PROJECTION_FIELDS = {
+    "term": lambda record, response: setattr(response, "term", record.term),
+    "definition": lambda record, response: setattr(response, "definition", record.definition),
+    "category": lambda record, response: setattr(response, "category", record.category),
+    "related_terms": lambda record, response: response.related_terms.extend(record.related_terms),
+    "source": lambda record, response: setattr(response, "source", record.source),
+    "created_at": lambda record, response: setattr(response, "created_at", format_timestamp(record.created_at)),
+    "updated_at": lambda record, response: setattr(response, "updated_at", format_timestamp(record.updated_at)),
+    "version": lambda record, response: setattr(response, "version", record.version),
+    "expires_at": lambda record, response: setattr(response, "expires_at", format_timestamp(record.expires_at)),
+}
+
+
+class ResponseCache:
+    """LRU готовых TermResponse для часто читаемых терминов.
+
+    Ключ — сама запись: обновление термина публикует новую запись,
+    поэтому устаревший ответ просто перестаёт находиться.
+    """
+
+    def __init__(self, size: int):
+        self._size = size
+        self._cache: "OrderedDict[str, Tuple[TermRecord, dictionary_pb2.TermResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, record: TermRecord) -> dictionary_pb2.TermResponse:
+        with self._lock:
+            cached = self._cache.get(record.term)
+            if cached is not None and cached[0] is record:
+                self._cache.move_to_end(record.term)
+                return cached[1]
+
+        response = record.build_response()
+
+        with self._lock:
+            self._cache[record.term] = (record, response)
+            self._cache.move_to_end(record.term)
+            if len(self._cache) > self._size:
+                self._cache.popitem(last=False)
+        return response
+
+
+class Snapshot(Mapping):
+    """Неизменяемый снимок словаря: термин -> данные термина.
+
+    Снимок разбит на корзины по хешу ключа. Корзины и записи после
+    публикации снимка не изменяются, поэтому читатель может работать
+    со снимком без блокировок сколь угодно долго.
+    """
+
+    __slots__ = ("version", "_buckets", "_size")
+
+    def __init__(self, version: int, buckets: Tuple[Dict[str, TermRecord], ...], size: int):
+        self.version = version
+        self._buckets = buckets
+        self._size = size
+
+    def _bucket(self, key: str) -> Dict[str, TermRecord]:
+        return self._buckets[hash(key) % len(self._buckets)]
+
+    def entry(self, key: str) -> Optional[TermRecord]:
+        return self._bucket(key).get(key)
+
+    def __getitem__(self, key: str) -> dict:
+        return self._bucket(key)[key].data
+
+    def __contains__(self, key) -> bool:
+        return key in self._bucket(key)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def entries(self) -> Iterator[TermRecord]:
+        """Записи в порядке добавления (слияние отсортированных корзин)"""
+        return heapq.merge(*(bucket.values() for bucket in self._buckets), key=lambda entry: entry.seq)
+
+    def __iter__(self) -> Iterator[str]:
+        return (entry.term for entry in self.entries())
+
+
+def shard_index(key: str, shard_count: int) -> int:
+    """Шард термина.
+
+    Шард выбирается по нормализованному имени: имена, отличающиеся лишь
+    регистром или записью Unicode, попадают в один шард, и проверка их
+    конфликта идёт под одной блокировкой. Старшие биты хеша не связаны с
+    младшими, по которым выбирается корзина внутри шарда.
+    """
+    return (hash(fold(key)) >> 32) % shard_count
+
+
+class ShardedSnapshot(Mapping):
+    """Снимок словаря из снимков шардов.
+
+    Снимки шардов берутся по очереди без общей блокировки: каждый
+    согласован сам по себе, но запись в другой шард может попасть в
+    общий снимок, а может и нет.
+    """
+
+    __slots__ = ("_shards", "_size")
+
+    def __init__(self, shards: Tuple[Snapshot, ...]):
+        self._shards = shards
+        self._size = sum(len(snapshot) for snapshot in shards)
+
+    def entry(self, key: str) -> Optional[TermRecord]:
+        return self._shards[shard_index(key, len(self._shards))].entry(key)
+
+    def __getitem__(self, key: str) -> dict:
+        return self._shards[shard_index(key, len(self._shards))][key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._shards[shard_index(key, len(self._shards))]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def entries(self) -> Iterator[TermRecord]:
+        """Записи в порядке добавления (слияние корзин всех шардов)"""
+        return heapq.merge(*(bucket.values() for snapshot in self._shards for bucket in snapshot._buckets),
+                           key=lambda entry: entry.seq)
+
+    def __iter__(self) -> Iterator[str]:
+        return (entry.term for entry in self.entries())
+
+
+class TermStore:
+    """Хранилище терминов с копированием при записи.
+
+    Читатели берут текущий снимок (одно чтение атрибута) и никогда не
+    блокируются. Писатели сериализуются через write_lock: изменение
+    копирует одну корзину и кортеж корзин, после чего новый снимок
+    публикуется атомарной заменой ссылки.
+    """
+
+    def __init__(self, bucket_count: int = DEFAULT_BUCKET_COUNT,
+                 seq: Optional[Iterator[int]] = None):
+        self.write_lock = threading.RLock()
+        self._snapshot = Snapshot(0, tuple({} for _ in range(bucket_count)), 0)
+        # Порядок добавления; шарды одного словаря делят общий счётчик
+        self._seq = seq if seq is not None else itertools.count()
+
+    def snapshot(self) -> Snapshot:
+        return self._snapshot
+
+    def _publish(self, key: str, bucket: Dict[str, TermRecord], size: int):
+        current = self._snapshot
+        index = hash(key) % len(current._buckets)
+        buckets = current._buckets[:index] + (bucket,) + current._buckets[index + 1:]
+        self._snapshot = Snapshot(current.version + 1, buckets, size)
+
+    def put(self, record: TermRecord):
+        """Добавляет или заменяет запись; вызывать под write_lock"""
+        key = record.term
+        current = self._snapshot
+        bucket = dict(current._bucket(key))
+        old = bucket.get(key)
+        if old is None:
+            record.seq = next(self._seq)
+            size = len(current) + 1
+        else:
+            # Обновление сохраняет позицию термина в порядке добавления
+            record.seq = old.seq
+            size = len(current)
+        bucket[key] = record
+        self._publish(key, bucket, size)
+
+    def put_many(self, records: Iterable[TermRecord]):
+        """Групповая запись; вызывать под write_lock.
+
+        Каждая затронутая корзина копируется один раз, а вся группа
+        становится видимой одним снимком.
+        """
+        current = self._snapshot
+        bucket_count = len(current._buckets)
+        buckets = list(current._buckets)
+        copied = set()
+        size = len(current)
+        for record in records:
+            key = record.term
+            index = hash(key) % bucket_count
+            if index not in copied:
+                buckets[index] = dict(buckets[index])
+                copied.add(index)
+            old = buckets[index].get(key)
+            if old is None:
+                record.seq = next(self._seq)
+                size += 1
+            else:
+                record.seq = old.seq
+            buckets[index][key] = record
+        self._snapshot = Snapshot(current.version + 1, tuple(buckets), size)
+
+    def delete(self, key: str):
+        """Удаляет запись; вызывать под write_lock"""
+        current = self._snapshot
+        bucket = dict(current._bucket(key))
+        del bucket[key]
+        self._publish(key, bucket, len(current) - 1)
@@ -2,6 +2,9 @@ from flask import Flask, render_template, request, jsonify, redirect, url_for
 import grpc
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 import sys
 sys.path.append('../dictionary_service')
@@ -11,12 +14,98 @@ import dictionary_pb2_grpc
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 
+# Сколько результатов GetTerm держать локально; 0 — кеш выключен
+TERM_CACHE_SIZE = int(os.environ.get('TERM_CACHE_SIZE', 10000))
+# Пауза перед повторной подпиской на WatchTerms после обрыва, с
+WATCH_RETRY_DELAY = 1.0
+
+class TermCache:
+    """Локальный кеш ответов GetTerm, который инвалидирует подписка WatchTerms.
+
+    Кеш отвечает только пока подписка действует. При обрыве он очищается,
+    и подписка открывается заново: ревизии сервера живут в пределах его
+    запуска, поэтому продолжать со старой ревизии после переподключения
+    небезопасно.
+    """
+
+    def __init__(self, client, max_size):
+        self.client = client
+        self.max_size = max_size
+        self._terms = OrderedDict()
+        self._lock = threading.Lock()
+        # Счётчик событий: ответ, за время получения которого пришло
+        # событие, мог устареть и в кеш не кладётся
+        self._events_seen = 0
+        self._watching = False
+        self._thread = None
+
+    def get(self, term, fetch):
+        self._start()
+        with self._lock:
+            if self._watching and term in self._terms:
+                self._terms.move_to_end(term)
+                return self._terms[term]
+            events_seen = self._events_seen
+        result = fetch(term)
+        if result['success']:
+            with self._lock:
+                if self._watching and events_seen == self._events_seen:
+                    self._terms[term] = result
+                    if len(self._terms) > self.max_size:
+                        self._terms.popitem(last=False)
+        return result
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._watch, name='term-cache-watch', daemon=True)
+                    self._thread.start()
+
+    def _watch(self):
+        while True:
+            try:
+                stream = self.client.stub.WatchTerms(dictionary_pb2.WatchRequest())
+                # Начальные метаданные приходят, когда подписка уже действует
+                stream.initial_metadata()
+                with self._lock:
+                    self._watching = True
+                    self._events_seen += 1
+                for event in stream:
+                    with self._lock:
+                        self._events_seen += 1
+                        self._terms.pop(event.term, None)
+            except grpc.RpcError as e:
+                app.logger.warning('WatchTerms stream closed: %s', e.code())
+            with self._lock:
+                self._watching = False
+                self._events_seen += 1
+                self._terms.clear()
+            time.sleep(WATCH_RETRY_DELAY)
+
+def term_to_dict(term, fields=None):
+    """TermResponse -> словарь для JSON; с проекцией — только запрошенные поля"""
+    data = {
+        'term': term.term,
+        'definition': term.definition,
+        'category': term.category,
+        'related_terms': list(term.related_terms),
+        'source': term.source,
+        'created_at': term.created_at,
+        'updated_at': term.updated_at,
+        'expires_at': term.expires_at
+    }
+    if fields:
+        return {name: value for name, value in data.items() if name == 'term' or name in fields}
+    return data
+
 class DictionaryGRPCClient:
-    def __init__(self, host='dictionary-grpc', port=50051):
+    def __init__(self, host='dictionary-grpc', port=50051, cache_size=TERM_CACHE_SIZE):
         self.host = host
         self.port = port
         self._channel = None
         self._stub = None
+        self.cache = TermCache(self, cache_size) if cache_size > 0 else None
     
     @property
     def stub(self):
@@ -25,11 +114,24 @@ class DictionaryGRPCClient:
             self._stub = dictionary_pb2_grpc.DictionaryServiceStub(self._channel)
         return self._stub
     
-    def get_term(self, term):
+    def get_term(self, term, if_version=0):
+        if self.cache is None:
+            return self._get_term(term, if_version)
+        # Кеш хранит полные ответы, условие проверяется уже по ним
+        result = self.cache.get(term, self._get_term)
+        if if_version and result['success'] and result.get('version') == str(if_version):
+            return {'success': True, 'not_modified': True, 'version': result['version']}
+        return result
+
+    def _get_term(self, term, if_version=0):
         try:
-            response = self.stub.GetTerm(dictionary_pb2.GetTermRequest(term=term))
+            response = self.stub.GetTerm(dictionary_pb2.GetTermRequest(term=term, if_version=if_version))
+            if response.not_modified:
+                return {'success': True, 'not_modified': True, 'version': str(response.version)}
             return {
                 'success': True,
+                # Строкой: в JSON числа больше 2^53 теряют точность
+                'version': str(response.version),
                 'data': {
                     'term': response.term,
                     'definition': response.definition,
@@ -37,7 +139,8 @@ class DictionaryGRPCClient:
                     'related_terms': list(response.related_terms),
                     'source': response.source,
                     'created_at': response.created_at,
-                    'updated_at': response.updated_at
+                    'updated_at': response.updated_at,
+                    'expires_at': response.expires_at
                 } if response.term else None
             }
         except grpc.RpcError as e:
@@ -50,7 +153,8 @@ class DictionaryGRPCClient:
                 definition=term_data['definition'],
                 category=term_data['category'],
                 related_terms=term_data.get('related_terms', []),
-                source=term_data.get('source', '')
+                source=term_data.get('source', ''),
+                ttl_seconds=term_data.get('ttl_seconds', 0)
             ))
             return {
                 'success': response.success,
@@ -60,85 +164,120 @@ class DictionaryGRPCClient:
         except grpc.RpcError as e:
             return {'success': False, 'error': e.details()}
     
-    def get_all_terms(self, page=1, page_size=50):
+    def get_all_terms(self, page=1, page_size=50, page_token='', if_version=0, fields=None):
         try:
             response = self.stub.GetAllTerms(dictionary_pb2.GetAllRequest(
                 page=page,
-                page_size=page_size
+                page_size=page_size,
+                page_token=page_token,
+                if_version=if_version,
+                fields={'paths': fields or []}
             ))
-            terms = []
-            for term in response.terms:
-                terms.append({
-                    'term': term.term,
-                    'definition': term.definition,
-                    'category': term.category,
-                    'related_terms': list(term.related_terms),
-                    'source': term.source,
-                    'created_at': term.created_at,
-                    'updated_at': term.updated_at
-                })
-            
+            if response.not_modified:
+                return {'success': True, 'not_modified': True, 'version': str(response.version)}
+            terms = [term_to_dict(term, fields) for term in response.terms]
+
             return {
                 'success': True,
                 'terms': terms,
-                'total_count': response.total_count
+                'total_count': response.total_count,
+                'next_page_token': response.next_page_token,
+                'version': str(response.version)
             }
         except grpc.RpcError as e:
             return {'success': False, 'error': e.details()}
     
-    def search_terms(self, query, category=None):
+    def search_terms(self, query, category=None, limit=0, page_token='', if_version=0, fields=None):
         try:
             response = self.stub.SearchTerms(dictionary_pb2.SearchRequest(
                 query=query,
-                category=category or ""
+                category=category or "",
+                limit=limit,
+                page_token=page_token,
+                if_version=if_version,
+                fields={'paths': fields or []}
             ))
-            terms = []
-            for term in response.terms:
-                terms.append({
-                    'term': term.term,
-                    'definition': term.definition,
-                    'category': term.category,
-                    'related_terms': list(term.related_terms),
-                    'source': term.source,
-                    'created_at': term.created_at,
-                    'updated_at': term.updated_at
-                })
-            
+            if response.not_modified:
+                return {'success': True, 'not_modified': True, 'version': str(response.version)}
+            terms = [term_to_dict(term, fields) for term in response.terms]
+
             return {
                 'success': True,
                 'terms': terms,
-                'total_count': response.total_count
+                'total_count': response.total_count,
+                'next_page_token': response.next_page_token,
+                'version': str(response.version)
             }
         except grpc.RpcError as e:
             return {'success': False, 'error': e.details()}
     
-    def get_terms_by_category(self, category):
+    def suggest_terms(self, prefix, limit=0):
+        try:
+            response = self.stub.SuggestTerms(dictionary_pb2.SuggestRequest(prefix=prefix, limit=limit))
+            return {'success': True, 'terms': list(response.terms)}
+        except grpc.RpcError as e:
+            return {'success': False, 'error': e.details()}
+    
+    def get_terms_by_category(self, category, if_version=0, fields=None):
         try:
-            response = self.stub.GetTermsByCategory(
-                dictionary_pb2.CategoryRequest(category=category)
-            )
-            terms = []
-            for term in response.terms:
-                terms.append({
-                    'term': term.term,
-                    'definition': term.definition,
-                    'category': term.category,
-                    'related_terms': list(term.related_terms),
-                    'source': term.source,
-                    'created_at': term.created_at,
-                    'updated_at': term.updated_at
-                })
-            
+            response = self.stub.GetTermsByCategory(dictionary_pb2.CategoryRequest(
+                category=category,
+                if_version=if_version,
+                fields={'paths': fields or []}
+            ))
+            if response.not_modified:
+                return {'success': True, 'not_modified': True, 'version': str(response.version)}
+            terms = [term_to_dict(term, fields) for term in response.terms]
+
             return {
                 'success': True,
                 'terms': terms,
-                'total_count': response.total_count
+                'total_count': response.total_count,
+                'version': str(response.version)
+            }
+        except grpc.RpcError as e:
+            return {'success': False, 'error': e.details()}
+
+    def list_categories(self):
+        try:
+            response = self.stub.ListCategories(dictionary_pb2.ListCategoriesRequest())
+            return {
+                'success': True,
+                'categories': [
+                    {'name': category.name, 'term_count': category.term_count}
+                    for category in response.categories
+                ]
             }
         except grpc.RpcError as e:
             return {'success': False, 'error': e.details()}
 
 client = DictionaryGRPCClient()
 
+def if_none_match():
+    """Версия из заголовка If-None-Match; 0 — условия нет"""
+    etag = request.headers.get('If-None-Match', '')
+    if etag.startswith('W/'):
+        etag = etag[2:]
+    etag = etag.strip('"')
+    # Версии — uint64; чужой ETag просто не совпадёт
+    if not etag.isdigit() or int(etag) >= 2 ** 64:
+        return 0
+    return int(etag)
+
+def requested_fields():
+    """Проекция из ?fields=term,category; пустой список — все поля"""
+    return [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+
+def conditional_response(result):
+    """Ответ с ETag = версией; неизменившиеся данные — 304 без тела"""
+    if result.get('not_modified'):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(result)
+    if result.get('version'):
+        response.set_etag(result['version'])
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -147,14 +286,16 @@ def index():
 def get_terms():
     page = request.args.get('page', 1, type=int)
     page_size = request.args.get('page_size', 50, type=int)
+    page_token = request.args.get('page_token', '')
     
-    result = client.get_all_terms(page=page, page_size=page_size)
-    return jsonify(result)
+    result = client.get_all_terms(page=page, page_size=page_size, page_token=page_token,
+                                  if_version=if_none_match(), fields=requested_fields())
+    return conditional_response(result)
 
 @app.route('/api/terms/<term>', methods=['GET'])
 def get_term(term):
-    result = client.get_term(term)
-    return jsonify(result)
+    result = client.get_term(term, if_version=if_none_match())
+    return conditional_response(result)
 
 @app.route('/api/terms', methods=['POST'])
 def add_term():
@@ -167,6 +308,12 @@ def add_term():
                 'success': False,
                 'error': f'Missing required field: {field}'
             }), 400
+    ttl_seconds = data.get('ttl_seconds', 0)
+    if not isinstance(ttl_seconds, int) or ttl_seconds < 0:
+        return jsonify({
+            'success': False,
+            'error': 'ttl_seconds must be a non-negative integer'
+        }), 400
     
     result = client.add_term(data)
     return jsonify(result)
@@ -175,6 +322,8 @@ def add_term():
 def search_terms():
     query = request.args.get('q', '')
     category = request.args.get('category', '')
+    limit = request.args.get('limit', 0, type=int)
+    page_token = request.args.get('page_token', '')
     
     if not query:
         return jsonify({
@@ -182,33 +331,42 @@ def search_terms():
             'error': 'Query parameter "q" is required'
         }), 400
     
-    result = client.search_terms(query, category if category else None)
+    result = client.search_terms(query, category if category else None, limit, page_token,
+                                 if_version=if_none_match(), fields=requested_fields())
+    return conditional_response(result)
+
+@app.route('/api/suggest', methods=['GET'])
+def suggest_terms():
+    prefix = request.args.get('q', '')
+    limit = request.args.get('limit', 0, type=int)
+    
+    if not prefix:
+        return jsonify({'success': True, 'terms': []})
+    
+    result = client.suggest_terms(prefix, limit)
     return jsonify(result)
 
 @app.route('/api/categories/<category>', methods=['GET'])
 def get_terms_by_category(category):
-    result = client.get_terms_by_category(category)
-    return jsonify(result)
+    result = client.get_terms_by_category(category, if_version=if_none_match(), fields=requested_fields())
+    return conditional_response(result)
 
 @app.route('/api/categories', methods=['GET'])
 def get_categories():
-    result = client.get_all_terms(page_size=1000)
+    result = client.list_categories()
     if not result['success']:
         return jsonify(result)
     
-    categories = set()
-    for term in result['terms']:
-        categories.add(term['category'])
-    
     return jsonify({
         'success': True,
-        'categories': sorted(list(categories))
+        'categories': [category['name'] for category in result['categories']],
+        'counts': {category['name']: category['term_count'] for category in result['categories']}
     })
 
 @app.route('/health')
 def health():
     try:
-        result = client.get_all_terms(page_size=1)
+        result = client.get_all_terms(page_size=1, fields=['term'])
         return jsonify({
             'status': 'healthy',
             'grpc_connection': 'ok' if result['success'] else 'error'
@@ -22,37 +22,76 @@ _runtime_version.ValidateProtobufRuntimeVersion(
 _sym_db = _symbol_database.Default()
 
 
+from google.protobuf import field_mask_pb2 as google_dot_protobuf_dot_field__mask__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10\x64ictionary.proto\x12\ndictionary\"\x1e\n\x0eGetTermRequest\x12\x0c\n\x04term\x18\x01 \x01(\t\"k\n\x0e\x41\x64\x64TermRequest\x12\x0c\n\x04term\x18\x01 \x01(\t\x12\x12\n\ndefinition\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x03 \x01(\t\x12\x15\n\rrelated_terms\x18\x04 \x03(\t\x12\x0e\n\x06source\x18\x05 \x01(\t\"n\n\x11UpdateTermRequest\x12\x0c\n\x04term\x18\x01 \x01(\t\x12\x12\n\ndefinition\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x03 \x01(\t\x12\x15\n\rrelated_terms\x18\x04 \x03(\t\x12\x0e\n\x06source\x18\x05 \x01(\t\"!\n\x11\x44\x65leteTermRequest\x12\x0c\n\x04term\x18\x01 \x01(\t\"\x91\x01\n\x0cTermResponse\x12\x0c\n\x04term\x18\x01 \x01(\t\x12\x12\n\ndefinition\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x03 \x01(\t\x12\x15\n\rrelated_terms\x18\x04 \x03(\t\x12\x0e\n\x06source\x18\x05 \x01(\t\x12\x12\n\ncreated_at\x18\x06 \x01(\t\x12\x12\n\nupdated_at\x18\x07 \x01(\t\"C\n\x11OperationResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0c\n\x04term\x18\x03 \x01(\t\"I\n\tTermsList\x12\'\n\x05terms\x18\x01 \x03(\x0b\x32\x18.dictionary.TermResponse\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\"0\n\rGetAllRequest\x12\x0c\n\x04page\x18\x01 \x01(\x05\x12\x11\n\tpage_size\x18\x02 \x01(\x05\"0\n\rSearchRequest\x12\r\n\x05query\x18\x01 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x02 \x01(\t\"#\n\x0f\x43\x61tegoryRequest\x12\x10\n\x08\x63\x61tegory\x18\x01 \x01(\t\"2\n\x13RelatedTermsRequest\x12\x0c\n\x04term\x18\x01 \x01(\t\x12\r\n\x05\x64\x65pth\x18\x02 \x01(\x05\x32\xc9\x04\n\x11\x44ictionaryService\x12?\n\x07GetTerm\x12\x1a.dictionary.GetTermRequest\x1a\x18.dictionary.TermResponse\x12\x44\n\x07\x41\x64\x64Term\x12\x1a.dictionary.AddTermRequest\x1a\x1d.dictionary.OperationResponse\x12J\n\nUpdateTerm\x12\x1d.dictionary.UpdateTermRequest\x1a\x1d.dictionary.OperationResponse\x12J\n\nDeleteTerm\x12\x1d.dictionary.DeleteTermRequest\x1a\x1d.dictionary.OperationResponse\x12?\n\x0bGetAllTerms\x12\x19.dictionary.GetAllRequest\x1a\x15.dictionary.TermsList\x12?\n\x0bSearchTerms\x12\x19.dictionary.SearchRequest\x1a\x15.dictionary.TermsList\x12H\n\x12GetTermsByCategory\x12\x1b.dictionary.CategoryRequest\x1a\x15.dictionary.TermsList\x12I\n\x0fGetRelatedTerms\x12\x1f.dictionary.RelatedTermsRequest\x1a\x15.dictionary.TermsListb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10\x64ictionary.proto\x12\ndictionary\x1a google/protobuf/field_mask.proto\"F\n\x0eGetTermRequest\x12\x0c\n\x04term\x18\x01 \x01(\t\x12\x12\n\nnormalized\x18\x02 \x01(\x08\x12\x12\n\nif_version\x18\x03 \x01(\x04\"\x80\x01\n\x0e\x41\x64\x64TermRequest\x12\x0c\n\x04term\x18\x01 \x01(\t\x12\x12\n\ndefinition\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x03 \x01(\t\x12\x15\n\rrelated_terms\x18\x04 \x03(\t\x12\x0e\n\x06source\x18\x05 \x01(\t\x12\x13\n\x0bttl_seconds\x18\x06 \x01(\r\"n\n\x11UpdateTermRequest\x12\x0c\n\x04term\x18\x01 \x01(\t\x12\x12\n\ndefinition\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x03 \x01(\t\x12\x15\n\rrelated_terms\x18\x04 \x03(\t\x12\x0e\n\x06source\x18\x05 \x01(\t\"!\n\x11\x44\x65leteTermRequest\x12\x0c\n\x04term\x18\x01 \x01(\t\"\xcc\x01\n\x0cTermResponse\x12\x0c\n\x04term\x18\x01 \x01(\t\x12\x12\n\ndefinition\x18\x02 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x03 \x01(\t\x12\x15\n\rrelated_terms\x18\x04 \x03(\t\x12\x0e\n\x06source\x18\x05 \x01(\t\x12\x12\n\ncreated_at\x18\x06 \x01(\t\x12\x12\n\nupdated_at\x18\x07 \x01(\t\x12\x0f\n\x07version\x18\x08 \x01(\x04\x12\x14\n\x0cnot_modified\x18\t \x01(\x08\x12\x12\n\nexpires_at\x18\n \x01(\t\"C\n\x11OperationResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0c\n\x04term\x18\x03 \x01(\t\"\x89\x01\n\tTermsList\x12\'\n\x05terms\x18\x01 \x03(\x0b\x32\x18.dictionary.TermResponse\x12\x13\n\x0btotal_count\x18\x02 \x01(\x05\x12\x17\n\x0fnext_page_token\x18\x03 \x01(\t\x12\x0f\n\x07version\x18\x04 \x01(\x04\x12\x14\n\x0cnot_modified\x18\x05 \x01(\x08\"\x84\x01\n\rGetAllRequest\x12\x0c\n\x04page\x18\x01 \x01(\x05\x12\x11\n\tpage_size\x18\x02 \x01(\x05\x12\x12\n\npage_token\x18\x03 \x01(\t\x12\x12\n\nif_version\x18\x04 \x01(\x04\x12*\n\x06\x66ields\x18\x05 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"\x93\x01\n\rSearchRequest\x12\r\n\x05query\x18\x01 \x01(\t\x12\x10\n\x08\x63\x61tegory\x18\x02 \x01(\t\x12\r\n\x05limit\x18\x03 \x01(\x05\x12\x12\n\npage_token\x18\x04 \x01(\t\x12\x12\n\nif_version\x18\x05 \x01(\x04\x12*\n\x06\x66ields\x18\x06 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"c\n\x0f\x43\x61tegoryRequest\x12\x10\n\x08\x63\x61tegory\x18\x01 \x01(\t\x12\x12\n\nif_version\x18\x02 \x01(\x04\x12*\n\x06\x66ields\x18\x03 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\"F\n\x13RelatedTermsRequest\x12\x0c\n\x04term\x18\x01 \x01(\t\x12\r\n\x05\x64\x65pth\x18\x02 \x01(\x05\x12\x12\n\nif_version\x18\x03 \x01(\x04\"\x17\n\x15ListCategoriesRequest\"0\n\x0c\x43\x61tegoryInfo\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x12\n\nterm_count\x18\x02 \x01(\x05\">\n\x0e\x43\x61tegoriesList\x12,\n\ncategories\x18\x01 \x03(\x0b\x32\x18.dictionary.CategoryInfo\"$\n\x10StreamAllRequest\x12\x10\n\x08\x63\x61tegory\x18\x01 \x01(\t\"$\n\x0fSnapshotRequest\x12\x11\n\tpage_size\x18\x01 \x01(\x05\" \n\x0f\x42\x61tchGetRequest\x12\r\n\x05terms\x18\x01 \x03(\t\"\xa5\x01\n\x10\x42\x61tchGetResponse\x12\x36\n\x05terms\x18\x01 \x03(\x0b\x32\'.dictionary.BatchGetResponse.TermsEntry\x12\x11\n\tnot_found\x18\x02 \x03(\t\x1a\x46\n\nTermsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\'\n\x05value\x18\x02 \x01(\x0b\x32\x18.dictionary.TermResponse:\x02\x38\x01\"C\n\x11\x42ulkAddItemStatus\x12\x0c\n\x04term\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x0f\n\x07message\x18\x03 \x01(\t\"l\n\x0f\x42ulkAddResponse\x12.\n\x07results\x18\x01 \x03(\x0b\x32\x1d.dictionary.BulkAddItemStatus\x12\x13\n\x0b\x61\x64\x64\x65\x64_count\x18\x02 \x01(\x05\x12\x14\n\x0c\x66\x61iled_count\x18\x03 \x01(\x05\"%\n\x0cWatchRequest\x12\x15\n\rfrom_revision\x18\x01 \x01(\x03\"\xcd\x01\n\tTermEvent\x12\x10\n\x08revision\x18\x01 \x01(\x03\x12-\n\x04type\x18\x02 \x01(\x0e\x32\x1f.dictionary.TermEvent.EventType\x12\x0c\n\x04term\x18\x03 \x01(\t\x12&\n\x04\x64\x61ta\x18\x04 \x01(\x0b\x32\x18.dictionary.TermResponse\x12\x17\n\x0fpublished_at_us\x18\x05 \x01(\x03\"0\n\tEventType\x12\t\n\x05\x41\x44\x44\x45\x44\x10\x00\x12\x0b\n\x07UPDATED\x10\x01\x12\x0b\n\x07\x44\x45LETED\x10\x02\"/\n\x0eSuggestRequest\x12\x0e\n\x06prefix\x18\x01 \x01(\t\x12\r\n\x05limit\x18\x02 \x01(\x05\" \n\x0fSuggestResponse\x12\r\n\x05terms\x18\x01 \x03(\t\"^\n\x12\x46uzzySearchRequest\x12\r\n\x05query\x18\x01 \x01(\t\x12\x19\n\x0cmax_distance\x18\x02 \x01(\x05H\x00\x88\x01\x01\x12\r\n\x05limit\x18\x03 \x01(\x05\x42\x0f\n\r_max_distance\"F\n\nFuzzyMatch\x12&\n\x04term\x18\x01 \x01(\x0b\x32\x18.dictionary.TermResponse\x12\x10\n\x08\x64istance\x18\x02 \x01(\x05\">\n\x13\x46uzzySearchResponse\x12\'\n\x07matches\x18\x01 \x03(\x0b\x32\x16.dictionary.FuzzyMatch2\xe6\t\n\x11\x44ictionaryService\x12?\n\x07GetTerm\x12\x1a.dictionary.GetTermRequest\x1a\x18.dictionary.TermResponse\x12\x44\n\x07\x41\x64\x64Term\x12\x1a.dictionary.AddTermRequest\x1a\x1d.dictionary.OperationResponse\x12J\n\nUpdateTerm\x12\x1d.dictionary.UpdateTermRequest\x1a\x1d.dictionary.OperationResponse\x12J\n\nDeleteTerm\x12\x1d.dictionary.DeleteTermRequest\x1a\x1d.dictionary.OperationResponse\x12?\n\x0bGetAllTerms\x12\x19.dictionary.GetAllRequest\x1a\x15.dictionary.TermsList\x12?\n\x0bSearchTerms\x12\x19.dictionary.SearchRequest\x1a\x15.dictionary.TermsList\x12H\n\x12GetTermsByCategory\x12\x1b.dictionary.CategoryRequest\x1a\x15.dictionary.TermsList\x12I\n\x0fGetRelatedTerms\x12\x1f.dictionary.RelatedTermsRequest\x1a\x15.dictionary.TermsList\x12O\n\x0eListCategories\x12!.dictionary.ListCategoriesRequest\x1a\x1a.dictionary.CategoriesList\x12J\n\x0eStreamAllTerms\x12\x1c.dictionary.StreamAllRequest\x1a\x18.dictionary.TermResponse0\x01\x12\x45\n\x0cStreamSearch\x12\x19.dictionary.SearchRequest\x1a\x18.dictionary.TermResponse0\x01\x12J\n\rBatchGetTerms\x12\x1b.dictionary.BatchGetRequest\x1a\x1c.dictionary.BatchGetResponse\x12I\n\x0c\x42ulkAddTerms\x12\x1a.dictionary.AddTermRequest\x1a\x1b.dictionary.BulkAddResponse(\x01\x12?\n\nWatchTerms\x12\x18.dictionary.WatchRequest\x1a\x15.dictionary.TermEvent0\x01\x12G\n\x0cSuggestTerms\x12\x1a.dictionary.SuggestRequest\x1a\x1b.dictionary.SuggestResponse\x12N\n\x0b\x46uzzySearch\x12\x1e.dictionary.FuzzySearchRequest\x1a\x1f.dictionary.FuzzySearchResponse\x12\x46\n\x0eStreamSnapshot\x12\x1b.dictionary.SnapshotRequest\x1a\x15.dictionary.TermsList0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'dictionary_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_GETTERMREQUEST']._serialized_start=32
-  _globals['_GETTERMREQUEST']._serialized_end=62
-  _globals['_ADDTERMREQUEST']._serialized_start=64
-  _globals['_ADDTERMREQUEST']._serialized_end=171
-  _globals['_UPDATETERMREQUEST']._serialized_start=173
-  _globals['_UPDATETERMREQUEST']._serialized_end=283
-  _globals['_DELETETERMREQUEST']._serialized_start=285
-  _globals['_DELETETERMREQUEST']._serialized_end=318
-  _globals['_TERMRESPONSE']._serialized_start=321
-  _globals['_TERMRESPONSE']._serialized_end=466
-  _globals['_OPERATIONRESPONSE']._serialized_start=468
-  _globals['_OPERATIONRESPONSE']._serialized_end=535
-  _globals['_TERMSLIST']._serialized_start=537
-  _globals['_TERMSLIST']._serialized_end=610
-  _globals['_GETALLREQUEST']._serialized_start=612
-  _globals['_GETALLREQUEST']._serialized_end=660
-  _globals['_SEARCHREQUEST']._serialized_start=662
-  _globals['_SEARCHREQUEST']._serialized_end=710
-  _globals['_CATEGORYREQUEST']._serialized_start=712
-  _globals['_CATEGORYREQUEST']._serialized_end=747
-  _globals['_RELATEDTERMSREQUEST']._serialized_start=749
-  _globals['_RELATEDTERMSREQUEST']._serialized_end=799
-  _globals['_DICTIONARYSERVICE']._serialized_start=802
-  _globals['_DICTIONARYSERVICE']._serialized_end=1387
+  _globals['_BATCHGETRESPONSE_TERMSENTRY']._loaded_options = None
+  _globals['_BATCHGETRESPONSE_TERMSENTRY']._serialized_options = b'8\001'
+  _globals['_GETTERMREQUEST']._serialized_start=66
+  _globals['_GETTERMREQUEST']._serialized_end=136
+  _globals['_ADDTERMREQUEST']._serialized_start=139
+  _globals['_ADDTERMREQUEST']._serialized_end=267
+  _globals['_UPDATETERMREQUEST']._serialized_start=269
+  _globals['_UPDATETERMREQUEST']._serialized_end=379
+  _globals['_DELETETERMREQUEST']._serialized_start=381
+  _globals['_DELETETERMREQUEST']._serialized_end=414
+  _globals['_TERMRESPONSE']._serialized_start=417
+  _globals['_TERMRESPONSE']._serialized_end=621
+  _globals['_OPERATIONRESPONSE']._serialized_start=623
+  _globals['_OPERATIONRESPONSE']._serialized_end=690
+  _globals['_TERMSLIST']._serialized_start=693
+  _globals['_TERMSLIST']._serialized_end=830
+  _globals['_GETALLREQUEST']._serialized_start=833
+  _globals['_GETALLREQUEST']._serialized_end=965
+  _globals['_SEARCHREQUEST']._serialized_start=968
+  _globals['_SEARCHREQUEST']._serialized_end=1115
+  _globals['_CATEGORYREQUEST']._serialized_start=1117
+  _globals['_CATEGORYREQUEST']._serialized_end=1216
+  _globals['_RELATEDTERMSREQUEST']._serialized_start=1218
+  _globals['_RELATEDTERMSREQUEST']._serialized_end=1288
+  _globals['_LISTCATEGORIESREQUEST']._serialized_start=1290
+  _globals['_LISTCATEGORIESREQUEST']._serialized_end=1313
+  _globals['_CATEGORYINFO']._serialized_start=1315
+  _globals['_CATEGORYINFO']._serialized_end=1363
+  _globals['_CATEGORIESLIST']._serialized_start=1365
+  _globals['_CATEGORIESLIST']._serialized_end=1427
+  _globals['_STREAMALLREQUEST']._serialized_start=1429
+  _globals['_STREAMALLREQUEST']._serialized_end=1465
+  _globals['_SNAPSHOTREQUEST']._serialized_start=1467
+  _globals['_SNAPSHOTREQUEST']._serialized_end=1503
+  _globals['_BATCHGETREQUEST']._serialized_start=1505
+  _globals['_BATCHGETREQUEST']._serialized_end=1537
+  _globals['_BATCHGETRESPONSE']._serialized_start=1540
+  _globals['_BATCHGETRESPONSE']._serialized_end=1705
+  _globals['_BATCHGETRESPONSE_TERMSENTRY']._serialized_start=1635
+  _globals['_BATCHGETRESPONSE_TERMSENTRY']._serialized_end=1705
+  _globals['_BULKADDITEMSTATUS']._serialized_start=1707
+  _globals['_BULKADDITEMSTATUS']._serialized_end=1774
+  _globals['_BULKADDRESPONSE']._serialized_start=1776
+  _globals['_BULKADDRESPONSE']._serialized_end=1884
+  _globals['_WATCHREQUEST']._serialized_start=1886
+  _globals['_WATCHREQUEST']._serialized_end=1923
+  _globals['_TERMEVENT']._serialized_start=1926
+  _globals['_TERMEVENT']._serialized_end=2131
+  _globals['_TERMEVENT_EVENTTYPE']._serialized_start=2083
+  _globals['_TERMEVENT_EVENTTYPE']._serialized_end=2131
+  _globals['_SUGGESTREQUEST']._serialized_start=2133
+  _globals['_SUGGESTREQUEST']._serialized_end=2180
+  _globals['_SUGGESTRESPONSE']._serialized_start=2182
+  _globals['_SUGGESTRESPONSE']._serialized_end=2214
+  _globals['_FUZZYSEARCHREQUEST']._serialized_start=2216
+  _globals['_FUZZYSEARCHREQUEST']._serialized_end=2310
+  _globals['_FUZZYMATCH']._serialized_start=2312
+  _globals['_FUZZYMATCH']._serialized_end=2382
+  _globals['_FUZZYSEARCHRESPONSE']._serialized_start=2384
+  _globals['_FUZZYSEARCHRESPONSE']._serialized_end=2446
+  _globals['_DICTIONARYSERVICE']._serialized_start=2449
+  _globals['_DICTIONARYSERVICE']._serialized_end=3703
 # @@protoc_insertion_point(module_scope)
@@ -74,6 +74,51 @@ class DictionaryServiceStub(object):
                 request_serializer=dictionary__pb2.RelatedTermsRequest.SerializeToString,
                 response_deserializer=dictionary__pb2.TermsList.FromString,
                 _registered_method=True)
+        self.ListCategories = channel.unary_unary(
+                '/dictionary.DictionaryService/ListCategories',
+                request_serializer=dictionary__pb2.ListCategoriesRequest.SerializeToString,
+                response_deserializer=dictionary__pb2.CategoriesList.FromString,
+                _registered_method=True)
+        self.StreamAllTerms = channel.unary_stream(
+                '/dictionary.DictionaryService/StreamAllTerms',
+                request_serializer=dictionary__pb2.StreamAllRequest.SerializeToString,
+                response_deserializer=dictionary__pb2.TermResponse.FromString,
+                _registered_method=True)
+        self.StreamSearch = channel.unary_stream(
+                '/dictionary.DictionaryService/StreamSearch',
+                request_serializer=dictionary__pb2.SearchRequest.SerializeToString,
+                response_deserializer=dictionary__pb2.TermResponse.FromString,
+                _registered_method=True)
+        self.BatchGetTerms = channel.unary_unary(
+                '/dictionary.DictionaryService/BatchGetTerms',
+                request_serializer=dictionary__pb2.BatchGetRequest.SerializeToString,
+                response_deserializer=dictionary__pb2.BatchGetResponse.FromString,
+                _registered_method=True)
+        self.BulkAddTerms = channel.stream_unary(
+                '/dictionary.DictionaryService/BulkAddTerms',
+                request_serializer=dictionary__pb2.AddTermRequest.SerializeToString,
+                response_deserializer=dictionary__pb2.BulkAddResponse.FromString,
+                _registered_method=True)
+        self.WatchTerms = channel.unary_stream(
+                '/dictionary.DictionaryService/WatchTerms',
+                request_serializer=dictionary__pb2.WatchRequest.SerializeToString,
+                response_deserializer=dictionary__pb2.TermEvent.FromString,
+                _registered_method=True)
+        self.SuggestTerms = channel.unary_unary(
+                '/dictionary.DictionaryService/SuggestTerms',
+                request_serializer=dictionary__pb2.SuggestRequest.SerializeToString,
+                response_deserializer=dictionary__pb2.SuggestResponse.FromString,
+                _registered_method=True)
+        self.FuzzySearch = channel.unary_unary(
+                '/dictionary.DictionaryService/FuzzySearch',
+                request_serializer=dictionary__pb2.FuzzySearchRequest.SerializeToString,
+                response_deserializer=dictionary__pb2.FuzzySearchResponse.FromString,
+                _registered_method=True)
+        self.StreamSnapshot = channel.unary_stream(
+                '/dictionary.DictionaryService/StreamSnapshot',
+                request_serializer=dictionary__pb2.SnapshotRequest.SerializeToString,
+                response_deserializer=dictionary__pb2.TermsList.FromString,
+                _registered_method=True)
 
 
 class DictionaryServiceServicer(object):
@@ -127,6 +172,60 @@ class DictionaryServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ListCategories(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamAllTerms(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamSearch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BatchGetTerms(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def BulkAddTerms(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchTerms(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SuggestTerms(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def FuzzySearch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamSnapshot(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_DictionaryServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -170,6 +269,51 @@ def add_DictionaryServiceServicer_to_server(servicer, server):
                     request_deserializer=dictionary__pb2.RelatedTermsRequest.FromString,
                     response_serializer=dictionary__pb2.TermsList.SerializeToString,
             ),
+            'ListCategories': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListCategories,
+                    request_deserializer=dictionary__pb2.ListCategoriesRequest.FromString,
+                    response_serializer=dictionary__pb2.CategoriesList.SerializeToString,
+            ),
+            'StreamAllTerms': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamAllTerms,
+                    request_deserializer=dictionary__pb2.StreamAllRequest.FromString,
+                    response_serializer=dictionary__pb2.TermResponse.SerializeToString,
+            ),
+            'StreamSearch': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamSearch,
+                    request_deserializer=dictionary__pb2.SearchRequest.FromString,
+                    response_serializer=dictionary__pb2.TermResponse.SerializeToString,
+            ),
+            'BatchGetTerms': grpc.unary_unary_rpc_method_handler(
+                    servicer.BatchGetTerms,
+                    request_deserializer=dictionary__pb2.BatchGetRequest.FromString,
+                    response_serializer=dictionary__pb2.BatchGetResponse.SerializeToString,
+            ),
+            'BulkAddTerms': grpc.stream_unary_rpc_method_handler(
+                    servicer.BulkAddTerms,
+                    request_deserializer=dictionary__pb2.AddTermRequest.FromString,
+                    response_serializer=dictionary__pb2.BulkAddResponse.SerializeToString,
+            ),
+            'WatchTerms': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchTerms,
+                    request_deserializer=dictionary__pb2.WatchRequest.FromString,
+                    response_serializer=dictionary__pb2.TermEvent.SerializeToString,
+            ),
+            'SuggestTerms': grpc.unary_unary_rpc_method_handler(
+                    servicer.SuggestTerms,
+                    request_deserializer=dictionary__pb2.SuggestRequest.FromString,
+                    response_serializer=dictionary__pb2.SuggestResponse.SerializeToString,
+            ),
+            'FuzzySearch': grpc.unary_unary_rpc_method_handler(
+                    servicer.FuzzySearch,
+                    request_deserializer=dictionary__pb2.FuzzySearchRequest.FromString,
+                    response_serializer=dictionary__pb2.FuzzySearchResponse.SerializeToString,
+            ),
+            'StreamSnapshot': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamSnapshot,
+                    request_deserializer=dictionary__pb2.SnapshotRequest.FromString,
+                    response_serializer=dictionary__pb2.TermsList.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'dictionary.DictionaryService', rpc_method_handlers)
@@ -396,3 +540,246 @@ class DictionaryService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def ListCategories(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/dictionary.DictionaryService/ListCategories',
+            dictionary__pb2.ListCategoriesRequest.SerializeToString,
+            dictionary__pb2.CategoriesList.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamAllTerms(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/dictionary.DictionaryService/StreamAllTerms',
+            dictionary__pb2.StreamAllRequest.SerializeToString,
+            dictionary__pb2.TermResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamSearch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/dictionary.DictionaryService/StreamSearch',
+            dictionary__pb2.SearchRequest.SerializeToString,
+            dictionary__pb2.TermResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BatchGetTerms(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/dictionary.DictionaryService/BatchGetTerms',
+            dictionary__pb2.BatchGetRequest.SerializeToString,
+            dictionary__pb2.BatchGetResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def BulkAddTerms(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/dictionary.DictionaryService/BulkAddTerms',
+            dictionary__pb2.AddTermRequest.SerializeToString,
+            dictionary__pb2.BulkAddResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def WatchTerms(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/dictionary.DictionaryService/WatchTerms',
+            dictionary__pb2.WatchRequest.SerializeToString,
+            dictionary__pb2.TermEvent.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SuggestTerms(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/dictionary.DictionaryService/SuggestTerms',
+            dictionary__pb2.SuggestRequest.SerializeToString,
+            dictionary__pb2.SuggestResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def FuzzySearch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/dictionary.DictionaryService/FuzzySearch',
+            dictionary__pb2.FuzzySearchRequest.SerializeToString,
+            dictionary__pb2.FuzzySearchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamSnapshot(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/dictionary.DictionaryService/StreamSnapshot',
+            dictionary__pb2.SnapshotRequest.SerializeToString,
+            dictionary__pb2.TermsList.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
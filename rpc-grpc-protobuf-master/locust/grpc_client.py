@@ -1,40 +1,87 @@
 # locust/grpc_client.py
+from typing import Optional
+
 import grpc
 import dictionary_pb2
 import dictionary_pb2_grpc
 
 class DictionaryGrpcClient:
-    def __init__(self, host: str = "localhost", port: int = 50051):
+    def __init__(self, host: str = "localhost", port: int = 50051, timeout: Optional[float] = None):
+        # Дедлайн каждого вызова в секундах; сервер отбрасывает просроченные вызовы
+        self.timeout = timeout
         self.channel = grpc.insecure_channel(f"{host}:{port}")
         self.stub = dictionary_pb2_grpc.DictionaryServiceStub(self.channel)
 
     def get_term(self, term: str):
         request = dictionary_pb2.GetTermRequest(term=term)
-        return self.stub.GetTerm(request)
+        return self.stub.GetTerm(request, timeout=self.timeout)
 
-    def add_term(self, term: str, definition: str, category: str, related_terms=None, source=""):
+    def add_term(self, term: str, definition: str, category: str, related_terms=None, source="",
+                 ttl_seconds: int = 0):
         if related_terms is None:
             related_terms = []
         request = dictionary_pb2.AddTermRequest(
+            term=term,
+            definition=definition,
+            category=category,
+            related_terms=related_terms,
+            source=source,
+            ttl_seconds=ttl_seconds
+        )
+        return self.stub.AddTerm(request, timeout=self.timeout)
+
+    def update_term(self, term: str, definition: str, category: str, related_terms=None, source=""):
+        if related_terms is None:
+            related_terms = []
+        request = dictionary_pb2.UpdateTermRequest(
             term=term,
             definition=definition,
             category=category,
             related_terms=related_terms,
             source=source
         )
-        return self.stub.AddTerm(request)
+        return self.stub.UpdateTerm(request, timeout=self.timeout)
 
-    def get_all_terms(self, page: int = 1, page_size: int = 10):
-        request = dictionary_pb2.GetAllRequest(page=page, page_size=page_size)
-        return self.stub.GetAllTerms(request)
+    def delete_term(self, term: str):
+        request = dictionary_pb2.DeleteTermRequest(term=term)
+        return self.stub.DeleteTerm(request, timeout=self.timeout)
+
+    def get_all_terms(self, page: int = 1, page_size: int = 10, page_token: str = ""):
+        request = dictionary_pb2.GetAllRequest(page=page, page_size=page_size, page_token=page_token)
+        return self.stub.GetAllTerms(request, timeout=self.timeout)
 
     def search_terms(self, query: str, category: str = ""):
         request = dictionary_pb2.SearchRequest(query=query, category=category)
-        return self.stub.SearchTerms(request)
+        return self.stub.SearchTerms(request, timeout=self.timeout)
+
+    def suggest_terms(self, prefix: str, limit: int = 0):
+        request = dictionary_pb2.SuggestRequest(prefix=prefix, limit=limit)
+        return self.stub.SuggestTerms(request, timeout=self.timeout)
 
     def get_terms_by_category(self, category: str):
         request = dictionary_pb2.CategoryRequest(category=category)
-        return self.stub.GetTermsByCategory(request)
+        return self.stub.GetTermsByCategory(request, timeout=self.timeout)
+
+    def stream_all_terms(self, category: str = ""):
+        request = dictionary_pb2.StreamAllRequest(category=category)
+        return self.stub.StreamAllTerms(request, timeout=self.timeout)
+
+    def stream_search(self, query: str, category: str = ""):
+        request = dictionary_pb2.SearchRequest(query=query, category=category)
+        return self.stub.StreamSearch(request, timeout=self.timeout)
+
+    def get_related_terms(self, term: str, depth: int = 1):
+        request = dictionary_pb2.RelatedTermsRequest(term=term, depth=depth)
+        return self.stub.GetRelatedTerms(request, timeout=self.timeout)
+
+    def batch_get_terms(self, terms):
+        request = dictionary_pb2.BatchGetRequest(terms=terms)
+        return self.stub.BatchGetTerms(request, timeout=self.timeout)
+
+    def bulk_add_terms(self, terms):
+        # terms — итерируемый набор словарей с полями AddTermRequest
+        requests = (dictionary_pb2.AddTermRequest(**term_data) for term_data in terms)
+        return self.stub.BulkAddTerms(requests, timeout=self.timeout)
 
     def close(self):
         self.channel.close()
\ No newline at end of file
@@ -1,14 +1,29 @@
 # locust/locustfile.py
 from locust import User, task, between
+import itertools
+import os
 import time
 import random
 from grpc import RpcError
+from grpc.experimental import gevent as grpc_gevent
 from grpc_client import DictionaryGrpcClient
 
 # Список терминов из начальных данных — для реалистичных запросов
 EXISTING_TERMS = ["gRPC", "Protobuf", "REST", "GraphQL", "Docker"]
 CATEGORIES = ["RPC", "Serialization", "API", "Containerization"]
 SEARCH_QUERIES = ["API", "container", "protocol", "Google", "web"]
+# Дедлайн вызовов в секундах (GRPC_TIMEOUT=2); по умолчанию без дедлайна
+GRPC_TIMEOUT = float(os.environ["GRPC_TIMEOUT"]) if os.environ.get("GRPC_TIMEOUT") else None
+# Реплики для чтения (GRPC_REPLICAS=localhost:50052,localhost:50053); записи всегда идут в ведущий
+GRPC_REPLICAS = [address for address in os.environ.get("GRPC_REPLICAS", "").split(",") if address]
+# Срок жизни терминов add_unique_term, с: иначе долгий прогон раздувает словарь
+# и полные обходы замедляются; 0 — бессрочно
+LOADTEST_TTL = int(os.environ.get("LOADTEST_TTL", 600))
+# Пользователи распределяются по репликам по кругу
+_replica_numbers = itertools.count()
+
+# Синхронные вызовы grpc блокируют цикл gevent: без этого при нескольких пользователях Locust зависает
+grpc_gevent.init_gevent()
 
 class GrpcUser(User):
     abstract = True
@@ -16,10 +31,105 @@ class GrpcUser(User):
     def __init__(self, environment):
         super().__init__(environment)
         # В Docker-сети имя сервиса — dictionary-grpc
-        self.client = DictionaryGrpcClient(host="localhost", port=50051)
+        self.client = DictionaryGrpcClient(host="localhost", port=50051, timeout=GRPC_TIMEOUT)
+        self.reader = self.client
+        if GRPC_REPLICAS:
+            host, port = GRPC_REPLICAS[next(_replica_numbers) % len(GRPC_REPLICAS)].rsplit(":", 1)
+            self.reader = DictionaryGrpcClient(host=host, port=int(port), timeout=GRPC_TIMEOUT)
 
     def on_stop(self):
         self.client.close()
+        if self.reader is not self.client:
+            self.reader.close()
+
+    def _make_grpc_call(self, name: str, func, args=(), kwargs=None, expect_not_found=False):
+        if kwargs is None:
+            kwargs = {}
+        start_time = time.time()
+        try:
+            response = func(*args, **kwargs)
+            total_time_ms = int((time.time() - start_time) * 1000)
+            response_size = len(response.SerializeToString())
+
+            # Для GetTerm (not found): если вернулся термин — это ошибка
+            if name == "GetTerm (not found)" and hasattr(response, 'term') and response.term:
+                self.environment.events.request.fire(
+                    request_type="gRPC",
+                    name=name,
+                    response_time=total_time_ms,
+                    response_length=response_size,
+                    exception=AssertionError("Unexpected term found")
+                )
+            else:
+                self.environment.events.request.fire(
+                    request_type="gRPC",
+                    name=name,
+                    response_time=total_time_ms,
+                    response_length=response_size,
+                    exception=None,
+                )
+        except RpcError as e:
+            total_time_ms = int((time.time() - start_time) * 1000)
+            # Если ожидаем NOT_FOUND — считаем успехом
+            if expect_not_found and e.code().name == "NOT_FOUND":
+                self.environment.events.request.fire(
+                    request_type="gRPC",
+                    name=name,
+                    response_time=total_time_ms,
+                    response_length=0,
+                    exception=None,
+                )
+            else:
+                self.environment.events.request.fire(
+                    request_type="gRPC",
+                    name=name,
+                    response_time=total_time_ms,
+                    response_length=0,
+                    exception=e,
+                )
+        except Exception as e:
+            total_time_ms = int((time.time() - start_time) * 1000)
+            self.environment.events.request.fire(
+                request_type="gRPC",
+                name=name,
+                response_time=total_time_ms,
+                response_length=0,
+                exception=e,
+            )
+
+    def _make_stream_call(self, name: str, func, args=()):
+        # Для потоков фиксируем два события: время до первого термина
+        # и полное время потока с суммарным объёмом (пропускная способность)
+        start_time = time.time()
+        total_size = 0
+        first_term_fired = False
+        try:
+            for response in func(*args):
+                total_size += response.ByteSize()
+                if not first_term_fired:
+                    first_term_fired = True
+                    self.environment.events.request.fire(
+                        request_type="gRPC stream",
+                        name=f"{name} (first term)",
+                        response_time=(time.time() - start_time) * 1000,
+                        response_length=total_size,
+                        exception=None,
+                    )
+            self.environment.events.request.fire(
+                request_type="gRPC stream",
+                name=name,
+                response_time=(time.time() - start_time) * 1000,
+                response_length=total_size,
+                exception=None,
+            )
+        except Exception as e:
+            self.environment.events.request.fire(
+                request_type="gRPC stream",
+                name=name,
+                response_time=(time.time() - start_time) * 1000,
+                response_length=total_size,
+                exception=e,
+            )
 
 class DictionaryUser(GrpcUser):
     # Пауза между действиями: от 0.5 до 3 секунд
@@ -30,7 +140,7 @@ class DictionaryUser(GrpcUser):
         term = random.choice(EXISTING_TERMS)
         self._make_grpc_call(
             name="GetTerm (existing)",
-            func=self.client.get_term,
+            func=self.reader.get_term,
             args=(term,)
         )
 
@@ -40,7 +150,7 @@ class DictionaryUser(GrpcUser):
         term = f"NonExistent_{int(time.time() * 1000000) % 1000000}"
         self._make_grpc_call(
             name="GetTerm (not found)",
-            func=self.client.get_term,
+            func=self.reader.get_term,
             args=(term,),
             expect_not_found=True
         )
@@ -50,15 +160,26 @@ class DictionaryUser(GrpcUser):
         query = random.choice(SEARCH_QUERIES)
         self._make_grpc_call(
             name="SearchTerms",
-            func=self.client.search_terms,
+            func=self.reader.search_terms,
             args=(query,)
         )
 
+    @task(4)
+    def suggest_terms(self):
+        # Префикс, как его набирают в поле поиска
+        term = random.choice(EXISTING_TERMS)
+        prefix = term[:random.randint(1, len(term))]
+        self._make_grpc_call(
+            name="SuggestTerms",
+            func=self.reader.suggest_terms,
+            args=(prefix,)
+        )
+
     @task(3)
     def get_all_terms(self):
         self._make_grpc_call(
             name="GetAllTerms",
-            func=self.client.get_all_terms,
+            func=self.reader.get_all_terms,
             kwargs={"page": 1, "page_size": 10}
         )
 
@@ -67,10 +188,44 @@ class DictionaryUser(GrpcUser):
         category = random.choice(CATEGORIES)
         self._make_grpc_call(
             name="GetTermsByCategory",
-            func=self.client.get_terms_by_category,
+            func=self.reader.get_terms_by_category,
             args=(category,)
         )
 
+    @task(2)
+    def get_related_terms(self):
+        term = random.choice(EXISTING_TERMS)
+        self._make_grpc_call(
+            name="GetRelatedTerms",
+            func=self.reader.get_related_terms,
+            args=(term, random.randint(1, 3))
+        )
+
+    @task(1)
+    def batch_get_terms(self):
+        terms = random.sample(EXISTING_TERMS, 3) + [f"NonExistent_{int(time.time() * 1000000) % 1000000}"]
+        self._make_grpc_call(
+            name="BatchGetTerms",
+            func=self.reader.batch_get_terms,
+            args=(terms,)
+        )
+
+    @task(1)
+    def stream_all_terms(self):
+        self._make_stream_call(
+            name="StreamAllTerms",
+            func=self.reader.stream_all_terms
+        )
+
+    @task(1)
+    def stream_search(self):
+        query = random.choice(SEARCH_QUERIES)
+        self._make_stream_call(
+            name="StreamSearch",
+            func=self.reader.stream_search,
+            args=(query,)
+        )
+
     @task(1)
     def add_unique_term(self):
         # Генерируем уникальный термин, чтобы не было конфликтов ALREADY_EXISTS
@@ -83,61 +238,75 @@ class DictionaryUser(GrpcUser):
                 "definition": "Definition for load testing",
                 "category": "LoadTest",
                 "related_terms": ["test", "performance"],
+                "source": "Locust",
+                "ttl_seconds": LOADTEST_TTL
+            }
+        )
+
+class WriteHeavyUser(GrpcUser):
+    """Профиль записи: добавление, обновление и удаление своих терминов без пауз.
+
+    Запускается отдельно: locust -f locustfile.py WriteHeavyUser
+    (см. run_write_scaling.sh). Имена уникальны, поэтому записи расходятся
+    по шардам и не конфликтуют друг с другом.
+    """
+    wait_time = between(0, 0.01)
+
+    def on_start(self):
+        self.prefix = f"Write_{id(self)}_{int(time.time() * 1000000)}"
+        self.counter = 0
+        self.terms = []
+
+    @task(4)
+    def add_term(self):
+        self.counter += 1
+        term = f"{self.prefix}_{self.counter}"
+        self._make_grpc_call(
+            name="AddTerm (write-heavy)",
+            func=self.client.add_term,
+            kwargs={
+                "term": term,
+                "definition": "Definition for write load testing",
+                "category": "WriteLoad",
+                "related_terms": ["test"],
                 "source": "Locust"
             }
         )
+        self.terms.append(term)
 
-    def _make_grpc_call(self, name: str, func, args=(), kwargs=None, expect_not_found=False):
-        if kwargs is None:
-            kwargs = {}
-        start_time = time.time()
-        try:
-            response = func(*args, **kwargs)
-            total_time_ms = int((time.time() - start_time) * 1000)
-            response_size = len(response.SerializeToString())
+    @task(3)
+    def update_term(self):
+        if not self.terms:
+            return
+        self._make_grpc_call(
+            name="UpdateTerm (write-heavy)",
+            func=self.client.update_term,
+            kwargs={
+                "term": random.choice(self.terms),
+                "definition": f"Updated at {time.time()}",
+                "category": "WriteLoad",
+                "source": "Locust"
+            }
+        )
 
-            # Для GetTerm (not found): если вернулся термин — это ошибка
-            if name == "GetTerm (not found)" and hasattr(response, 'term') and response.term:
-                self.environment.events.request.fire(
-                    request_type="gRPC",
-                    name=name,
-                    response_time=total_time_ms,
-                    response_length=response_size,
-                    exception=AssertionError("Unexpected term found")
-                )
-            else:
-                self.environment.events.request.fire(
-                    request_type="gRPC",
-                    name=name,
-                    response_time=total_time_ms,
-                    response_length=response_size,
-                    exception=None,
-                )
-        except RpcError as e:
-            total_time_ms = int((time.time() - start_time) * 1000)
-            # Если ожидаем NOT_FOUND — считаем успехом
-            if expect_not_found and e.code().name == "NOT_FOUND":
-                self.environment.events.request.fire(
-                    request_type="gRPC",
-                    name=name,
-                    response_time=total_time_ms,
-                    response_length=0,
-                    exception=None,
-                )
-            else:
-                self.environment.events.request.fire(
-                    request_type="gRPC",
-                    name=name,
-                    response_time=total_time_ms,
-                    response_length=0,
-                    exception=e,
-                )
-        except Exception as e:
-            total_time_ms = int((time.time() - start_time) * 1000)
-            self.environment.events.request.fire(
-                request_type="gRPC",
-                name=name,
-                response_time=total_time_ms,
-                response_length=0,
-                exception=e,
-            )
\ No newline at end of file
+    @task(2)
+    def delete_term(self):
+        if not self.terms:
+            return
+        term = self.terms.pop(random.randrange(len(self.terms)))
+        self._make_grpc_call(
+            name="DeleteTerm (write-heavy)",
+            func=self.client.delete_term,
+            args=(term,)
+        )
+
+    @task(1)
+    def get_own_term(self):
+        # Только что записанное читается из ведущего: реплика может отставать
+        if not self.terms:
+            return
+        self._make_grpc_call(
+            name="GetTerm (write-heavy)",
+            func=self.client.get_term,
+            args=(random.choice(self.terms),)
+        )
@@ -0,0 +1,62 @@
+#!/bin/bash
+# Сравнение режимов gRPC-сервера (thread pool и grpc.aio) под нагрузкой Locust.
+# Запуск из папки locust/: ./run_comparison.sh [длительность] [пользователи...]
+# Пример: ./run_comparison.sh 2m 100 300 1000
+
+cd "$(dirname "$0")"
+
+DURATION=${1:-2m}
+shift
+USERS=${@:-100 300 1000}
+MODES="thread aio"
+
+if command -v locust &> /dev/null; then
+    LOCUST_CMD="locust"
+else
+    LOCUST_CMD="python -m locust"
+fi
+
+mkdir -p result
+
+for mode in $MODES; do
+    echo ""
+    echo "Запуск сервера в режиме: $mode"
+    PYTHONPATH=$(pwd) python ../dictionary_service/server.py --mode "$mode" &
+    SERVER_PID=$!
+    sleep 3
+
+    if ! kill -0 $SERVER_PID 2>/dev/null; then
+        echo "ОШИБКА: сервер в режиме $mode не запустился"
+        exit 1
+    fi
+
+    for users in $USERS; do
+        echo "   Сценарий: $mode, пользователей: $users, длительность: $DURATION"
+        $LOCUST_CMD -f locustfile.py DictionaryUser \
+            --users=$users \
+            --spawn-rate=$(( users / 10 > 0 ? users / 10 : 1 )) \
+            --run-time=$DURATION \
+            --headless \
+            --only-summary \
+            --csv=result/compare_${mode}_${users}users > /dev/null 2>&1
+    done
+
+    kill $SERVER_PID 2>/dev/null
+    wait $SERVER_PID 2>/dev/null
+done
+
+echo ""
+echo "+----------+-----------+-----------+-----------+-----------+-----------+-----------+"
+echo "| Режим    | Пользоват.| RPS       | Медиана   | p99 (ms)  | Max (ms)  | Ошибки    |"
+echo "+----------+-----------+-----------+-----------+-----------+-----------+-----------+"
+for mode in $MODES; do
+    for users in $USERS; do
+        csv_file="result/compare_${mode}_${users}users_stats.csv"
+        if [ -f "$csv_file" ]; then
+            awk -F, -v mode="$mode" -v users="$users" '$2 == "Aggregated" {
+                printf "| %-8s | %-9s | %-9.1f | %-9s | %-9s | %-9s | %-9s |\n", mode, users, $10, $5, $19, $8, $4
+            }' "$csv_file"
+        fi
+    done
+done
+echo "+----------+-----------+-----------+-----------+-----------+-----------+-----------+"
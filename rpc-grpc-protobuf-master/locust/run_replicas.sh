@@ -0,0 +1,84 @@
+#!/bin/bash
+# Масштабирование чтения репликами: ведущий и N ведомых серверов — локальные процессы на одной машине.
+# Ведущий слушает 50051, реплика i — 50051 + i (метрики — 9464 + i). Locust (DictionaryUser) читает
+# из реплик по кругу, записи идут в ведущий; в конце печатается отставание реплик из /metrics.
+# Запуск из папки locust/: ./run_replicas.sh [длительность] [пользователи] [число реплик...]
+# Пример: ./run_replicas.sh 1m 300 0 1 2
+
+cd "$(dirname "$0")"
+
+DURATION=${1:-1m}
+USERS=${2:-300}
+shift $(( $# < 2 ? $# : 2 ))
+REPLICAS=${@:-0 1 2}
+
+if command -v locust &> /dev/null; then
+    LOCUST_CMD="locust"
+else
+    LOCUST_CMD="python -m locust"
+fi
+
+mkdir -p result
+
+wait_port() {
+    until python -c "import socket; socket.create_connection(('localhost', $1), 1)" 2>/dev/null; do
+        if ! kill -0 $2 2>/dev/null; then
+            echo "ОШИБКА: сервер на порту $1 не запустился"
+            kill $PIDS 2>/dev/null
+            exit 1
+        fi
+        sleep 1
+    done
+}
+
+for count in $REPLICAS; do
+    echo ""
+    echo "Запуск ведущего и реплик: $count"
+    PYTHONPATH=$(pwd) python ../dictionary_service/server.py --address "[::]:50051" &
+    PIDS=$!
+    wait_port 50051 $!
+
+    TARGETS=""
+    for i in $(seq 1 $count); do
+        PYTHONPATH=$(pwd) python ../dictionary_service/server.py --address "[::]:$((50051 + i))" \
+            --follow localhost:50051 --metrics-port $((9464 + i)) &
+        PIDS="$PIDS $!"
+        wait_port $((50051 + i)) $!
+        TARGETS="${TARGETS:+$TARGETS,}localhost:$((50051 + i))"
+    done
+
+    echo "   Сценарий: реплик $count, пользователей: $USERS, длительность: $DURATION"
+    GRPC_REPLICAS=$TARGETS $LOCUST_CMD -f locustfile.py DictionaryUser \
+        --users=$USERS \
+        --spawn-rate=$(( USERS / 10 > 0 ? USERS / 10 : 1 )) \
+        --run-time=$DURATION \
+        --headless \
+        --only-summary \
+        --csv=result/replicas_${count}_${USERS}users > /dev/null 2>&1
+
+    for i in $(seq 1 $count); do
+        python -c "
+import urllib.request
+for line in urllib.request.urlopen('http://localhost:$((9464 + i))/metrics').read().decode().splitlines():
+    if line.startswith(('dictionary_replication_lag', 'dictionary_replication_revision')):
+        print('   реплика $i:', line)
+"
+    done
+
+    kill $PIDS 2>/dev/null
+    wait $PIDS 2>/dev/null
+done
+
+echo ""
+echo "+----------+-----------+-----------+-----------+-----------+-----------+"
+echo "| Реплик   | Пользоват.| RPS       | Медиана   | p99 (ms)  | Ошибки    |"
+echo "+----------+-----------+-----------+-----------+-----------+-----------+"
+for count in $REPLICAS; do
+    csv_file="result/replicas_${count}_${USERS}users_stats.csv"
+    if [ -f "$csv_file" ]; then
+        awk -F, -v count="$count" -v users="$USERS" '$2 == "Aggregated" {
+            printf "| %-8s | %-9s | %-9.1f | %-9s | %-9s | %-9s |\n", count, users, $10, $5, $19, $4
+        }' "$csv_file"
+    fi
+done
+echo "+----------+-----------+-----------+-----------+-----------+-----------+"
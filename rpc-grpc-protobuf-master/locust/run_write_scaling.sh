@@ -0,0 +1,69 @@
+#!/bin/bash
+# Пропускная способность записи в зависимости от числа шардов словаря.
+# Сервер заполняется начальным словарём, Locust гоняет профиль WriteHeavyUser.
+# Запуск из папки locust/: ./run_write_scaling.sh [длительность] [пользователи] [размер словаря] [шарды...]
+# Пример: ./run_write_scaling.sh 1m 50 1000000 1 4 8
+
+cd "$(dirname "$0")"
+
+DURATION=${1:-1m}
+USERS=${2:-50}
+SIZE=${3:-1000000}
+shift $(( $# < 3 ? $# : 3 ))
+SHARDS=${@:-1 4 8}
+
+if command -v locust &> /dev/null; then
+    LOCUST_CMD="locust"
+else
+    LOCUST_CMD="python -m locust"
+fi
+
+mkdir -p result
+
+SEED_FILE="result/seed_${SIZE}.pb"
+if [ ! -f "$SEED_FILE" ]; then
+    echo "Генерация начального словаря: $SIZE терминов"
+    (cd ../dictionary_service && PYTHONPATH=../locust python benchmark.py seed --size "$SIZE" --output "../locust/$SEED_FILE" > /dev/null)
+fi
+
+for shards in $SHARDS; do
+    echo ""
+    echo "Запуск сервера: шардов $shards, словарь $SIZE терминов"
+    PYTHONPATH=$(pwd) python ../dictionary_service/server.py --shards "$shards" --seed-file "$SEED_FILE" --max-workers 32 &
+    SERVER_PID=$!
+
+    # Загрузка словаря занимает время: ждём, пока порт начнёт принимать соединения
+    until python -c "import socket; socket.create_connection(('localhost', 50051), 1)" 2>/dev/null; do
+        if ! kill -0 $SERVER_PID 2>/dev/null; then
+            echo "ОШИБКА: сервер с $shards шардами не запустился"
+            exit 1
+        fi
+        sleep 1
+    done
+
+    echo "   Сценарий: шардов $shards, пользователей: $USERS, длительность: $DURATION"
+    $LOCUST_CMD -f locustfile.py WriteHeavyUser \
+        --users=$USERS \
+        --spawn-rate=$(( USERS / 10 > 0 ? USERS / 10 : 1 )) \
+        --run-time=$DURATION \
+        --headless \
+        --only-summary \
+        --csv=result/writes_${shards}shards_${USERS}users > /dev/null 2>&1
+
+    kill $SERVER_PID 2>/dev/null
+    wait $SERVER_PID 2>/dev/null
+done
+
+echo ""
+echo "+----------+-----------+-----------+-----------+-----------+-----------+"
+echo "| Шардов   | Пользоват.| RPS       | Медиана   | p99 (ms)  | Ошибки    |"
+echo "+----------+-----------+-----------+-----------+-----------+-----------+"
+for shards in $SHARDS; do
+    csv_file="result/writes_${shards}shards_${USERS}users_stats.csv"
+    if [ -f "$csv_file" ]; then
+        awk -F, -v shards="$shards" -v users="$USERS" '$2 == "Aggregated" {
+            printf "| %-8s | %-9s | %-9.1f | %-9s | %-9s | %-9s |\n", shards, users, $10, $5, $19, $4
+        }' "$csv_file"
+    fi
+done
+echo "+----------+-----------+-----------+-----------+-----------+-----------+"